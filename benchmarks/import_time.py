@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Import-time regression benchmark for the Specify CLI.
+
+Runs each scenario in a fresh interpreter with ``python -X importtime`` and compares
+the cumulative import time of the modules it loads against a budget. Fails (exit 1)
+when a scenario goes over budget or pulls in a module it should not need.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --runs 9 --json results.json
+    python benchmarks/import_time.py --scale 2.0   # loosen budgets on slow CI machines
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Budgets are milliseconds of import time (the `cumulative` column of -X importtime summed
+# over top-level imports that a bare interpreter does not already perform), measured as
+# the median of several runs.
+SCENARIOS = {
+    "import": {
+        "code": "import specify_cli",
+        "budget_ms": 125,
+        "forbidden": ["httpx", "httpcore", "truststore", "readchar", "rich.live", "rich.progress", "rich.tree"],
+    },
+    "help": {
+        "code": "import sys; sys.argv = ['specify', '--help']; import specify_cli; specify_cli.main()",
+        "budget_ms": 275,
+        "forbidden": ["httpx", "httpcore", "truststore", "readchar", "rich.live", "rich.progress"],
+    },
+    "check": {
+        "code": "import sys; sys.argv = ['specify', 'check']; import specify_cli; specify_cli.main()",
+        "budget_ms": 175,
+        "forbidden": ["httpx", "httpcore", "truststore", "readchar", "rich.progress"],
+    },
+    # init pays for the HTTP stack and TLS context right before its first request
+    "init": {
+        "code": "import specify_cli; specify_cli._http_client().close()",
+        "budget_ms": 400,
+        "forbidden": [],
+    },
+}
+
+
+def parse_importtime(stderr: str, exclude: set[str] = frozenset()) -> tuple[float, set[str]]:
+    """Return (milliseconds of top-level imports, every module imported) from -X importtime output.
+
+    Top-level modules in ``exclude`` (interpreter startup) do not count towards the total.
+    """
+    total_us = 0
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        # Nested imports are indented by two extra spaces per level
+        if not name.startswith("  ") and name.strip() not in exclude:
+            total_us += int(cumulative)
+        modules.add(name.strip())
+    return total_us / 1000, modules
+
+
+def run_scenario(code: str, exclude: set[str] = frozenset()) -> tuple[float, set[str]]:
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1", "COLUMNS": "100"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        stdin=subprocess.DEVNULL,
+    )
+    return parse_importtime(proc.stderr, exclude)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Runs per scenario (median is reported)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget by this factor")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    parser.add_argument("scenarios", nargs="*", help=f"Scenarios to run: {', '.join(SCENARIOS)} (default: all)")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    # Warm the bytecode cache so the first run is not an outlier
+    subprocess.run([sys.executable, "-c", "import specify_cli"], capture_output=True)
+    _, startup = run_scenario("pass")
+
+    results = {}
+    failed = False
+    for name in args.scenarios or SCENARIOS:
+        scenario = SCENARIOS[name]
+        totals = []
+        modules = set()
+        for _ in range(args.runs):
+            total_ms, modules = run_scenario(scenario["code"], startup)
+            totals.append(total_ms)
+        median = statistics.median(totals)
+        budget = scenario["budget_ms"] * args.scale
+        loaded = [m for m in scenario["forbidden"] if m in modules]
+        ok = median <= budget and not loaded
+        failed |= not ok
+        results[name] = {"median_ms": round(median, 1), "budget_ms": budget, "forbidden_loaded": loaded, "ok": ok}
+        status = "ok" if ok else "FAIL"
+        extra = f" (loaded: {', '.join(loaded)})" if loaded else ""
+        print(f"{name:<8} {median:7.1f} ms  budget {budget:6.1f} ms  {status}{extra}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
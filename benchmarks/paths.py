@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Feature-path resolution benchmark: check-prerequisites.sh vs ``specify paths`` vs ``specify daemon``.
+
+Builds a throwaway git repository with a feature branch and its docs, then times the
+same query (``--json --require-tasks --include-tasks``) answered by:
+
+    bash        scripts/bash/check-prerequisites.sh (git forks, a test per document)
+    cli         ``specify paths`` in a fresh interpreter (reads .git/HEAD, no forks)
+    in-process  resolve_paths + check_prerequisites called directly (no interpreter start)
+    daemon      a running ``specify daemon`` answering over its Unix socket
+
+and checks that every method returns the same answer.
+
+Usage:
+    python benchmarks/paths.py
+    python benchmarks/paths.py --runs 50 --json paths.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+FLAGS = ["--json", "--require-tasks", "--include-tasks"]
+
+
+def make_repo(root: Path, features: int = 50) -> None:
+    env = {**os.environ, "GIT_AUTHOR_NAME": "bench", "GIT_AUTHOR_EMAIL": "bench@example.com", "GIT_COMMITTER_NAME": "bench", "GIT_COMMITTER_EMAIL": "bench@example.com"}
+    subprocess.run(["git", "init", "-q", "-b", f"{features:03d}-feature"], cwd=root, check=True, env=env)
+    subprocess.run(["git", "commit", "-q", "--allow-empty", "-m", "init"], cwd=root, check=True, env=env)
+    (root / ".specify").mkdir()
+    for i in range(1, features + 1):
+        feature = root / "specs" / f"{i:03d}-feature"
+        (feature / "contracts").mkdir(parents=True)
+        for doc in ("spec.md", "plan.md", "tasks.md", "research.md", "data-model.md", "quickstart.md", "contracts/api.yaml"):
+            (feature / doc).write_text("# placeholder\n", encoding="utf-8")
+
+
+def time_calls(call, runs: int) -> tuple[list[float], object]:
+    timings = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = call()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20, help="Queries per method (median is reported)")
+    parser.add_argument("--features", type=int, default=50, help="Feature directories in the scratch repository")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(REPO / "src"))
+    from specify_cli.daemon import query
+    from specify_cli.paths import check_prerequisites, resolve_paths
+
+    workdir = Path(tempfile.mkdtemp(prefix="specify-paths-bench-"))
+    daemon = None
+    try:
+        make_repo(workdir, args.features)
+        env = {**os.environ, "PYTHONPATH": str(REPO / "src")}
+        run = lambda argv: json.loads(subprocess.run(argv, cwd=workdir, capture_output=True, text=True, env=env, check=True).stdout)
+        cli_code = f"import sys; sys.argv = ['specify', 'paths', *{FLAGS!r}]; import specify_cli; specify_cli.main()"
+        socket_path = workdir / ".specify" / "daemon.sock"
+
+        methods = {}
+        if shutil.which("bash"):
+            methods["bash"] = lambda: run(["bash", str(REPO / "scripts" / "bash" / "check-prerequisites.sh"), *FLAGS])
+        methods["cli"] = lambda: run([sys.executable, "-c", cli_code])
+        methods["in-process"] = lambda: check_prerequisites(resolve_paths(workdir), require_tasks=True, include_tasks=True)
+        if hasattr(__import__("socket"), "AF_UNIX"):
+            daemon = subprocess.Popen(
+                [sys.executable, "-c", "import sys; sys.argv = ['specify', 'daemon', '--socket', sys.argv[1]]; import specify_cli; specify_cli.main()", str(socket_path)],
+                cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            deadline = time.monotonic() + 10
+            while not socket_path.exists() and time.monotonic() < deadline:
+                time.sleep(0.05)
+            methods["daemon"] = lambda: query(socket_path, " ".join(FLAGS))
+
+        results = {}
+        expected = None
+        for name, call in methods.items():
+            call()  # warm caches (bytecode, the daemon's first answer)
+            timings, answer = time_calls(call, args.runs)
+            if expected is None:
+                expected = answer
+            median = statistics.median(timings)
+            results[name] = {"median_ms": round(median, 3), "mean_ms": round(statistics.fmean(timings), 3), "matches": answer == expected}
+        baseline = results[next(iter(results))]["median_ms"]
+        for name, result in results.items():
+            speedup = baseline / result["median_ms"] if result["median_ms"] else float("inf")
+            check = "" if result["matches"] else "  MISMATCH"
+            print(f"{name:<11} {result['median_ms']:9.3f} ms  {speedup:8.1f}x{check}")
+        if args.json_path:
+            with open(args.json_path, "w", encoding="utf-8") as f:
+                json.dump({"runs": args.runs, "features": args.features, "results": results}, f, indent=2)
+        return 0 if all(r["matches"] for r in results.values()) else 1
+    finally:
+        if daemon is not None:
+            daemon.terminate()
+            daemon.wait(timeout=10)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
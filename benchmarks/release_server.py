@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the release asset host, for exercising downloads without GitHub.
+
+Serves the files in a directory over HTTP/1.1 with ``Range``/``If-Range`` support and
+optional fault injection, so retries and resumption can be tested deterministically.
+
+It also answers the GitHub release API (``/repos/<owner>/<repo>/releases/latest`` and
+``.../releases/tags/<tag>``) with one release whose assets are the directory's ``.zip``
+files, so ``SPECIFY_GITHUB_API_URL=http://127.0.0.1:8765 specify init ...`` runs end to
+end against it. The release JSON carries an ETag and honours ``If-None-Match``.
+
+Usage:
+    python benchmarks/release_server.py ./dist --port 8765
+    python benchmarks/release_server.py ./dist --drop-after 65536   # cut every response after 64 KiB
+    python benchmarks/release_server.py ./dist --fail-first 2       # answer the first 2 requests per file with 503
+    python benchmarks/release_server.py ./dist --no-ranges          # ignore Range headers
+    python benchmarks/release_server.py ./dist --tag v0.0.99        # tag of the served release
+    python benchmarks/release_server.py ./dist --latency 0.5        # wait 500 ms before every asset response
+
+It can also be embedded: ``serve(directory, port=0)`` returns a running server whose
+``server_address`` holds the chosen port; call ``shutdown()`` when done.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)$")
+_RELEASE = re.compile(r"^/repos/[^/]+/[^/]+/releases/(?:latest|tags/(?P<tag>[^/]+))$")
+_ASSET_VERSION = re.compile(r"^spec-kit-template-.+-(?:sh|ps)-(?P<version>[^-]+)\.zip$")
+
+
+class ReleaseServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, directory: Path, *, drop_after: int | None = None, fail_first: int = 0, ranges: bool = True, tag: str | None = None, latency: float = 0.0):
+        super().__init__(address, _Handler)
+        self.directory = Path(directory).resolve()
+        self.drop_after = drop_after
+        self.fail_first = fail_first
+        self.ranges = ranges
+        self.tag = tag
+        self.latency = latency
+        self._digests: dict[tuple[str, int, int], str] = {}
+        self.requests = Counter()
+        self.log = []
+        self._lock = threading.Lock()
+
+    def record(self, path: str, range_header: str | None) -> int:
+        with self._lock:
+            self.requests[path] += 1
+            self.log.append((path, range_header))
+            return self.requests[path]
+
+    def _digest(self, path: Path) -> str:
+        st = path.stat()
+        key = (path.name, st.st_size, st.st_mtime_ns)
+        with self._lock:
+            digest = self._digests.get(key)
+        if digest is None:
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()
+            with self._lock:
+                self._digests[key] = digest
+        return digest
+
+    def release(self, base_url: str) -> dict:
+        """Release JSON in the shape of the GitHub API, listing every .zip in the directory."""
+        zips = sorted(self.directory.glob("*.zip"))
+        tag = self.tag
+        if tag is None:
+            versions = [m["version"] for m in map(_ASSET_VERSION.match, (z.name for z in zips)) if m]
+            tag = versions[0] if versions else "v0.0.0"
+        assets = [
+            {"name": z.name, "size": z.stat().st_size, "browser_download_url": f"{base_url}/{z.name}", "digest": f"sha256:{self._digest(z)}"}
+            for z in zips
+        ]
+        return {"tag_name": tag, "name": tag, "published_at": "2025-01-01T00:00:00Z", "assets": assets}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: ReleaseServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _resolve(self) -> Path | None:
+        rel = self.path.split("?", 1)[0].lstrip("/")
+        target = (self.server.directory / rel).resolve()
+        if self.server.directory not in target.parents or not target.is_file():
+            return None
+        return target
+
+    def do_HEAD(self):
+        self.do_GET(head=True)
+
+    def _send_release(self, tag: str | None, head: bool) -> None:
+        release = self.server.release(f"http://{self.headers.get('Host') or '%s:%d' % self.server.server_address[:2]}")
+        if tag is not None and tag != release["tag_name"]:
+            self.send_error(404)
+            return
+        body = json.dumps(release).encode("utf-8")
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def do_GET(self, head: bool = False):
+        release = _RELEASE.match(self.path.split("?", 1)[0])
+        if release:
+            self.server.record(self.path, None)
+            self._send_release(release["tag"], head)
+            return
+        target = self._resolve()
+        range_header = self.headers.get("Range")
+        count = self.server.record(self.path, range_header)
+        if target is None:
+            self.send_error(404)
+            return
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if count <= self.server.fail_first:
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        data = target.read_bytes()
+        size = len(data)
+        etag = '"' + hashlib.sha256(data).hexdigest()[:16] + '"'
+        start, end, status = 0, size - 1, 200
+        if_range = self.headers.get("If-Range")
+        match = _RANGE.match(range_header or "")
+        if self.server.ranges and match and (if_range is None or if_range == etag):
+            first, last = match.groups()
+            if first:
+                start, end = int(first), min(int(last), size - 1) if last else size - 1
+            elif last:
+                start, end = max(size - int(last), 0), size - 1
+            if start >= size or start > end:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            status = 206
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/zip")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("ETag", etag)
+        if self.server.ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        if head:
+            return
+
+        body = memoryview(data)[start:end + 1]
+        if self.server.drop_after is not None:
+            body = body[: self.server.drop_after]
+        step = 64 * 1024
+        try:
+            for offset in range(0, len(body), step):
+                self.wfile.write(body[offset:offset + step])
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up on this response (e.g. a probe it only needed headers from)
+            self.close_connection = True
+            return
+        if self.server.drop_after is not None and len(body) < end - start + 1:
+            # Simulate a proxy cutting the connection mid-transfer
+            self.close_connection = True
+            self.wfile.flush()
+            self.connection.shutdown(2)
+
+
+def serve(directory: Path, *, host: str = "127.0.0.1", port: int = 0, **options) -> ReleaseServer:
+    """Start a ReleaseServer on a background thread and return it."""
+    server = ReleaseServer((host, port), directory, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve release assets locally with Range support and fault injection")
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--drop-after", type=int, help="Close every response after this many body bytes")
+    parser.add_argument("--fail-first", type=int, default=0, help="Answer the first N requests per path with 503")
+    parser.add_argument("--no-ranges", action="store_true", help="Ignore Range requests (always send the full file)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before answering each asset request (a slow link)")
+    parser.add_argument("--tag", help="Tag of the release the API answers with (default: the version in the asset names)")
+    args = parser.parse_args()
+
+    server = ReleaseServer((args.host, args.port), args.directory, drop_after=args.drop_after, fail_first=args.fail_first, ranges=not args.no_ranges, tag=args.tag, latency=args.latency)
+    print(f"Serving {server.directory} on http://{args.host}:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
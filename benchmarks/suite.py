@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark suite for the Specify CLI, run against a local release server.
+
+Builds a synthetic template zip (``--files`` files totalling ``--size-kb``), serves it
+with benchmarks/release_server.py, which also answers the GitHub release API, and points
+the CLI at it through ``SPECIFY_GITHUB_API_URL``. Every scenario runs ``specify`` in a
+fresh interpreter and is timed wall-clock:
+
+    startup     specify --help
+    check       specify check
+    init-cold   specify init into a new directory with an empty cache (API call + download)
+    init-warm   the same with the release metadata and template already cached
+    here-merge  specify init --here --force into a directory of ``--tree-files`` existing
+                files, warm cache (the merge and extraction into a large tree)
+    init-git    init-warm plus the initial git commit
+
+Results (median, mean and min per scenario) go to ``--json``. With ``--baseline`` the
+run is compared against an earlier JSON file and exits 1 when a scenario's median is
+more than ``--tolerance`` slower.
+
+Usage:
+    python benchmarks/suite.py
+    python benchmarks/suite.py --runs 7 --files 2000 --size-kb 20000 --json bench.json
+    python benchmarks/suite.py --baseline bench.json --tolerance 0.2
+    python benchmarks/suite.py --only init-cold --only here-merge
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from release_server import serve
+
+REPO = Path(__file__).resolve().parent.parent
+TAG = "v9.9.9"
+AGENT, SCRIPT = "claude", "sh"
+SCENARIOS = ("startup", "check", "init-cold", "init-warm", "here-merge", "init-git")
+CLI_CODE = "import sys; sys.argv = ['specify', *sys.argv[1:]]; import specify_cli; specify_cli.main()"
+
+
+def make_template(path: Path, files: int, size_kb: int, seed: int = 0) -> None:
+    """Write a template zip laid out like the real ones: scripts, templates, agent commands and bulk docs."""
+    rng = random.Random(seed)
+    per_file = max(1, size_kb * 1024 // max(files, 1))
+    names = [".specify/memory/constitution.md"]
+    names += [f".specify/scripts/bash/script-{i:03d}.sh" for i in range(min(10, files // 10))]
+    names += [f".specify/templates/template-{i:03d}.md" for i in range(min(10, files // 10))]
+    names += [f".{AGENT}/commands/command-{i:03d}.md" for i in range(min(10, files // 10))]
+    names += [f".specify/docs/section-{i // 100:03d}/doc-{i:05d}.md" for i in range(files - len(names))]
+    words = [b"spec", b"plan", b"task", b"feature", b"agent", b"contract", b"model", b"test", b"user", b"story"]
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name in names[:files]:
+            # Text-like content: compresses roughly as the real templates do
+            body = b" ".join(rng.choice(words) for _ in range(per_file // 6 + 1))[:per_file]
+            if name.endswith(".sh"):
+                body = b"#!/usr/bin/env bash\n" + body
+            zf.writestr(name, body)
+
+
+def make_tree(root: Path, files: int) -> None:
+    """An existing project for --here: files spread over nested directories."""
+    for i in range(files):
+        path = root / "src" / f"pkg{i % 50:02d}" / f"mod{(i // 50) % 20:02d}" / f"file{i:05d}.py"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"# module {i}\nVALUE = {i}\n", encoding="utf-8")
+
+
+class Suite:
+    def __init__(self, workdir: Path, api_url: str, runs: int, tree_files: int):
+        self.workdir = workdir
+        self.runs = runs
+        self.tree_files = tree_files
+        self.warm_cache = workdir / "cache-warm"
+        self.env = {
+            **os.environ,
+            "PYTHONPATH": str(REPO / "src"),
+            "SPECIFY_GITHUB_API_URL": api_url,
+            "GIT_AUTHOR_NAME": "bench", "GIT_AUTHOR_EMAIL": "bench@example.com",
+            "GIT_COMMITTER_NAME": "bench", "GIT_COMMITTER_EMAIL": "bench@example.com",
+        }
+        for name in ("GH_TOKEN", "GITHUB_TOKEN"):
+            self.env.pop(name, None)
+        self._count = 0
+
+    def specify(self, args: list[str], cwd: Path, cache: Path) -> float:
+        """Run specify once; returns wall-clock milliseconds."""
+        env = {**self.env, "SPECIFY_CACHE_DIR": str(cache)}
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", CLI_CODE, *args], cwd=cwd, env=env, stdin=subprocess.DEVNULL, capture_output=True, text=True)
+        elapsed = (time.perf_counter() - started) * 1000
+        if result.returncode != 0:
+            raise RuntimeError(f"specify {' '.join(args)} failed ({result.returncode}):\n{result.stdout[-2000:]}{result.stderr[-2000:]}")
+        return elapsed
+
+    def scratch(self) -> Path:
+        self._count += 1
+        path = self.workdir / f"run-{self._count:03d}"
+        path.mkdir()
+        return path
+
+    def init_args(self, name: str | None, *extra: str) -> list[str]:
+        target = ["--here", "--force"] if name is None else [name]
+        return ["init", *target, "--ai", AGENT, "--script", SCRIPT, "--ignore-agent-tools", *extra]
+
+    def once(self, scenario: str) -> float:
+        cwd = self.scratch()
+        if scenario == "startup":
+            return self.specify(["--help"], cwd, self.warm_cache)
+        if scenario == "check":
+            return self.specify(["check"], cwd, self.warm_cache)
+        if scenario == "init-cold":
+            return self.specify(self.init_args("project", "--no-git"), cwd, cwd / "cache")
+        if scenario == "init-warm":
+            return self.specify(self.init_args("project", "--no-git"), cwd, self.warm_cache)
+        if scenario == "init-git":
+            return self.specify(self.init_args("project"), cwd, self.warm_cache)
+        if scenario == "here-merge":
+            make_tree(cwd, self.tree_files)
+            return self.specify(self.init_args(None, "--no-git"), cwd, self.warm_cache)
+        raise ValueError(scenario)
+
+    def run(self, scenario: str) -> dict:
+        self.once(scenario)  # warm the OS caches, bytecode and (for warm scenarios) the template cache
+        timings = [self.once(scenario) for _ in range(self.runs)]
+        return {
+            "median_ms": round(statistics.median(timings), 1),
+            "mean_ms": round(statistics.fmean(timings), 1),
+            "min_ms": round(min(timings), 1),
+            "runs": self.runs,
+        }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Scenarios whose median regressed by more than tolerance against baseline."""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get("results", {}).get(name)
+        if before and result["median_ms"] > before["median_ms"] * (1 + tolerance):
+            regressions.append(name)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per scenario after one warm-up (median is reported)")
+    parser.add_argument("--files", type=int, default=500, help="Files in the synthetic template zip")
+    parser.add_argument("--size-kb", type=int, default=2048, help="Uncompressed size of the synthetic template")
+    parser.add_argument("--tree-files", type=int, default=5000, help="Existing files in the directory for here-merge")
+    parser.add_argument("--only", action="append", choices=SCENARIOS, help="Run only this scenario (repeatable)")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="Compare against results from an earlier --json run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown against --baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline else None
+    workdir = Path(tempfile.mkdtemp(prefix="specify-bench-"))
+    server = None
+    try:
+        assets = workdir / "assets"
+        assets.mkdir()
+        make_template(assets / f"spec-kit-template-{AGENT}-{SCRIPT}-{TAG}.zip", args.files, args.size_kb)
+        server = serve(assets, tag=TAG)
+        suite = Suite(workdir, f"http://127.0.0.1:{server.server_address[1]}", args.runs, args.tree_files)
+
+        results = {}
+        for scenario in args.only or SCENARIOS:
+            results[scenario] = result = suite.run(scenario)
+            before = (baseline or {}).get("results", {}).get(scenario)
+            delta = f"  {(result['median_ms'] / before['median_ms'] - 1) * 100:+6.1f}% vs baseline" if before else ""
+            print(f"{scenario:<11} {result['median_ms']:9.1f} ms  (min {result['min_ms']:.1f}){delta}", flush=True)
+
+        report = {
+            "config": {"runs": args.runs, "files": args.files, "size_kb": args.size_kb, "tree_files": args.tree_files},
+            "environment": {"python": platform.python_version(), "platform": sys.platform, "machine": platform.machine(), "cpus": os.cpu_count()},
+            "results": results,
+        }
+        if args.json_path:
+            with open(args.json_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+        if baseline:
+            if baseline.get("config") != report["config"]:
+                print("warning: baseline was recorded with a different configuration", file=sys.stderr)
+            regressions = compare(results, baseline, args.tolerance)
+            if regressions:
+                print(f"Regressed by more than {args.tolerance:.0%}: {', '.join(regressions)}", file=sys.stderr)
+                return 1
+        return 0
+    finally:
+        if server is not None:
+            server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -30,13 +30,18 @@ get_current_branch() {
     local repo_root=$(get_repo_root)
     local specs_dir="$repo_root/specs"
     
-    if [[ -d "$specs_dir" ]]; then
+    if feature_index_value "$repo_root" latest; then
+        if [[ -n "$INDEX_VALUE" ]]; then
+            echo "$INDEX_VALUE"
+            return
+        fi
+    elif [[ -d "$specs_dir" ]]; then
         local latest_feature=""
         local highest=0
         
         for dir in "$specs_dir"/*; do
             if [[ -d "$dir" ]]; then
-                local dirname=$(basename "$dir")
+                local dirname="${dir##*/}"
                 if [[ "$dirname" =~ ^([0-9]{3})- ]]; then
                     local number=${BASH_REMATCH[1]}
                     number=$((10#$number))
@@ -57,6 +62,41 @@ get_current_branch() {
     echo "main"  # Final fallback
 }
 
+# Read a top-level value (latest, next_number) of .specify/index into INDEX_VALUE without
+# forking. Fails when the index is missing or specs/ changed since it was written.
+read_feature_index() {
+    local repo_root="$1" key="$2" line
+    local index="$repo_root/.specify/index"
+    local pattern="^  \"$key\": \"?([^\",]*)\"?,?$"
+    INDEX_VALUE=""
+    [[ -f "$index" && ! "$repo_root/specs" -nt "$index" ]] || return 1
+    while IFS= read -r line; do
+        if [[ "$line" =~ $pattern ]]; then
+            INDEX_VALUE="${BASH_REMATCH[1]}"
+            return 0
+        fi
+    done < "$index"
+    return 1
+}
+
+# read_feature_index, refreshing a stale index first with the bundled Python helper
+# (.specify/scripts/python/features.py). Fails if neither works; callers then walk specs/.
+feature_index_value() {
+    local repo_root="$1" key="$2"
+    read_feature_index "$repo_root" "$key" && return 0
+    local helper="${BASH_SOURCE[0]%/*}/../python/features.py"
+    [[ -f "$helper" ]] || return 1
+    local python
+    for python in python3 python; do
+        if command -v "$python" >/dev/null 2>&1; then
+            "$python" "$helper" refresh --repo-root "$repo_root" >/dev/null 2>&1 || return 1
+            read_feature_index "$repo_root" "$key"
+            return
+        fi
+    done
+    return 1
+}
+
 # Check if we have git available
 has_git() {
     git rev-parse --show-toplevel >/dev/null 2>&1
@@ -35,6 +35,7 @@ find_repo_root() {
 # to searching for repository markers so the workflow still functions in repositories that
 # were initialised with --no-git.
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "$SCRIPT_DIR/common.sh"
 
 if git rev-parse --show-toplevel >/dev/null 2>&1; then
     REPO_ROOT=$(git rev-parse --show-toplevel)
@@ -53,18 +54,20 @@ cd "$REPO_ROOT"
 SPECS_DIR="$REPO_ROOT/specs"
 mkdir -p "$SPECS_DIR"
 
-HIGHEST=0
-if [ -d "$SPECS_DIR" ]; then
+# The feature index answers in one read; walk specs/ only when it is unavailable
+if feature_index_value "$REPO_ROOT" next_number; then
+    NEXT=$INDEX_VALUE
+else
+    HIGHEST=0
     for dir in "$SPECS_DIR"/*; do
         [ -d "$dir" ] || continue
-        dirname=$(basename "$dir")
-        number=$(echo "$dirname" | grep -o '^[0-9]\+' || echo "0")
-        number=$((10#$number))
-        if [ "$number" -gt "$HIGHEST" ]; then HIGHEST=$number; fi
+        if [[ "${dir##*/}" =~ ^([0-9]+) ]]; then
+            number=$((10#${BASH_REMATCH[1]}))
+            if [ "$number" -gt "$HIGHEST" ]; then HIGHEST=$number; fi
+        fi
     done
+    NEXT=$((HIGHEST + 1))
 fi
-
-NEXT=$((HIGHEST + 1))
 FEATURE_NUM=$(printf "%03d" "$NEXT")
 
 BRANCH_NAME=$(echo "$FEATURE_DESCRIPTION" | tr '[:upper:]' '[:lower:]' | sed 's/[^a-z0-9]/-/g' | sed 's/-\+/-/g' | sed 's/^-//' | sed 's/-$//')
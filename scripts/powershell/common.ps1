@@ -35,7 +35,12 @@ function Get-CurrentBranch {
     $repoRoot = Get-RepoRoot
     $specsDir = Join-Path $repoRoot "specs"
     
-    if (Test-Path $specsDir) {
+    $index = Get-FeatureIndex -RepoRoot $repoRoot
+    if ($index) {
+        if ($index.latest) {
+            return $index.latest
+        }
+    } elseif (Test-Path $specsDir) {
         $latestFeature = ""
         $highest = 0
         
@@ -58,6 +63,36 @@ function Get-CurrentBranch {
     return "main"
 }
 
+# Load .specify/index (latest, next_number, features). A stale index (specs/ changed since
+# it was written) is refreshed with the bundled Python helper first; returns $null when
+# neither works so callers can walk specs/ themselves.
+function Get-FeatureIndex {
+    param([string]$RepoRoot)
+    $indexPath = Join-Path $RepoRoot '.specify/index'
+    $specsDir = Join-Path $RepoRoot 'specs'
+    $isFresh = {
+        if (-not (Test-Path $indexPath -PathType Leaf)) { return $false }
+        if (-not (Test-Path $specsDir)) { return $true }
+        return (Get-Item $specsDir).LastWriteTimeUtc -le (Get-Item $indexPath).LastWriteTimeUtc
+    }
+    if (-not (& $isFresh)) {
+        $helper = Join-Path $PSScriptRoot '../python/features.py'
+        if (-not (Test-Path $helper)) { return $null }
+        foreach ($candidate in @(@('python3'), @('python'), @('py', '-3'))) {
+            if (-not (Get-Command $candidate[0] -ErrorAction SilentlyContinue)) { continue }
+            $prefix = @($candidate | Select-Object -Skip 1)
+            & $candidate[0] @prefix $helper refresh --repo-root $RepoRoot 2>$null | Out-Null
+            break
+        }
+        if (-not (& $isFresh)) { return $null }
+    }
+    try {
+        return Get-Content -Raw -Path $indexPath | ConvertFrom-Json
+    } catch {
+        return $null
+    }
+}
+
 function Test-HasGit {
     try {
         git rev-parse --show-toplevel 2>$null | Out-Null
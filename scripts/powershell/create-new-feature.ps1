@@ -37,6 +37,8 @@ function Find-RepositoryRoot {
         $current = $parent
     }
 }
+. (Join-Path $PSScriptRoot 'common.ps1')
+
 $fallbackRoot = (Find-RepositoryRoot -StartDir $PSScriptRoot)
 if (-not $fallbackRoot) {
     Write-Error "Error: Could not determine repository root. Please run this script from within the repository."
@@ -60,16 +62,20 @@ Set-Location $repoRoot
 $specsDir = Join-Path $repoRoot 'specs'
 New-Item -ItemType Directory -Path $specsDir -Force | Out-Null
 
-$highest = 0
-if (Test-Path $specsDir) {
+# The feature index answers in one read; walk specs/ only when it is unavailable
+$index = Get-FeatureIndex -RepoRoot $repoRoot
+if ($index) {
+    $next = [int]$index.next_number
+} else {
+    $highest = 0
     Get-ChildItem -Path $specsDir -Directory | ForEach-Object {
-        if ($_.Name -match '^(\d{3})') {
+        if ($_.Name -match '^(\d+)') {
             $num = [int]$matches[1]
             if ($num -gt $highest) { $highest = $num }
         }
     }
+    $next = $highest + 1
 }
-$next = $highest + 1
 $featureNum = ('{0:000}' -f $next)
 
 $branchName = $featureDesc.ToLower() -replace '[^a-z0-9]', '-' -replace '-{2,}', '-' -replace '^-', '' -replace '-$', ''
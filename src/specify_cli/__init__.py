@@ -30,28 +30,56 @@ import tempfile
 import shutil
 import shlex
 import json
+import threading
+import time
+from contextlib import ExitStack, nullcontext
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import TYPE_CHECKING, Optional, Tuple
 
 import typer
-import httpx
 from rich.console import Console
 from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.text import Text
-from rich.live import Live
 from rich.align import Align
 from rich.table import Table
-from rich.tree import Tree
 from typer.core import TyperGroup
 
-# For cross-platform keyboard input
-import readchar
-import ssl
-import truststore
+from .batch import default_workers, load_manifest, run_batch
+from .cache import DEFAULT_MAX_BYTES, TemplateCache, parse_digest
+from .download import ContentHash, download_file
+from .extract import StreamingUnsupportedError, default_write_workers, extract_stream, extract_zip, plan_merge
+from .release import ReleaseIndex, asset_layers, fetch_release, find_asset, has_template
+from .tools import CLAUDE_LOCAL_PATH, DEFAULT_PROBE_TIMEOUT, detect_tools, which
+from .upgrade import write_manifest
 
-ssl_context = truststore.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
-client = httpx.Client(verify=ssl_context)
+# httpx, truststore, readchar and the rich Live/Progress/Tree renderers are imported
+# on the code paths that use them so `specify --help` and `specify check` start fast.
+if TYPE_CHECKING:
+    import httpx
+
+
+@lru_cache(maxsize=None)
+def _ssl_context():
+    """Return the truststore-backed SSL context, built on first use."""
+    import ssl
+    import truststore
+    return truststore.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+
+
+def _http_client(skip_tls: bool = False, http2: bool = False) -> "httpx.Client":
+    """Create an HTTP client that verifies against the system trust store unless skip_tls is set.
+
+    http2 is honoured when the optional h2 package is installed (``specify-cli[http2]``).
+    """
+    import httpx
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            http2 = False
+    return httpx.Client(verify=False if skip_tls else _ssl_context(), http2=http2)
 
 def _github_token(cli_token: str | None = None) -> str | None:
     """Return sanitized GitHub token (cli arg takes precedence) or None."""
@@ -79,8 +107,21 @@ AI_CHOICES = {
 # Add script type choices
 SCRIPT_TYPE_CHOICES = {"sh": "POSIX Shell (bash/zsh)", "ps": "PowerShell"}
 
-# Claude CLI local installation path after migrate-installer
-CLAUDE_LOCAL_PATH = Path.home() / ".claude" / "local" / "claude"
+# Tools reported by `specify check`
+CHECK_TOOLS = {
+    "git": "Git version control",
+    "claude": "Claude Code CLI",
+    "gemini": "Gemini CLI",
+    "qwen": "Qwen Code CLI",
+    "code": "Visual Studio Code",
+    "code-insiders": "Visual Studio Code Insiders",
+    "cursor-agent": "Cursor IDE agent",
+    "windsurf": "Windsurf IDE",
+    "kilocode": "Kilo Code IDE",
+    "opencode": "opencode",
+    "codex": "Codex CLI",
+    "auggie": "Auggie CLI",
+}
 
 # ASCII Art Banner
 BANNER = """
@@ -93,23 +134,67 @@ BANNER = """
 """
 
 TAGLINE = "GitHub Spec Kit - Spec-Driven Development Toolkit"
+class _Step:
+    """One tracker row (slotted: batch runs create a tracker per project)."""
+
+    __slots__ = ("key", "label", "status", "detail", "started", "ended")
+
+    def __init__(self, key: str, label: str, status: str, detail: str):
+        self.key = key
+        self.label = label
+        self.status = status
+        self.detail = detail
+        # Seconds since the tracker's origin; set when the step starts and finishes
+        self.started: float | None = None
+        self.ended: float | None = None
+
+
 class StepTracker:
     """Track and render hierarchical steps without emojis, similar to Claude Code tree output.
-    Supports live auto-refresh via an attached refresh callback.
+
+    Steps live in an insertion-ordered dict, so updates are lookups rather than scans.
+    Pass the tracker itself to ``rich.live.Live``: it is a Rich renderable whose tree is
+    rebuilt only when a step changed since the last frame, so redraws are coalesced to the
+    Live refresh rate. A sink (see events.py) receives every change as an event dict, e.g.
+    for NDJSON output. An attached refresh callback is still called on every change.
+
+    Each step records when it started and finished (perf_counter seconds since origin). A
+    step finished without being started is taken to have started when the previous step
+    finished, which is where its time went in a sequential flow.
     """
-    def __init__(self, title: str):
+    def __init__(self, title: str, *, sink=None):
         self.title = title
-        self.steps = []  # list of dicts: {key, label, status, detail}
+        self._steps: dict[str, _Step] = {}
         self.status_order = {"pending": 0, "running": 1, "done": 2, "error": 3, "skipped": 4}
         self._refresh_cb = None  # callable to trigger UI refresh
+        self._sink = sink
+        self.origin = time.perf_counter()
+        self._cursor = 0.0  # when the most recent step finished
+        self._lock = threading.RLock()
+        self._version = 0
+        self._rendered = (-1, None)  # (version, Tree)
+
+    @property
+    def steps(self) -> list[_Step]:
+        with self._lock:
+            return list(self._steps.values())
 
     def attach_refresh(self, cb):
         self._refresh_cb = cb
 
-    def add(self, key: str, label: str):
-        if key not in [s["key"] for s in self.steps]:
-            self.steps.append({"key": key, "label": label, "status": "pending", "detail": ""})
-            self._maybe_refresh()
+    def add(self, key: str, label: str, after: str | None = None):
+        """Add a pending step at the end, or right after the step keyed after."""
+        with self._lock:
+            if key in self._steps:
+                return
+            step = _Step(key, label, "pending", "")
+            if after in self._steps:
+                items = list(self._steps.items())
+                at = list(self._steps).index(after) + 1
+                self._steps = dict(items[:at] + [(key, step)] + items[at:])
+            else:
+                self._steps[key] = step
+        self._changed(step)
 
     def start(self, key: str, detail: str = ""):
         self._update(key, status="running", detail=detail)
@@ -124,15 +209,32 @@ class StepTracker:
         self._update(key, status="skipped", detail=detail)
 
     def _update(self, key: str, status: str, detail: str):
-        for s in self.steps:
-            if s["key"] == key:
-                s["status"] = status
+        now = time.perf_counter() - self.origin
+        with self._lock:
+            step = self._steps.get(key)
+            if step is None:
+                # If not present, add it
+                step = self._steps[key] = _Step(key, key, status, detail)
+            else:
+                step.status = status
                 if detail:
-                    s["detail"] = detail
-                self._maybe_refresh()
-                return
-        # If not present, add it
-        self.steps.append({"key": key, "label": key, "status": status, "detail": detail})
+                    step.detail = detail
+            if status == "running":
+                step.started = now
+            else:
+                if step.started is None:
+                    step.started = self._cursor
+                step.ended = now
+                self._cursor = now
+        self._changed(step, now)
+
+    def _changed(self, step: _Step, now: float | None = None):
+        with self._lock:
+            self._version += 1
+            now = time.perf_counter() - self.origin if now is None else now
+            event = {"tracker": self.title, "key": step.key, "label": step.label, "status": step.status, "detail": step.detail, "t": round(now, 4)}
+        if self._sink is not None:
+            self._sink(event)
         self._maybe_refresh()
 
     def _maybe_refresh(self):
@@ -142,14 +244,29 @@ class StepTracker:
             except Exception:
                 pass
 
+    def __rich__(self):
+        return self.render()
+
     def render(self):
-        tree = Tree(f"[cyan]{self.title}[/cyan]", guide_style="grey50")
-        for step in self.steps:
-            label = step["label"]
-            detail_text = step["detail"].strip() if step["detail"] else ""
+        with self._lock:
+            version, tree = self._rendered
+            if version == self._version:
+                return tree
+            tree = self._build_tree()
+            self._rendered = (self._version, tree)
+            return tree
+
+    def _build_tree(self):
+        from rich.markup import escape
+        from rich.tree import Tree
+        tree = Tree(f"[cyan]{escape(self.title)}[/cyan]", guide_style="grey50")
+        for step in self._steps.values():
+            # Labels and details are plain text (task descriptions, file names)
+            label = escape(step.label)
+            detail_text = escape(step.detail.strip()) if step.detail else ""
 
             # Circles (unchanged styling)
-            status = step["status"]
+            status = step.status
             if status == "done":
                 symbol = "[green]●[/green]"
             elif status == "pending":
@@ -180,6 +297,68 @@ class StepTracker:
         return tree
 
 
+OUTPUT_CHOICES = ("text", "json")
+
+
+def _tracker_outputs(title: str, output: str, events_path: Path | None, stack: ExitStack) -> tuple[StepTracker, bool]:
+    """A StepTracker wired for the requested output; returns (tracker, show a live Rich tree).
+
+    json      NDJSON events on stdout (human-readable messages go to stderr)
+    text      a live tree on a terminal; plain "ok/FAILED/skipped" lines when piped
+    events_path additionally receives every event as NDJSON. Files are closed by stack.
+    """
+    from .events import NDJSONSink, TextSink, fan_out
+
+    sinks = []
+    live = False
+    if output == "json":
+        sinks.append(NDJSONSink(sys.stdout))
+    elif console.is_terminal:
+        live = True
+    else:
+        sinks.append(TextSink(sys.stdout))
+    if events_path:
+        sinks.append(NDJSONSink(stack.enter_context(open(events_path, "w", encoding="utf-8"))))
+    sink = sinks[0] if len(sinks) == 1 else (fan_out(*sinks) if sinks else None)
+    return StepTracker(title, sink=sink), live
+
+
+def _check_output(output: str) -> None:
+    if output not in OUTPUT_CHOICES:
+        console.print(f"[red]Error:[/red] Invalid output '{output}'. Choose from: {', '.join(OUTPUT_CHOICES)}")
+        raise typer.Exit(1)
+    if output == "json":
+        # Keep stdout for events
+        console.file = sys.stderr
+
+
+def _report_profile(profiler, tracker: StepTracker, path: Path) -> None:
+    """Print where the time went and write the Chrome trace for --profile."""
+    from rich.markup import escape
+
+    from . import profiling
+
+    profiler.add_steps(tracker)
+    profiler.finish()
+    profiling.stop()
+    total = profiler.now()
+    table = Table(show_header=True, header_style="cyan", box=None, padding=(0, 2), title="Profile", title_justify="left")
+    table.add_column("Phase", overflow="ellipsis", no_wrap=True, max_width=36)
+    for column in ("Kind", "Start", "Time", "Share"):
+        table.add_column(column, justify="left" if column == "Kind" else "right", style="dim" if column == "Kind" else None, no_wrap=True)
+    for name, category, start, duration in profiler.summary():
+        # HTTP sub-phases indented under their request
+        label = f"  {name}" if category == "http" and name in profiling.HTTP_PHASES.values() else name
+        table.add_row(escape(label), category, f"{start * 1000:,.0f} ms", f"{duration * 1000:,.1f} ms", f"{duration / total:.0%}" if total else "-")
+    console.print()
+    console.print(table)
+    try:
+        profiler.write_chrome_trace(path, {"command": "specify init", "python": sys.version.split()[0], "platform": sys.platform, "total_ms": round(total * 1000, 1)})
+    except OSError as e:
+        console.print(f"[red]Error:[/red] Could not write profile {path}: {e}")
+        raise typer.Exit(1)
+    console.print(f"[dim]{total:.2f}s total; trace written to {path} (open in chrome://tracing or https://ui.perfetto.dev)[/dim]")
+
 
 MINI_BANNER = """
 ╔═╗╔═╗╔═╗╔═╗╦╔═╗╦ ╦
@@ -189,6 +368,7 @@ MINI_BANNER = """
 
 def get_key():
     """Get a single keypress in a cross-platform way using readchar."""
+    import readchar
     key = readchar.readkey()
     
     # Arrow keys
@@ -259,6 +439,7 @@ def select_with_arrows(options: dict, prompt_text: str = "Select an option", def
 
     def run_selection_loop():
         nonlocal selected_key, selected_index
+        from rich.live import Live
         with Live(create_selection_panel(), console=console, transient=True, auto_refresh=False) as live:
             while True:
                 try:
@@ -358,32 +539,13 @@ def run_command(cmd: list[str], check_return: bool = True, capture: bool = False
         return None
 
 
-def check_tool_for_tracker(tool: str, tracker: StepTracker) -> bool:
-    """Check if a tool is installed and update tracker."""
-    if shutil.which(tool):
-        tracker.complete(tool, "available")
-        return True
-    else:
-        tracker.error(tool, "not found")
-        return False
-
-
 def check_tool(tool: str, install_hint: str) -> bool:
-    """Check if a tool is installed."""
-    
-    # Special handling for Claude CLI after `claude migrate-installer`
-    # See: https://github.com/github/spec-kit/issues/123
-    # The migrate-installer command REMOVES the original executable from PATH
-    # and creates an alias at ~/.claude/local/claude instead
-    # This path should be prioritized over other claude executables in PATH
-    if tool == "claude":
-        if CLAUDE_LOCAL_PATH.exists() and CLAUDE_LOCAL_PATH.is_file():
-            return True
-    
-    if shutil.which(tool):
-        return True
-    else:
-        return False
+    """Check if a tool is installed.
+
+    Lookups go through the shared PATH index, which also resolves the Claude CLI
+    alias at ~/.claude/local/claude left by `claude migrate-installer`.
+    """
+    return which(tool) is not None
 
 
 def is_git_repo(path: Path = None) -> bool:
@@ -407,166 +569,316 @@ def is_git_repo(path: Path = None) -> bool:
         return False
 
 
-def init_git_repo(project_path: Path, quiet: bool = False) -> bool:
-    """Initialize a git repository in the specified path.
+def init_git_repo(project_path: Path, quiet: bool = False, *, paths: list[str] | None = None, whole_tree: bool = False, tracker: StepTracker | None = None) -> dict | None:
+    """Initialize a git repository in the specified path with one initial commit.
     quiet: if True suppress console output (tracker handles status)
+    paths: commit only these project-relative files (the template's); None stages everything
+    whole_tree: commit the whole directory through one git fast-import stream
+    Returns the per-phase timings (see gitinit.init_repository), or None on failure.
+    With a tracker, the "git" step is completed with those timings.
     """
+    from .gitinit import GitInitError, describe, init_repository
+
     try:
-        original_cwd = Path.cwd()
-        os.chdir(project_path)
         if not quiet:
             console.print("[cyan]Initializing git repository...[/cyan]")
-        subprocess.run(["git", "init"], check=True, capture_output=True)
-        subprocess.run(["git", "add", "."], check=True, capture_output=True)
-        subprocess.run(["git", "commit", "-m", "Initial commit from Specify template"], check=True, capture_output=True)
-        if not quiet:
-            console.print("[green]✓[/green] Git repository initialized")
-        return True
-        
-    except subprocess.CalledProcessError as e:
+        # Never chdirs, so concurrent batch workers don't race on the process CWD
+        result = init_repository(project_path, paths, whole_tree=whole_tree)
+    except (GitInitError, OSError) as e:
+        if tracker:
+            tracker.error("git", f"init failed: {e}")
         if not quiet:
             console.print(f"[red]Error initializing git repository:[/red] {e}")
-        return False
-    finally:
-        os.chdir(original_cwd)
+        return None
+    if tracker:
+        tracker.complete("git", describe(result))
+    if not quiet:
+        console.print(f"[green]✓[/green] Git repository initialized [dim]{describe(result)}[/dim]")
+    return result
 
 
-def download_template_from_github(ai_assistant: str, download_dir: Path, *, script_type: str = "sh", verbose: bool = True, show_progress: bool = True, client: httpx.Client = None, debug: bool = False, github_token: str = None) -> Tuple[Path, dict]:
-    repo_owner = "github"
-    repo_name = "spec-kit"
-    if client is None:
-        client = httpx.Client(verify=ssl_context)
-    
+def _format_size(num_bytes: int) -> str:
+    """Human readable byte count (e.g. 1.5 MB)."""
+    size = float(num_bytes)
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:,.0f} {unit}" if unit == "B" else f"{size:,.1f} {unit}"
+        size /= 1024
+
+
+def _resolve_release(ai_assistant: str, script_type: str, *, verbose: bool, client: "httpx.Client", debug: bool, github_token: str | None, release: str | None, release_index: ReleaseIndex | None, template_source: str | None) -> tuple[dict, dict]:
+    """Look up the release to install from (GitHub or a template mirror); returns (release_data, info).
+
+    Prints the error and exits when the lookup fails.
+    """
     if verbose:
-        console.print("[cyan]Fetching latest release information...[/cyan]")
-    api_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/releases/latest"
-    
+        console.print(f"[cyan]Fetching {'release ' + release if release else 'latest release'} information...[/cyan]")
+
+    if template_source:
+        from .mirror import load_release
+        try:
+            release_data = load_release(template_source, client, tag=release)
+        except Exception as e:
+            console.print("[red]Error reading template mirror[/red]")
+            console.print(Panel(str(e), title="Mirror Error", border_style="red"))
+            raise typer.Exit(1)
+        return release_data, {"source": "mirror"}
+
     try:
-        response = client.get(
-            api_url,
-            timeout=30,
-            follow_redirects=True,
+        release_data, release_info = fetch_release(
+            client,
+            tag=release,
             headers=_github_auth_headers(github_token),
+            index=release_index,
+            debug=debug,
         )
-        status = response.status_code
-        if status != 200:
-            msg = f"GitHub API returned {status} for {api_url}"
-            if debug:
-                msg += f"\nResponse headers: {response.headers}\nBody (truncated 500): {response.text[:500]}"
-            raise RuntimeError(msg)
-        try:
-            release_data = response.json()
-        except ValueError as je:
-            raise RuntimeError(f"Failed to parse release JSON: {je}\nRaw (truncated 400): {response.text[:400]}")
+        if release_info["source"] == "index" and not has_template(release_data, ai_assistant, script_type):
+            # Stored copy may predate a newly uploaded asset; ask GitHub once
+            release_data, release_info = fetch_release(
+                client,
+                tag=release,
+                headers=_github_auth_headers(github_token),
+                index=release_index,
+                debug=debug,
+                refresh=True,
+            )
     except Exception as e:
         console.print(f"[red]Error fetching release information[/red]")
         console.print(Panel(str(e), title="Fetch Error", border_style="red"))
         raise typer.Exit(1)
-    
-    # Find the template asset for the specified AI assistant
-    assets = release_data.get("assets", [])
-    pattern = f"spec-kit-template-{ai_assistant}-{script_type}"
-    matching_assets = [
-        asset for asset in assets
-        if pattern in asset["name"] and asset["name"].endswith(".zip")
-    ]
 
-    asset = matching_assets[0] if matching_assets else None
+    if release_info["source"] == "stale" and verbose:
+        console.print(f"[yellow]Using stored release information[/yellow] ({release_info['reason']})")
+    return release_data, release_info
+
+
+def resolve_template_asset(ai_assistant: str, *, script_type: str = "sh", verbose: bool = True, client: "httpx.Client" = None, debug: bool = False, github_token: str = None, release: str | None = None, release_index: ReleaseIndex | None = None, release_data: dict | None = None, template_source: str | None = None, layer: str | None = None) -> dict:
+    """Find the release asset for ai_assistant/script_type and return its metadata.
+
+    release pins a tag instead of the latest release; release_data skips the lookup entirely
+    (used when one release answers many downloads). With a release_index, metadata is fetched
+    conditionally (ETag) and served from the stored copy when GitHub is rate limited or unreachable.
+    template_source reads the release from a template mirror instead of GitHub (see mirror.py).
+    layer picks the "base" or "overlay" archive of a layered release (see asset_layers).
+    """
+    if client is None:
+        client = _http_client()
+
+    if release_data is None:
+        release_data, release_info = _resolve_release(ai_assistant, script_type, verbose=verbose, client=client, debug=debug, github_token=github_token, release=release, release_index=release_index, template_source=template_source)
+    else:
+        release_info = {"source": "prefetched"}
+    asset = find_asset(release_data, ai_assistant, script_type, layer)
 
     if asset is None:
+        pattern = {"base": f"spec-kit-base-{script_type}", "overlay": f"spec-kit-overlay-{ai_assistant}-{script_type}"}.get(layer, f"spec-kit-template-{ai_assistant}-{script_type}")
         console.print(f"[red]No matching release asset found[/red] for [bold]{ai_assistant}[/bold] (expected pattern: [bold]{pattern}[/bold])")
-        asset_names = [a.get('name', '?') for a in assets]
+        asset_names = [a.get('name', '?') for a in release_data.get("assets", [])]
         console.print(Panel("\n".join(asset_names) or "(no assets)", title="Available Assets", border_style="yellow"))
         raise typer.Exit(1)
 
-    download_url = asset["browser_download_url"]
-    filename = asset["name"]
-    file_size = asset["size"]
-    
     if verbose:
-        console.print(f"[cyan]Found template:[/cyan] {filename}")
-        console.print(f"[cyan]Size:[/cyan] {file_size:,} bytes")
+        console.print(f"[cyan]Found template:[/cyan] {asset['name']}")
+        console.print(f"[cyan]Size:[/cyan] {asset['size']:,} bytes")
         console.print(f"[cyan]Release:[/cyan] {release_data['tag_name']}")
 
-    zip_path = download_dir / filename
+    return {
+        "filename": asset["name"],
+        "size": asset["size"],
+        "release": release_data["tag_name"],
+        "asset_url": asset["browser_download_url"],
+        "sha256": parse_digest(asset.get("digest")),
+        "release_source": release_info["source"],
+        "mirror": release_data.get("mirror"),
+    }
+
+
+def _asset_headers(meta: dict, github_token: str | None) -> dict:
+    """Request headers for downloading an asset: GitHub credentials never go to a mirror."""
+    return {} if meta.get("mirror") else _github_auth_headers(github_token)
+
+
+def _fetch_detail(release: str | None, template_source: str | None) -> str:
+    if release:
+        return f"release {release}"
+    return "reading template mirror" if template_source else "contacting GitHub API"
+
+
+def _is_file_source(template_source: str | None) -> bool:
+    if not template_source:
+        return False
+    from .mirror import parse_source
+    return parse_source(template_source)[0] == "file"
+
+
+def download_template_from_github(ai_assistant: str, download_dir: Path, *, script_type: str = "sh", verbose: bool = True, show_progress: bool = True, client: "httpx.Client" = None, debug: bool = False, github_token: str = None, cache: TemplateCache | None = None, release: str | None = None, release_index: ReleaseIndex | None = None, release_data: dict | None = None, segments: int = 1, template_source: str | None = None, layer: str | None = None) -> Tuple[Path, dict]:
+    """Resolve the release asset for ai_assistant/script_type and make it available locally.
+
+    With a cache, a hit returns the cached archive without downloading; a miss downloads the asset
+    into the cache and returns the cached path. Without a cache the archive is written to
+    download_dir and the caller owns it. Downloads are retried and resumed with HTTP Range
+    requests; segments > 1 fetches large assets as parallel ranges. An asset in a file://
+    mirror is verified and used in place (metadata["local"]); the caller must not delete it.
+    layer fetches the "base" or "overlay" archive of a layered release instead of the full one.
+    """
+    if client is None:
+        client = _http_client()
+
+    metadata = resolve_template_asset(
+        ai_assistant,
+        script_type=script_type,
+        verbose=verbose,
+        client=client,
+        debug=debug,
+        github_token=github_token,
+        release=release,
+        release_index=release_index,
+        release_data=release_data,
+        template_source=template_source,
+        layer=layer,
+    )
+    metadata["cached"] = cache is not None
+    metadata["cache_hit"] = False
+    metadata["local"] = False
+    download_url = metadata["asset_url"]
+    filename = metadata["filename"]
+    release_tag = metadata["release"]
+    expected_sha256 = metadata["sha256"]
+
+    if metadata["mirror"]:
+        from .mirror import local_asset, sha256_file
+        local_path = local_asset(download_url)
+        if local_path is not None:
+            try:
+                actual = sha256_file(local_path)
+                if expected_sha256 and actual != expected_sha256:
+                    raise ValueError(f"SHA-256 mismatch for {local_path} (expected {expected_sha256}, got {actual})")
+            except (OSError, ValueError) as e:
+                console.print("[red]Error reading template from mirror[/red]")
+                console.print(Panel(str(e), title="Mirror Error", border_style="red"))
+                raise typer.Exit(1)
+            if verbose:
+                console.print(f"[cyan]Using mirrored template:[/cyan] {local_path}")
+            metadata["local"] = True
+            return local_path, metadata
+
+    if cache is not None:
+        cached_path = cache.lookup(release_tag, filename, expected_sha256)
+        if cached_path is not None:
+            if verbose:
+                console.print(f"[cyan]Using cached template:[/cyan] {cached_path}")
+            metadata["cache_hit"] = True
+            return cached_path, metadata
+
+    # Cached downloads go to a stable partial path so an interrupted download resumes next time
+    target = cache.partial_path(release_tag, filename) if cache is not None else download_dir / filename
     if verbose:
         console.print(f"[cyan]Downloading template...[/cyan]")
-    
+
     try:
-        with client.stream(
-            "GET",
-            download_url,
-            timeout=60,
-            follow_redirects=True,
-            headers=_github_auth_headers(github_token),
-        ) as response:
-            if response.status_code != 200:
-                body_sample = response.text[:400]
-                raise RuntimeError(f"Download failed with {response.status_code}\nHeaders: {response.headers}\nBody (truncated): {body_sample}")
-            total_size = int(response.headers.get('content-length', 0))
-            with open(zip_path, 'wb') as f:
-                if total_size == 0:
-                    for chunk in response.iter_bytes(chunk_size=8192):
-                        f.write(chunk)
-                else:
-                    if show_progress:
-                        with Progress(
-                            SpinnerColumn(),
-                            TextColumn("[progress.description]{task.description}"),
-                            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-                            console=console,
-                        ) as progress:
-                            task = progress.add_task("Downloading...", total=total_size)
-                            downloaded = 0
-                            for chunk in response.iter_bytes(chunk_size=8192):
-                                f.write(chunk)
-                                downloaded += len(chunk)
-                                progress.update(task, completed=downloaded)
-                    else:
-                        for chunk in response.iter_bytes(chunk_size=8192):
-                            f.write(chunk)
+        if show_progress:
+            from rich.progress import Progress, SpinnerColumn, TextColumn
+            progress = Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+                console=console,
+            )
+        else:
+            progress = nullcontext()
+        with progress, (cache.download_lock(target) if cache is not None else nullcontext()):
+            # Another process may have finished this download while we waited for the lock
+            cached_path = cache.lookup(release_tag, filename, expected_sha256) if cache is not None else None
+            if cached_path is not None:
+                metadata["cache_hit"] = True
+                return cached_path, metadata
+            on_progress = None
+            content_hash = ContentHash() if cache is not None else None
+            if show_progress:
+                task = progress.add_task("Downloading...", total=metadata["size"] or None)
+                on_progress = lambda done, total: progress.update(task, completed=done, total=total)
+            download_file(
+                client,
+                download_url,
+                target,
+                headers=_asset_headers(metadata, github_token),
+                expected_size=metadata["size"] or None,
+                segments=segments,
+                on_progress=on_progress,
+                keep_partial=cache is not None,
+                content_hash=content_hash,
+            )
+            zip_path = cache.add_file(target, release_tag, filename, expected_sha256, sha256=content_hash.hexdigest) if cache is not None else target
     except Exception as e:
         console.print(f"[red]Error downloading template[/red]")
         detail = str(e)
-        if zip_path.exists():
-            zip_path.unlink()
+        if cache is None:
+            target.unlink(missing_ok=True)
         console.print(Panel(detail, title="Download Error", border_style="red"))
         raise typer.Exit(1)
     if verbose:
         console.print(f"Downloaded: {filename}")
-    metadata = {
-        "filename": filename,
-        "size": file_size,
-        "release": release_data["tag_name"],
-        "asset_url": download_url
-    }
     return zip_path, metadata
 
 
-def download_and_extract_template(project_path: Path, ai_assistant: str, script_type: str, is_current_dir: bool = False, *, verbose: bool = True, tracker: StepTracker | None = None, client: httpx.Client = None, debug: bool = False, github_token: str = None) -> Path:
+def download_and_extract_template(project_path: Path, ai_assistant: str, script_type: str, is_current_dir: bool = False, *, verbose: bool = True, tracker: StepTracker | None = None, client: "httpx.Client" = None, debug: bool = False, github_token: str = None, cache: TemplateCache | None = None, release: str | None = None, release_index: ReleaseIndex | None = None, backup: bool = False, segments: int = 1, template_source: str | None = None) -> dict:
     """Download the latest release and extract it to create a new project.
-    Returns project_path. Uses tracker if provided (with keys: fetch, download, extract, cleanup)
+    Returns the extraction stats ("paths" lists the template files now in project_path,
+    "release" the tag they came from).
+    Uses tracker if provided (with keys: fetch, download, extract, overlay, cleanup)
+
+    Without a cache there is nothing worth keeping on disk, so a new project is decompressed
+    straight from the HTTP response; with a cache it is extracted from the cached file. Merges
+    into an existing directory always go through a file so the merge can be planned first.
+    A layered release (see asset_layers) is installed as its base plus the agent's overlay,
+    so the cached base serves every agent; older releases use the full archive.
     """
     current_dir = Path.cwd()
-    
+    if client is None:
+        client = _http_client()
+
+    if cache is None and not is_current_dir and not _is_file_source(template_source):
+        try:
+            return _stream_template(project_path, ai_assistant, script_type, is_current_dir, verbose=verbose, tracker=tracker, client=client, debug=debug, github_token=github_token, release=release, release_index=release_index, template_source=template_source)
+        except StreamingUnsupportedError as e:
+            # Unusual archive layout or an interrupted stream; start over with a regular
+            # (retrying, resumable) download
+            if not is_current_dir and project_path.exists():
+                shutil.rmtree(project_path)
+            if tracker:
+                tracker.start("download", f"streaming failed ({e}), downloading")
+            elif verbose:
+                console.print(f"[yellow]Streaming extraction failed ({e}); downloading archive instead[/yellow]")
+
     # Step: fetch + download combined
     if tracker:
-        tracker.start("fetch", "contacting GitHub API")
+        tracker.start("fetch", _fetch_detail(release, template_source))
     try:
-        zip_path, meta = download_template_from_github(
+        release_data, release_info = _resolve_release(ai_assistant, script_type, verbose=verbose and tracker is None, client=client, debug=debug, github_token=github_token, release=release, release_index=release_index, template_source=template_source)
+        layers = asset_layers(release_data, ai_assistant, script_type)
+        downloads = _download_layers(
             ai_assistant,
+            layers,
             current_dir,
             script_type=script_type,
             verbose=verbose and tracker is None,
-            show_progress=(tracker is None),
+            show_progress=tracker is None and len(layers) == 1,
             client=client,
             debug=debug,
-            github_token=github_token
+            github_token=github_token,
+            cache=cache,
+            release_data=release_data,
+            segments=segments,
         )
+        metas = [meta for _, meta in downloads]
+        for meta in metas:
+            meta["release_source"] = release_info["source"]
         if tracker:
-            tracker.complete("fetch", f"release {meta['release']} ({meta['size']:,} bytes)")
+            _complete_fetch(tracker, {**metas[0], "size": sum(m["size"] for m in metas)})
             tracker.add("download", "Download template")
-            tracker.complete("download", meta['filename'])
+            notes = [_download_note(m) for m in metas]
+            detail = ", ".join(m["filename"] + note for m, note in zip(metas, notes))
+            (tracker.complete if "" in notes else tracker.skip)("download", detail)
     except Exception as e:
         if tracker:
             tracker.error("fetch", str(e))
@@ -575,6 +887,347 @@ def download_and_extract_template(project_path: Path, ai_assistant: str, script_
                 console.print(f"[red]Error downloading template:[/red] {e}")
         raise
     
+    try:
+        stats = extract_template(downloads[0][0], project_path, is_current_dir, verbose=verbose, tracker=tracker, debug=debug, backup=backup, strip_root=len(downloads) == 1)
+        if len(downloads) > 1:
+            if tracker:
+                tracker.add("overlay", f"Apply {ai_assistant} overlay", after="extracted-summary")
+            try:
+                overlay = _apply_overlay(downloads[1][0], project_path, key="overlay", tracker=tracker, backup=backup)
+            except Exception as e:
+                _extraction_failed(e, project_path, is_current_dir, verbose=verbose, tracker=None, debug=debug)
+            _combine_stats(stats, overlay)
+            if verbose and not tracker:
+                console.print(f"[cyan]Applied {ai_assistant} overlay:[/cyan] {len(overlay['written'])} files written")
+        stats["release"] = metas[0]["release"]
+    finally:
+        if tracker:
+            tracker.add("cleanup", "Remove temporary archive" if len(downloads) == 1 else "Remove temporary archives")
+        # Cached and mirrored archives are shared between runs; only remove one-off downloads
+        if metas[0]["local"]:
+            if tracker:
+                tracker.skip("cleanup", "archive read from mirror")
+        elif metas[0]["cached"]:
+            if tracker:
+                tracker.skip("cleanup", "archive kept in cache")
+        else:
+            _discard_downloads(downloads)
+            if tracker:
+                tracker.complete("cleanup")
+            elif verbose:
+                console.print(f"Cleaned up: {', '.join(m['filename'] for m in metas)}")
+    
+    return stats
+
+
+def _download_layers(ai_assistant: str, layers: tuple[str | None, ...], download_dir: Path, **kwargs) -> list[tuple[Path, dict]]:
+    """Download the archives of one template (see asset_layers) concurrently; returns them in layer order.
+
+    kwargs go to download_template_from_github. When one download fails, the one-off
+    archives the others wrote are removed before the error is raised.
+    """
+    return _download_archives([(ai_assistant, layer) for layer in layers], download_dir, **kwargs)
+
+
+def _download_archives(archives: list[tuple[str, str | None]], download_dir: Path, **kwargs) -> list[tuple[Path, dict]]:
+    """Download (agent, layer) archives concurrently, like _download_layers; returns them in order."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=len(archives)) as pool:
+        futures = [pool.submit(download_template_from_github, ai, download_dir, layer=layer, **kwargs) for ai, layer in archives]
+    downloads = [f.result() for f in futures if f.exception() is None]
+    failed = next((f.exception() for f in futures if f.exception() is not None), None)
+    if failed is not None:
+        _discard_downloads(downloads)
+        raise failed
+    return downloads
+
+
+def _discard_downloads(downloads: list[tuple[Path, dict]]) -> None:
+    """Remove downloaded archives that are neither cached nor read from a mirror."""
+    for zip_path, meta in downloads:
+        if not (meta["cached"] or meta["local"]):
+            zip_path.unlink(missing_ok=True)
+
+
+def _combine_stats(stats: dict, layer: dict) -> None:
+    """Fold the extraction stats of a later layer into stats."""
+    for field in ("files", "dirs", "bytes", "skipped", "executable"):
+        stats[field] += layer[field]
+    # Layers come from one packager run: a layer with usable modes (the base, which holds
+    # the scripts) vouches for overlays that simply have nothing executable
+    stats["modes"] = stats["modes"] or layer["modes"]
+    for field in ("backed_up", "top_level", "written", "paths"):
+        stats[field] = sorted(set(stats[field]).union(layer[field]))
+
+
+def _download_note(meta: dict) -> str:
+    return " (mirror)" if meta["local"] else " (cached)" if meta["cache_hit"] else ""
+
+
+def _apply_overlay(zip_path: Path, project_path: Path, *, key: str, tracker: StepTracker | None, backup: bool, exclude: tuple[str, ...] = (), strip_root: bool = False) -> dict:
+    """Merge an overlay archive into what earlier layers wrote to project_path; returns its extraction stats.
+
+    Errors are marked on the tracker step key and raised. strip_root is for full archives
+    used as overlays, which may be wrapped in a single directory; layer archives never are.
+    """
+    if tracker:
+        tracker.start(key)
+    try:
+        with zipfile.ZipFile(zip_path) as zip_ref:
+            plan = plan_merge(zip_ref, project_path, strip_root=strip_root, exclude=exclude)
+            stats = extract_zip(zip_ref, project_path, strip_root=strip_root, plan=plan, backup=backup, workers=default_write_workers(), exclude=exclude)
+    except Exception as e:
+        if tracker:
+            tracker.error(key, str(e))
+        raise
+    if tracker:
+        tracker.complete(key, f"{len(stats['written'])} written, {stats['skipped']} unchanged")
+    return stats
+
+
+def _fetch_release_data(client: "httpx.Client", *, release: str | None, release_index: ReleaseIndex | None, github_token: str | None, debug: bool, template_source: str | None) -> tuple[dict, dict]:
+    """One release lookup (GitHub or a template mirror) for callers that download several assets."""
+    if template_source:
+        from .mirror import load_release
+        return load_release(template_source, client, tag=release), {"source": "mirror"}
+    return fetch_release(client, tag=release, headers=_github_auth_headers(github_token), index=release_index, debug=debug)
+
+
+def download_and_extract_templates(project_path: Path, agents: list[str], script_type: str, is_current_dir: bool = False, *, tracker: StepTracker | None = None, client: "httpx.Client" = None, debug: bool = False, github_token: str = None, cache: TemplateCache | None = None, release: str | None = None, release_index: ReleaseIndex | None = None, backup: bool = False, segments: int = 1, template_source: str | None = None) -> dict:
+    """Set up project_path for several agents at once; returns the extraction stats of the layered result.
+
+    One release lookup answers every agent. The archives download concurrently over the
+    shared client (one connection pool), and each is extracted as soon as it and every
+    archive before it have arrived while the rest are still downloading, so the wall time
+    approaches that of the slowest download and later layers still win.
+    From a layered release the shared base is downloaded once and every agent's overlay is
+    laid over it; otherwise the first agent's full archive is extracted and the others only
+    add what lies outside .specify/ (their command directories), so the shared payload is
+    written once either way.
+    Uses tracker keys: fetch, download-base and download-<agent>, extract (base or first
+    agent), overlay-<agent>, cleanup.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    if client is None:
+        client = _http_client()
+    primary = agents[0]
+    if tracker:
+        tracker.start("fetch", _fetch_detail(release, template_source))
+    try:
+        release_data, release_info = _fetch_release_data(client, release=release, release_index=release_index, github_token=github_token, debug=debug, template_source=template_source)
+    except Exception as e:
+        if tracker:
+            tracker.error("fetch", str(e))
+        raise
+    if tracker:
+        tracker.complete("fetch", f"release {release_data['tag_name']} ({len(agents)} templates{_SOURCE_NOTES.get(release_info['source'], '')})")
+
+    # The first archive is extracted in full with the tracker's extract steps and the rest
+    # are merged over it
+    archives = _template_archives(release_data, agents, script_type)
+    layered = archives[0][2] == "base"
+    if layered:
+        if tracker:
+            tracker.add("download-base", "Download shared base", after="fetch")
+            tracker.add(f"overlay-{primary}", f"Add {primary} commands", after="extracted-summary")
+    first = archives[0][0]
+
+    if not is_current_dir:
+        project_path.mkdir(parents=True)
+    paths = set()
+    stats = None
+    with tempfile.TemporaryDirectory(prefix="specify-templates-") as download_dir, ThreadPoolExecutor(max_workers=len(archives)) as pool:
+        def download(name: str, ai: str, layer: str | None):
+            if tracker:
+                tracker.start(f"download-{name}")
+            return download_template_from_github(ai, Path(download_dir), script_type=script_type, verbose=False, show_progress=False, client=client, debug=debug, github_token=github_token, cache=cache, release_data=release_data, segments=segments, layer=layer)
+
+        futures = {pool.submit(download, name, ai, layer): index for index, (name, ai, layer, exclude) in enumerate(archives)}
+        # Layers are applied in archive order (later ones win where they overlap), so an
+        # archive that arrives early waits here until the ones before it are extracted
+        arrived = {}
+        applied = 0
+        try:
+            for future in as_completed(futures):
+                index = futures[future]
+                name = archives[index][0]
+                try:
+                    arrived[index], meta = future.result()
+                except Exception as e:
+                    if tracker:
+                        tracker.error(f"download-{name}", str(e) or "download failed")
+                    raise
+                if tracker:
+                    note = _download_note(meta)
+                    (tracker.skip if note else tracker.complete)(f"download-{name}", meta["filename"] + note)
+                while applied in arrived:
+                    name, _, _, exclude = archives[applied]
+                    zip_path = arrived.pop(applied)
+                    # Every layer merges into the directory the earlier layers started
+                    if name == first:
+                        result = stats = extract_template(zip_path, project_path, True, verbose=False, tracker=tracker, debug=debug, backup=backup, strip_root=not layered)
+                    else:
+                        result = _apply_overlay(zip_path, project_path, key=f"overlay-{name}", tracker=tracker, backup=backup, exclude=exclude, strip_root=not layered)
+                    paths.update(result["paths"])
+                    applied += 1
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    if tracker:
+        tracker.add("cleanup", "Remove temporary archives")
+        tracker.complete("cleanup")
+    stats["paths"] = sorted(paths)
+    stats["release"] = release_data["tag_name"]
+    return stats
+
+
+def _template_archives(release_data: dict, agents: list[str], script_type: str) -> list[tuple[str, str, str | None, tuple[str, ...]]]:
+    """(name, agent, layer, exclude) of every archive the template for agents is made of, in the order they are applied.
+
+    From a layered release that is the shared base and every agent's overlay; otherwise
+    each agent's full archive. Agents after the first only add what lies outside .specify/.
+    """
+    primary = agents[0]
+    if all(asset_layers(release_data, ai, script_type) != (None,) for ai in agents):
+        return [("base", primary, "base", ())] + [(ai, ai, "overlay", () if ai == primary else (".specify",)) for ai in agents]
+    return [(ai, ai, None, () if ai == primary else (".specify",)) for ai in agents]
+
+
+_SOURCE_NOTES = {"not-modified": ", not modified", "stale": ", stored copy", "index": ", pinned", "mirror": ", mirror"}
+
+
+def _complete_fetch(tracker: StepTracker, meta: dict) -> None:
+    tracker.complete("fetch", f"release {meta['release']} ({meta['size']:,} bytes{_SOURCE_NOTES.get(meta['release_source'], '')})")
+
+
+def _stream_template(project_path: Path, ai_assistant: str, script_type: str, is_current_dir: bool, *, verbose: bool, tracker: StepTracker | None, client: "httpx.Client", debug: bool, github_token: str | None, release: str | None, release_index: ReleaseIndex | None, template_source: str | None = None) -> dict:
+    """Decompress the template directly from the download stream into project_path; returns the extraction stats.
+
+    The base and overlay of a layered release are streamed one after the other. Raises
+    StreamingUnsupportedError when an archive cannot be streamed or the connection drops,
+    so the caller can fall back to a resumable download.
+    """
+    import httpx
+
+    if tracker:
+        tracker.start("fetch", _fetch_detail(release, template_source))
+    try:
+        release_data, release_info = _resolve_release(ai_assistant, script_type, verbose=verbose and tracker is None, client=client, debug=debug, github_token=github_token, release=release, release_index=release_index, template_source=template_source)
+        layers = asset_layers(release_data, ai_assistant, script_type)
+        metas = [resolve_template_asset(ai_assistant, script_type=script_type, verbose=verbose and tracker is None, client=client, release_data=release_data, layer=layer) for layer in layers]
+    except Exception as e:
+        if tracker:
+            tracker.error("fetch", str(e))
+        raise
+    for meta in metas:
+        meta["release_source"] = release_info["source"]
+    if tracker:
+        _complete_fetch(tracker, {**metas[0], "size": sum(m["size"] for m in metas)})
+        tracker.add("download", "Download template")
+        tracker.start("download", "streaming")
+        tracker.add("extract", "Extract template")
+        tracker.start("extract")
+    elif verbose:
+        console.print("[cyan]Downloading and extracting template...[/cyan]")
+
+    try:
+        if not is_current_dir:
+            project_path.mkdir(parents=True)
+        stats = None
+        for meta in metas:
+            with client.stream(
+                "GET",
+                meta["asset_url"],
+                timeout=60,
+                follow_redirects=True,
+                headers=_asset_headers(meta, github_token),
+            ) as response:
+                if response.status_code != 200:
+                    body_sample = response.read()[:400]
+                    raise RuntimeError(f"Download failed with {response.status_code}\nHeaders: {response.headers}\nBody (truncated): {body_sample!r}")
+                layer_stats = extract_stream(response.iter_bytes(chunk_size=64 * 1024), project_path, strip_root=len(metas) == 1)
+            if stats is None:
+                stats = layer_stats
+            else:
+                _combine_stats(stats, layer_stats)
+    except StreamingUnsupportedError:
+        raise
+    except httpx.TransportError as e:
+        raise StreamingUnsupportedError(f"stream interrupted: {e}") from e
+    except Exception as e:
+        if tracker:
+            tracker.error("download", "stream interrupted")
+        _extraction_failed(e, project_path, is_current_dir, verbose=verbose, tracker=tracker, debug=debug)
+
+    if tracker:
+        tracker.complete("download", ", ".join(m["filename"] for m in metas) + " (streamed)")
+        tracker.skip("zip-list", "streamed")
+    _report_extraction(stats, project_path, is_current_dir, verbose=verbose, tracker=tracker)
+    if tracker:
+        tracker.complete("extract")
+        tracker.add("cleanup", "Remove temporary archive")
+        tracker.skip("cleanup", "archive never written to disk")
+    stats["release"] = metas[0]["release"]
+    return stats
+
+
+def _merge_plan_summary(plan: dict) -> str:
+    return f"{len(plan['new'])} new, {len(plan['changed'])} changed, {len(plan['identical'])} identical"
+
+
+def _report_extraction(stats: dict, project_path: Path, is_current_dir: bool, *, verbose: bool, tracker: StepTracker | None) -> None:
+    top_level = stats["top_level"]
+    if tracker:
+        tracker.start("extracted-summary")
+        detail = f"{stats['files']} files written, {len(top_level)} top-level items"
+        if stats["skipped"]:
+            detail += f", {stats['skipped']} unchanged skipped"
+        tracker.complete("extracted-summary", detail)
+        if stats["backed_up"]:
+            tracker.add("backup", "Back up changed files")
+            tracker.complete("backup", f"{len(stats['backed_up'])} saved as *.bak")
+        if stats["root"]:
+            tracker.add("flatten", "Flatten nested directory")
+            tracker.complete("flatten", f"stripped {stats['root']}/")
+    elif verbose:
+        console.print(f"[cyan]Extracted {stats['files']} files to {project_path}:[/cyan]")
+        for name in top_level:
+            console.print(f"  - {name}")
+        if stats["root"]:
+            console.print(f"[cyan]Flattened nested directory structure[/cyan]")
+        if stats["skipped"]:
+            console.print(f"[cyan]Skipped {stats['skipped']} unchanged file(s)[/cyan]")
+        for rel in stats["backed_up"]:
+            console.print(f"[yellow]Backed up:[/yellow] {rel} -> {rel}.bak")
+        if is_current_dir:
+            console.print(f"[cyan]Template files merged into current directory[/cyan]")
+
+
+def _extraction_failed(e: Exception, project_path: Path, is_current_dir: bool, *, verbose: bool, tracker: StepTracker | None, debug: bool) -> None:
+    if tracker:
+        tracker.error("extract", str(e))
+    else:
+        if verbose:
+            console.print(f"[red]Error extracting template:[/red] {e}")
+            if debug:
+                console.print(Panel(str(e), title="Extraction Error", border_style="red"))
+    # Clean up project directory if created and not current directory
+    if not is_current_dir and project_path.exists():
+        shutil.rmtree(project_path)
+    raise typer.Exit(1)
+
+
+def extract_template(zip_path: Path, project_path: Path, is_current_dir: bool = False, *, verbose: bool = True, tracker: StepTracker | None = None, debug: bool = False, backup: bool = False, exclude: tuple[str, ...] = (), strip_root: bool = True) -> dict:
+    """Extract a template archive into project_path (merging into it when is_current_dir); returns the extraction stats.
+    Members are written straight to their final path with any single root directory stripped
+    (unless strip_root is off: a layered base holds nothing but .specify/).
+    Merges are planned first: identical files are skipped, changed files overwritten (or
+    renamed to *.bak first when backup is set). Top-level directories in exclude are skipped.
+    Uses tracker if provided (with keys: extract, zip-list, merge-plan, extracted-summary, flatten)
+    """
     if tracker:
         tracker.add("extract", "Extract template")
         tracker.start("extract")
@@ -587,124 +1240,44 @@ def download_and_extract_template(project_path: Path, ai_assistant: str, script_
             project_path.mkdir(parents=True)
         
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            # List all files in the ZIP for debugging
-            zip_contents = zip_ref.namelist()
+            entries = len(zip_ref.infolist())
             if tracker:
                 tracker.start("zip-list")
-                tracker.complete("zip-list", f"{len(zip_contents)} entries")
+                tracker.complete("zip-list", f"{entries} entries")
             elif verbose:
-                console.print(f"[cyan]ZIP contains {len(zip_contents)} items[/cyan]")
-            
-            # For current directory, extract to a temp location first
+                console.print(f"[cyan]ZIP contains {entries} items[/cyan]")
+            plan = None
             if is_current_dir:
-                with tempfile.TemporaryDirectory() as temp_dir:
-                    temp_path = Path(temp_dir)
-                    zip_ref.extractall(temp_path)
-                    
-                    # Check what was extracted
-                    extracted_items = list(temp_path.iterdir())
-                    if tracker:
-                        tracker.start("extracted-summary")
-                        tracker.complete("extracted-summary", f"temp {len(extracted_items)} items")
-                    elif verbose:
-                        console.print(f"[cyan]Extracted {len(extracted_items)} items to temp location[/cyan]")
-                    
-                    # Handle GitHub-style ZIP with a single root directory
-                    source_dir = temp_path
-                    if len(extracted_items) == 1 and extracted_items[0].is_dir():
-                        source_dir = extracted_items[0]
-                        if tracker:
-                            tracker.add("flatten", "Flatten nested directory")
-                            tracker.complete("flatten")
-                        elif verbose:
-                            console.print(f"[cyan]Found nested directory structure[/cyan]")
-                    
-                    # Copy contents to current directory
-                    for item in source_dir.iterdir():
-                        dest_path = project_path / item.name
-                        if item.is_dir():
-                            if dest_path.exists():
-                                if verbose and not tracker:
-                                    console.print(f"[yellow]Merging directory:[/yellow] {item.name}")
-                                # Recursively copy directory contents
-                                for sub_item in item.rglob('*'):
-                                    if sub_item.is_file():
-                                        rel_path = sub_item.relative_to(item)
-                                        dest_file = dest_path / rel_path
-                                        dest_file.parent.mkdir(parents=True, exist_ok=True)
-                                        shutil.copy2(sub_item, dest_file)
-                            else:
-                                shutil.copytree(item, dest_path)
-                        else:
-                            if dest_path.exists() and verbose and not tracker:
-                                console.print(f"[yellow]Overwriting file:[/yellow] {item.name}")
-                            shutil.copy2(item, dest_path)
-                    if verbose and not tracker:
-                        console.print(f"[cyan]Template files merged into current directory[/cyan]")
-            else:
-                # Extract directly to project directory (original behavior)
-                zip_ref.extractall(project_path)
-                
-                # Check what was extracted
-                extracted_items = list(project_path.iterdir())
+                plan = plan_merge(zip_ref, project_path, strip_root=strip_root, exclude=exclude)
                 if tracker:
-                    tracker.start("extracted-summary")
-                    tracker.complete("extracted-summary", f"{len(extracted_items)} top-level items")
+                    tracker.add("merge-plan", "Plan merge")
+                    tracker.complete("merge-plan", _merge_plan_summary(plan))
                 elif verbose:
-                    console.print(f"[cyan]Extracted {len(extracted_items)} items to {project_path}:[/cyan]")
-                    for item in extracted_items:
-                        console.print(f"  - {item.name} ({'dir' if item.is_dir() else 'file'})")
-                
-                # Handle GitHub-style ZIP with a single root directory
-                if len(extracted_items) == 1 and extracted_items[0].is_dir():
-                    # Move contents up one level
-                    nested_dir = extracted_items[0]
-                    temp_move_dir = project_path.parent / f"{project_path.name}_temp"
-                    # Move the nested directory contents to temp location
-                    shutil.move(str(nested_dir), str(temp_move_dir))
-                    # Remove the now-empty project directory
-                    project_path.rmdir()
-                    # Rename temp directory to project directory
-                    shutil.move(str(temp_move_dir), str(project_path))
-                    if tracker:
-                        tracker.add("flatten", "Flatten nested directory")
-                        tracker.complete("flatten")
-                    elif verbose:
-                        console.print(f"[cyan]Flattened nested directory structure[/cyan]")
-                    
+                    console.print(f"[cyan]Merge plan:[/cyan] {_merge_plan_summary(plan)}")
+            stats = extract_zip(zip_ref, project_path, strip_root=strip_root, plan=plan, backup=backup, workers=default_write_workers(), exclude=exclude)
+        _report_extraction(stats, project_path, is_current_dir, verbose=verbose, tracker=tracker)
     except Exception as e:
-        if tracker:
-            tracker.error("extract", str(e))
-        else:
-            if verbose:
-                console.print(f"[red]Error extracting template:[/red] {e}")
-                if debug:
-                    console.print(Panel(str(e), title="Extraction Error", border_style="red"))
-        # Clean up project directory if created and not current directory
-        if not is_current_dir and project_path.exists():
-            shutil.rmtree(project_path)
-        raise typer.Exit(1)
+        _extraction_failed(e, project_path, is_current_dir, verbose=verbose, tracker=tracker, debug=debug)
     else:
         if tracker:
             tracker.complete("extract")
-    finally:
-        if tracker:
-            tracker.add("cleanup", "Remove temporary archive")
-        # Clean up downloaded ZIP file
-        if zip_path.exists():
-            zip_path.unlink()
-            if tracker:
-                tracker.complete("cleanup")
-            elif verbose:
-                console.print(f"Cleaned up: {zip_path.name}")
-    
-    return project_path
 
+    return stats
 
-def ensure_executable_scripts(project_path: Path, tracker: StepTracker | None = None) -> None:
-    """Ensure POSIX .sh scripts under .specify/scripts (recursively) have execute bits (no-op on Windows)."""
+
+def ensure_executable_scripts(project_path: Path, tracker: StepTracker | None = None, extraction: dict | None = None) -> None:
+    """Ensure POSIX .sh scripts under .specify/scripts (recursively) have execute bits (no-op on Windows).
+
+    When the extraction stats show that the archive carried Unix modes, extraction already
+    applied them and nothing is walked; the scan only serves archives without modes.
+    """
     if os.name == "nt":
         return  # Windows: skip silently
+    if extraction and extraction.get("modes"):
+        if tracker:
+            tracker.add("chmod", "Set script permissions recursively")
+            tracker.complete("chmod", f"{extraction['executable']} set from archive modes")
+        return
     scripts_root = project_path / ".specify" / "scripts"
     if not scripts_root.is_dir():
         return
@@ -748,7 +1321,7 @@ def ensure_executable_scripts(project_path: Path, tracker: StepTracker | None =
 @app.command()
 def init(
     project_name: str = typer.Argument(None, help="Name for your new project directory (optional if using --here)"),
-    ai_assistant: str = typer.Option(None, "--ai", help="AI assistant to use: claude, gemini, copilot, cursor, qwen, opencode, codex, windsurf, kilocode, or auggie"),
+    ai_assistant: str = typer.Option(None, "--ai", help="AI assistant to use: claude, gemini, copilot, cursor, qwen, opencode, codex, windsurf, kilocode, or auggie (comma-separate several, e.g. claude,copilot)"),
     script_type: str = typer.Option(None, "--script", help="Script type to use: sh or ps"),
     ignore_agent_tools: bool = typer.Option(False, "--ignore-agent-tools", help="Skip checks for AI agent tools like Claude Code"),
     no_git: bool = typer.Option(False, "--no-git", help="Skip git repository initialization"),
@@ -757,6 +1330,19 @@ def init(
     skip_tls: bool = typer.Option(False, "--skip-tls", help="Skip SSL/TLS verification (not recommended)"),
     debug: bool = typer.Option(False, "--debug", help="Show verbose diagnostic output for network and extraction failures"),
     github_token: str = typer.Option(None, "--github-token", help="GitHub token to use for API requests (or set GH_TOKEN or GITHUB_TOKEN environment variable)"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Do not read or write the local template and release metadata cache"),
+    release: str = typer.Option(None, "--release", help="Use a specific template release tag (e.g. v0.0.17) instead of the latest"),
+    batch: Path = typer.Option(None, "--batch", help="Provision every project listed in a manifest (.json or .toml) instead of a single project"),
+    workers: int = typer.Option(None, "--workers", help="Worker threads for --batch (default: number of CPUs)"),
+    batch_summary: Path = typer.Option(None, "--batch-summary", help="Write a JSON summary of a --batch run to this file"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="With --here, show which template files would be added, changed or left untouched, then exit"),
+    backup: bool = typer.Option(False, "--backup", help="With --here, keep a .bak copy of every existing file the template changes"),
+    download_segments: int = typer.Option(1, "--download-segments", min=1, max=16, help="Fetch large template assets as this many parallel ranged segments"),
+    git_whole_tree: bool = typer.Option(False, "--git-whole-tree", help="With --here, commit the whole directory (respecting .gitignore) instead of only the template files"),
+    output: str = typer.Option("text", "--output", help="Progress output: text (live tree on a terminal, plain lines otherwise) or json (NDJSON step events on stdout)"),
+    events: Path = typer.Option(None, "--events", help="Also write every step event as NDJSON to this file"),
+    profile: Path = typer.Option(None, "--profile", help="Time every step and HTTP phase, print a summary table and write a Chrome/Perfetto trace to this file"),
+    template_source: str = typer.Option(None, "--template-source", envvar="SPECIFY_TEMPLATE_SOURCE", help="Read releases from a template mirror (file:// directory or http(s):// base URL, see 'specify mirror sync') instead of GitHub"),
 ):
     """
     Initialize a new Specify project from the latest template.
@@ -783,11 +1369,38 @@ def init(
         specify init --ignore-agent-tools my-project
         specify init --here --ai claude
         specify init --here --ai codex
+        specify init --here --ai claude,copilot,cursor  # Several agents in one repository
         specify init --here
         specify init --here --force  # Skip confirmation when current directory not empty
+        specify init --here --ai claude --dry-run  # Preview the merge without writing
+        specify init --here --ai claude --git-whole-tree  # Commit existing files too
+        specify init my-project --ai claude --no-cache  # Always download a fresh template
+        specify init my-project --ai claude --release v0.0.17
+        specify init my-project --ai claude --template-source file:///srv/spec-kit-mirror
+        specify init --batch projects.toml --workers 8 --batch-summary summary.json
+        specify init my-project --ai claude --output json  # NDJSON progress events for CI
     """
+    _check_output(output)
+    if template_source:
+        from .mirror import MirrorError, parse_source
+        try:
+            parse_source(template_source)
+        except MirrorError as e:
+            console.print(f"[red]Error:[/red] {e}")
+            raise typer.Exit(1)
     # Show banner first
-    show_banner()
+    if output == "text":
+        show_banner()
+
+    if batch:
+        if here or project_name:
+            console.print("[red]Error:[/red] Cannot combine --batch with a project name or --here flag")
+            raise typer.Exit(1)
+        if profile:
+            console.print("[red]Error:[/red] --profile times a single project; it cannot be combined with --batch")
+            raise typer.Exit(1)
+        _init_batch(batch, workers=workers, summary_path=batch_summary, skip_tls=skip_tls, debug=debug, github_token=github_token, no_cache=no_cache, release=release, template_source=template_source)
+        return
     
     # Validate arguments
     if here and project_name:
@@ -797,6 +1410,10 @@ def init(
     if not here and not project_name:
         console.print("[red]Error:[/red] Must specify either a project name or use --here flag")
         raise typer.Exit(1)
+
+    if dry_run and not here:
+        console.print("[red]Error:[/red] --dry-run previews a merge and requires the --here flag")
+        raise typer.Exit(1)
     
     # Determine project directory
     if here:
@@ -807,10 +1424,13 @@ def init(
         existing_items = list(project_path.iterdir())
         if existing_items:
             console.print(f"[yellow]Warning:[/yellow] Current directory is not empty ({len(existing_items)} items)")
-            console.print("[yellow]Template files will be merged with existing content and may overwrite existing files[/yellow]")
-            if force:
+            console.print("[yellow]Template files will be merged with existing content; changed files will be overwritten (identical files are left untouched)[/yellow]")
+            if dry_run:
+                console.print("[cyan]--dry-run supplied: planning the merge without writing any files[/cyan]")
+            elif force:
                 console.print("[cyan]--force supplied: skipping confirmation and proceeding with merge[/cyan]")
             else:
+                console.print("[dim]Tip: run with --dry-run to see which files would be added or changed[/dim]")
                 # Ask for confirmation
                 response = typer.confirm("Do you want to continue?")
                 if not response:
@@ -857,61 +1477,70 @@ def init(
 
     # AI assistant selection
     if ai_assistant:
-        if ai_assistant not in AI_CHOICES:
-            console.print(f"[red]Error:[/red] Invalid AI assistant '{ai_assistant}'. Choose from: {', '.join(AI_CHOICES.keys())}")
+        selected_ais = list(dict.fromkeys(a.strip() for a in ai_assistant.split(",") if a.strip()))
+        invalid = [a for a in selected_ais if a not in AI_CHOICES]
+        if invalid or not selected_ais:
+            console.print(f"[red]Error:[/red] Invalid AI assistant '{', '.join(invalid) or ai_assistant}'. Choose from: {', '.join(AI_CHOICES.keys())}")
             raise typer.Exit(1)
-        selected_ai = ai_assistant
     else:
         # Use arrow-key selection interface
-        selected_ai = select_with_arrows(
+        selected_ais = [select_with_arrows(
             AI_CHOICES, 
             "Choose your AI assistant:", 
             "copilot"
-        )
+        )]
+
+    if dry_run and len(selected_ais) > 1:
+        console.print("[red]Error:[/red] --dry-run previews a single agent's template; pass one --ai value")
+        raise typer.Exit(1)
     
     # Check agent tools unless ignored
     if not ignore_agent_tools:
-        agent_tool_missing = False
-        install_url = ""
-        if selected_ai == "claude":
-            if not check_tool("claude", "https://docs.anthropic.com/en/docs/claude-code/setup"):
-                install_url = "https://docs.anthropic.com/en/docs/claude-code/setup"
-                agent_tool_missing = True
-        elif selected_ai == "gemini":
-            if not check_tool("gemini", "https://github.com/google-gemini/gemini-cli"):
-                install_url = "https://github.com/google-gemini/gemini-cli"
-                agent_tool_missing = True
-        elif selected_ai == "qwen":
-            if not check_tool("qwen", "https://github.com/QwenLM/qwen-code"):
-                install_url = "https://github.com/QwenLM/qwen-code"
-                agent_tool_missing = True
-        elif selected_ai == "opencode":
-            if not check_tool("opencode", "https://opencode.ai"):
-                install_url = "https://opencode.ai"
-                agent_tool_missing = True
-        elif selected_ai == "codex":
-            if not check_tool("codex", "https://github.com/openai/codex"):
-                install_url = "https://github.com/openai/codex"
-                agent_tool_missing = True
-        elif selected_ai == "auggie":
-            if not check_tool("auggie", "https://docs.augmentcode.com/cli/setup-auggie/install-auggie-cli"):
-                install_url = "https://docs.augmentcode.com/cli/setup-auggie/install-auggie-cli"
-                agent_tool_missing = True
-        # GitHub Copilot and Cursor checks are not needed as they're typically available in supported IDEs
-
-        if agent_tool_missing:
-            error_panel = Panel(
-                f"[cyan]{selected_ai}[/cyan] not found\n"
-                f"Install with: [cyan]{install_url}[/cyan]\n"
-                f"{AI_CHOICES[selected_ai]} is required to continue with this project type.\n\n"
-                "Tip: Use [cyan]--ignore-agent-tools[/cyan] to skip this check",
-                title="[red]Agent Detection Error[/red]",
-                border_style="red",
-                padding=(1, 2)
-            )
-            console.print()
-            console.print(error_panel)
-            raise typer.Exit(1)
+        for selected_ai in selected_ais:
+            agent_tool_missing = False
+            install_url = ""
+            if selected_ai == "claude":
+                if not check_tool("claude", "https://docs.anthropic.com/en/docs/claude-code/setup"):
+                    install_url = "https://docs.anthropic.com/en/docs/claude-code/setup"
+                    agent_tool_missing = True
+            elif selected_ai == "gemini":
+                if not check_tool("gemini", "https://github.com/google-gemini/gemini-cli"):
+                    install_url = "https://github.com/google-gemini/gemini-cli"
+                    agent_tool_missing = True
+            elif selected_ai == "qwen":
+                if not check_tool("qwen", "https://github.com/QwenLM/qwen-code"):
+                    install_url = "https://github.com/QwenLM/qwen-code"
+                    agent_tool_missing = True
+            elif selected_ai == "opencode":
+                if not check_tool("opencode", "https://opencode.ai"):
+                    install_url = "https://opencode.ai"
+                    agent_tool_missing = True
+            elif selected_ai == "codex":
+                if not check_tool("codex", "https://github.com/openai/codex"):
+                    install_url = "https://github.com/openai/codex"
+                    agent_tool_missing = True
+            elif selected_ai == "auggie":
+                if not check_tool("auggie", "https://docs.augmentcode.com/cli/setup-auggie/install-auggie-cli"):
+                    install_url = "https://docs.augmentcode.com/cli/setup-auggie/install-auggie-cli"
+                    agent_tool_missing = True
+            # GitHub Copilot and Cursor checks are not needed as they're typically available in supported IDEs
+
+            if agent_tool_missing:
+                error_panel = Panel(
+                    f"[cyan]{selected_ai}[/cyan] not found\n"
+                    f"Install with: [cyan]{install_url}[/cyan]\n"
+                    f"{AI_CHOICES[selected_ai]} is required to continue with this project type.\n\n"
+                    "Tip: Use [cyan]--ignore-agent-tools[/cyan] to skip this check",
+                    title="[red]Agent Detection Error[/red]",
+                    border_style="red",
+                    padding=(1, 2)
+                )
+                console.print()
+                console.print(error_panel)
+                raise typer.Exit(1)
+
+    # The first agent's template provides the shared .specify/ payload
+    selected_ai = selected_ais[0]
     
     # Determine script type (explicit, interactive, or OS default)
     if script_type:
@@ -928,28 +1557,40 @@ def init(
         else:
             selected_script = default_script
     
-    console.print(f"[cyan]Selected AI assistant:[/cyan] {selected_ai}")
+    console.print(f"[cyan]Selected AI assistant{'s' if len(selected_ais) > 1 else ''}:[/cyan] {', '.join(selected_ais)}")
     console.print(f"[cyan]Selected script type:[/cyan] {selected_script}")
+
+    if dry_run:
+        _preview_merge(project_path, selected_ai, selected_script, skip_tls=skip_tls, debug=debug, github_token=github_token, no_cache=no_cache, release=release, template_source=template_source)
+        return
     
     # Download and set up project
     # New tree-based progress (no emojis); include earlier substeps
-    tracker = StepTracker("Initialize Specify Project")
+    outputs = ExitStack()
+    profiler = None
+    if profile:
+        from . import profiling
+        profiler = profiling.start()
+    tracker, live_view = _tracker_outputs("Initialize Specify Project", output, events, outputs)
     # Flag to allow suppressing legacy headings
     sys._specify_tracker_active = True
     # Pre steps recorded as completed before live rendering
     tracker.add("precheck", "Check required tools")
     tracker.complete("precheck", "ok")
     tracker.add("ai-select", "Select AI assistant")
-    tracker.complete("ai-select", f"{selected_ai}")
+    tracker.complete("ai-select", ", ".join(selected_ais))
     tracker.add("script-select", "Select script type")
     tracker.complete("script-select", selected_script)
     for key, label in [
-        ("fetch", "Fetch latest release"),
-        ("download", "Download template"),
-        ("extract", "Extract template"),
+        ("fetch", f"Fetch release {release}" if release else "Fetch latest release"),
+        *([("download", "Download template")] if len(selected_ais) == 1 else [(f"download-{ai}", f"Download {ai} template") for ai in selected_ais]),
+        ("extract", "Extract template" if len(selected_ais) == 1 else f"Extract {selected_ai} template"),
         ("zip-list", "Archive contents"),
+        *([("merge-plan", "Plan merge")] if here or len(selected_ais) > 1 else []),
         ("extracted-summary", "Extraction summary"),
+        *[(f"overlay-{ai}", f"Add {ai} commands") for ai in selected_ais[1:]],
         ("chmod", "Ensure scripts executable"),
+        ("manifest", "Record template manifest"),
         ("cleanup", "Cleanup"),
         ("git", "Initialize git repository"),
         ("final", "Finalize")
@@ -957,18 +1598,29 @@ def init(
         tracker.add(key, label)
 
     # Use transient so live tree is replaced by the final static render (avoids duplicate output)
-    with Live(tracker.render(), console=console, refresh_per_second=8, transient=True) as live:
-        tracker.attach_refresh(lambda: live.update(tracker.render()))
+    from rich.live import Live
+    with outputs, (Live(tracker, console=console, refresh_per_second=8, transient=True) if live_view else nullcontext()):
         try:
             # Create a httpx client with verify based on skip_tls
-            verify = not skip_tls
-            local_ssl_context = ssl_context if verify else False
-            local_client = httpx.Client(verify=local_ssl_context)
-
-            download_and_extract_template(project_path, selected_ai, selected_script, here, verbose=False, tracker=tracker, client=local_client, debug=debug, github_token=github_token)
+            local_client = _http_client(skip_tls, http2=download_segments > 1)
+            if profiler:
+                profiler.instrument(local_client)
+            template_cache = None if no_cache else TemplateCache()
+            release_index = None if no_cache else ReleaseIndex()
+
+            if len(selected_ais) > 1:
+                extraction = download_and_extract_templates(project_path, selected_ais, selected_script, here, tracker=tracker, client=local_client, debug=debug, github_token=github_token, cache=template_cache, release=release, release_index=release_index, backup=backup, segments=download_segments, template_source=template_source)
+            else:
+                extraction = download_and_extract_template(project_path, selected_ai, selected_script, here, verbose=False, tracker=tracker, client=local_client, debug=debug, github_token=github_token, cache=template_cache, release=release, release_index=release_index, backup=backup, segments=download_segments, template_source=template_source)
 
             # Ensure scripts are executable (POSIX)
-            ensure_executable_scripts(project_path, tracker=tracker)
+            ensure_executable_scripts(project_path, tracker=tracker, extraction=extraction)
+
+            # Record what was installed so 'specify upgrade' can tell template files from local edits
+            tracker.start("manifest")
+            manifest_path = write_manifest(project_path, release=extraction["release"], agents=selected_ais, script=selected_script, paths=extraction["paths"])
+            extraction["paths"].append(manifest_path.relative_to(project_path).as_posix())
+            tracker.complete("manifest", f"{len(extraction['paths']) - 1} files, release {extraction['release']}")
 
             # Git step
             if not no_git:
@@ -976,10 +1628,7 @@ def init(
                 if is_git_repo(project_path):
                     tracker.complete("git", "existing repo detected")
                 elif should_init_git:
-                    if init_git_repo(project_path, quiet=True):
-                        tracker.complete("git", "initialized")
-                    else:
-                        tracker.error("git", "init failed")
+                    init_git_repo(project_path, quiet=True, paths=extraction["paths"], whole_tree=git_whole_tree, tracker=tracker)
                 else:
                     tracker.skip("git", "git not available")
             else:
@@ -1000,13 +1649,16 @@ def init(
                 console.print(Panel("\n".join(env_lines), title="Debug Environment", border_style="magenta"))
             if not here and project_path.exists():
                 shutil.rmtree(project_path)
+            if profiler:
+                _report_profile(profiler, tracker, profile)
             raise typer.Exit(1)
         finally:
             # Force final render
             pass
 
     # Final static tree (ensures finished state visible after Live context ends)
-    console.print(tracker.render())
+    if live_view:
+        console.print(tracker.render())
     console.print("\n[bold green]Project ready.[/bold green]")
     
     # Agent folder security notice
@@ -1024,11 +1676,12 @@ def init(
         "roo": ".roo/"
     }
     
-    if selected_ai in agent_folder_map:
-        agent_folder = agent_folder_map[selected_ai]
+    agent_folders = [agent_folder_map[ai] for ai in selected_ais if ai in agent_folder_map]
+    if agent_folders:
+        agent_folder = ", ".join(f"[cyan]{folder}[/cyan]" for folder in agent_folders)
         security_notice = Panel(
             f"Some agents may store credentials, auth tokens, or other identifying and private artifacts in the agent folder within your project.\n"
-            f"Consider adding [cyan]{agent_folder}[/cyan] (or parts of it) to [cyan].gitignore[/cyan] to prevent accidental credential leakage.",
+            f"Consider adding {agent_folder} (or parts of {'it' if len(agent_folders) == 1 else 'them'}) to [cyan].gitignore[/cyan] to prevent accidental credential leakage.",
             title="[yellow]Agent Folder Security[/yellow]",
             border_style="yellow",
             padding=(1, 2)
@@ -1046,7 +1699,7 @@ def init(
         step_num = 2
 
     # Add Codex-specific setup step if needed
-    if selected_ai == "codex":
+    if "codex" in selected_ais:
         codex_path = project_path / ".codex"
         quoted_path = shlex.quote(str(codex_path))
         if os.name == "nt":  # Windows
@@ -1070,7 +1723,7 @@ def init(
     console.print()
     console.print(steps_panel)
 
-    if selected_ai == "codex":
+    if "codex" in selected_ais:
         warning_text = """[bold yellow]Important Note:[/bold yellow]
 
 Custom prompts do not yet support arguments in Codex. You may need to manually specify additional project instructions directly in prompt files located in [cyan].codex/prompts/[/cyan].
@@ -1081,50 +1734,785 @@ For more information, see: [cyan]https://github.com/openai/codex/issues/2890[/cy
         console.print()
         console.print(warning_panel)
 
+    if profiler:
+        _report_profile(profiler, tracker, profile)
+
+def _preview_merge(project_path: Path, selected_ai: str, selected_script: str, *, skip_tls: bool, debug: bool, github_token: str | None, no_cache: bool, release: str | None, template_source: str | None = None) -> None:
+    """Print the merge plan for --here --dry-run without touching project_path."""
+    local_client = _http_client(skip_tls)
+    template_cache = None if no_cache else TemplateCache()
+    with tempfile.TemporaryDirectory(prefix="specify-plan-") as download_dir:
+        with console.status("[cyan]Planning merge...[/cyan]"):
+            release_data, _ = _resolve_release(selected_ai, selected_script, verbose=False, client=local_client, debug=debug, github_token=github_token, release=release, release_index=None if no_cache else ReleaseIndex(), template_source=template_source)
+            downloads = _download_layers(
+                selected_ai,
+                asset_layers(release_data, selected_ai, selected_script),
+                Path(download_dir),
+                script_type=selected_script,
+                verbose=False,
+                show_progress=False,
+                client=local_client,
+                debug=debug,
+                github_token=github_token,
+                cache=template_cache,
+                release_data=release_data,
+            )
+            # Base and overlay never share a path, so their plans simply add up
+            plan = {"new": [], "changed": [], "identical": []}
+            for zip_path, _ in downloads:
+                with zipfile.ZipFile(zip_path) as zip_ref:
+                    layer_plan = plan_merge(zip_ref, project_path, strip_root=len(downloads) == 1)
+                for action in plan:
+                    plan[action] += layer_plan[action]
+
+    table = Table(show_header=True, header_style="cyan", box=None, padding=(0, 2))
+    table.add_column("Action")
+    table.add_column("File")
+    for rel in plan["changed"]:
+        table.add_row("[yellow]overwrite[/yellow]", rel)
+    for rel in plan["new"]:
+        table.add_row("[green]add[/green]", rel)
+    if plan["changed"] or plan["new"]:
+        console.print()
+        console.print(table)
+    console.print(Panel(
+        f"Release {release_data['tag_name']} ({', '.join(meta['filename'] for _, meta in downloads)})\n"
+        f"{_merge_plan_summary(plan)}\n\n"
+        "[dim]Dry run: no files were written. Re-run without --dry-run (add --backup to keep .bak copies of changed files) to apply.[/dim]",
+        title="Merge Plan",
+        border_style="cyan",
+        padding=(1, 2),
+    ))
+
+
+def _init_batch(manifest_path: Path, *, workers: int | None, summary_path: Path | None, skip_tls: bool, debug: bool, github_token: str | None, no_cache: bool, release: str | None, template_source: str | None = None) -> None:
+    """Provision all projects from a batch manifest with one HTTP client and one release lookup."""
+    default_script = "ps" if os.name == "nt" else "sh"
+    try:
+        projects = load_manifest(manifest_path, AI_CHOICES, SCRIPT_TYPE_CHOICES, default_script)
+    except (OSError, ValueError) as e:
+        console.print(Panel(str(e), title="[red]Invalid Batch Manifest[/red]", border_style="red", padding=(1, 2)))
+        raise typer.Exit(1)
+
+    workers = workers or default_workers()
+    distinct_assets = {(p["ai"], p["script"]) for p in projects}
+    console.print(Panel(
+        "\n".join([
+            "[cyan]Specify Batch Provisioning[/cyan]",
+            "",
+            f"{'Manifest':<15} [dim]{manifest_path}[/dim]",
+            f"{'Projects':<15} [green]{len(projects)}[/green]",
+            f"{'Templates':<15} [green]{len(distinct_assets)}[/green]",
+            f"{'Workers':<15} [green]{workers}[/green]",
+        ]),
+        border_style="cyan",
+        padding=(1, 2),
+    ))
+
+    local_client = _http_client(skip_tls)
+    release_index = None if no_cache else ReleaseIndex()
+    try:
+        release_data, release_info = _fetch_release_data(local_client, release=release, release_index=release_index, github_token=github_token, debug=debug, template_source=template_source)
+    except Exception as e:
+        console.print("[red]Error fetching release information[/red]")
+        console.print(Panel(str(e), title="Fetch Error", border_style="red"))
+        raise typer.Exit(1)
+    if release_info["source"] == "stale":
+        console.print(f"[yellow]Using stored release information[/yellow] ({release_info['reason']})")
+    console.print(f"[cyan]Release:[/cyan] {release_data.get('tag_name')}")
+
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="specify-batch-") as download_dir:
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            TextColumn("{task.completed}/{task.total}"),
+            console=console,
+            transient=True,
+        ) as progress:
+            task = progress.add_task("Provisioning projects...", total=len(projects))
+            results = run_batch(
+                projects,
+                client=local_client,
+                release_data=release_data,
+                download_dir=Path(download_dir),
+                cache=None if no_cache else TemplateCache(),
+                github_token=github_token,
+                workers=workers,
+                debug=debug,
+                on_result=lambda _: progress.advance(task),
+            )
+    elapsed = time.perf_counter() - started
+
+    table = Table(show_header=True, header_style="cyan", box=None, padding=(0, 2))
+    table.add_column("")
+    table.add_column("Project")
+    table.add_column("AI")
+    table.add_column("Script")
+    table.add_column("Git")
+    table.add_column("Time", justify="right")
+    table.add_column("Detail", style="bright_black")
+    for result in results:
+        symbol = "[green]●[/green]" if result["status"] == "ok" else "[red]●[/red]"
+        table.add_row(symbol, os.path.relpath(result["path"]), result["ai"], result["script"], result["git"], f"{result['seconds']:.2f}s", result["detail"])
+    console.print(table)
+
+    failed = sum(1 for r in results if r["status"] != "ok")
+    summary = {
+        "manifest": str(manifest_path),
+        "release": release_data.get("tag_name"),
+        "workers": workers,
+        "elapsed_seconds": round(elapsed, 3),
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "projects": results,
+    }
+    if summary_path:
+        summary_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        console.print(f"[dim]Summary written to {summary_path}[/dim]")
+
+    if failed:
+        console.print(f"\n[bold red]{failed} of {len(results)} projects failed[/bold red] [dim]({elapsed:.1f}s)[/dim]")
+        raise typer.Exit(1)
+    console.print(f"\n[bold green]{len(results)} projects ready.[/bold green] [dim]({elapsed:.1f}s)[/dim]")
+
+
 @app.command()
-def check():
+def check(
+    json_output: bool = typer.Option(False, "--json", help="Print results as JSON (no banner or tree) for scripts"),
+    no_versions: bool = typer.Option(False, "--no-versions", help="Only check that tools exist; skip the --version probes"),
+    timeout: float = typer.Option(DEFAULT_PROBE_TIMEOUT, "--timeout", help="Seconds to wait for each tool's --version"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignore and do not update the cached results"),
+):
     """Check that all required tools are installed."""
-    show_banner()
-    console.print("[bold]Checking for installed tools...[/bold]\n")
+    if not json_output:
+        show_banner()
+        console.print("[bold]Checking for installed tools...[/bold]\n")
+
+    results = detect_tools(list(CHECK_TOOLS), versions=not no_versions, timeout=timeout, use_cache=not no_cache)
+
+    if json_output:
+        payload = {"tools": {tool: {"label": CHECK_TOOLS[tool], **info} for tool, info in results.items()}}
+        print(json.dumps(payload, indent=2))
+        return
 
     tracker = StepTracker("Check Available Tools")
-    
-    tracker.add("git", "Git version control")
-    tracker.add("claude", "Claude Code CLI")
-    tracker.add("gemini", "Gemini CLI")
-    tracker.add("qwen", "Qwen Code CLI")
-    tracker.add("code", "Visual Studio Code")
-    tracker.add("code-insiders", "Visual Studio Code Insiders")
-    tracker.add("cursor-agent", "Cursor IDE agent")
-    tracker.add("windsurf", "Windsurf IDE")
-    tracker.add("kilocode", "Kilo Code IDE")
-    tracker.add("opencode", "opencode")
-    tracker.add("codex", "Codex CLI")
-    tracker.add("auggie", "Auggie CLI")
-    
-    git_ok = check_tool_for_tracker("git", tracker)
-    claude_ok = check_tool_for_tracker("claude", tracker)  
-    gemini_ok = check_tool_for_tracker("gemini", tracker)
-    qwen_ok = check_tool_for_tracker("qwen", tracker)
-    code_ok = check_tool_for_tracker("code", tracker)
-    code_insiders_ok = check_tool_for_tracker("code-insiders", tracker)
-    cursor_ok = check_tool_for_tracker("cursor-agent", tracker)
-    windsurf_ok = check_tool_for_tracker("windsurf", tracker)
-    kilocode_ok = check_tool_for_tracker("kilocode", tracker)
-    opencode_ok = check_tool_for_tracker("opencode", tracker)
-    codex_ok = check_tool_for_tracker("codex", tracker)
-    auggie_ok = check_tool_for_tracker("auggie", tracker)
+    for tool, label in CHECK_TOOLS.items():
+        tracker.add(tool, label)
+    for tool, info in results.items():
+        if not info["found"]:
+            tracker.error(tool, "not found")
+        elif info["version"]:
+            tracker.complete(tool, info["version"])
+        elif info["error"]:
+            tracker.complete(tool, f"available, {info['error']}")
+        else:
+            tracker.complete(tool, "available")
 
     console.print(tracker.render())
 
     console.print("\n[bold green]Specify CLI is ready to use![/bold green]")
 
-    if not git_ok:
+    if not results["git"]["found"]:
         console.print("[dim]Tip: Install git for repository management[/dim]")
-    if not (claude_ok or gemini_ok or cursor_ok or qwen_ok or windsurf_ok or kilocode_ok or opencode_ok or codex_ok or auggie_ok):
+    agents = ["claude", "gemini", "cursor-agent", "qwen", "windsurf", "kilocode", "opencode", "codex", "auggie"]
+    if not any(results[tool]["found"] for tool in agents):
         console.print("[dim]Tip: Install an AI assistant for the best experience[/dim]")
 
 
+_UPGRADE_LABELS = {
+    "update": "[green]update[/green]",
+    "add": "[green]add[/green]",
+    "delete": "[red]delete[/red]",
+    "conflict": "[yellow]conflict[/yellow]",
+    "keep": "[dim]keep local[/dim]",
+    "untrack": "[dim]keep, untrack[/dim]",
+}
+
+
+@app.command()
+def upgrade(
+    path: Path = typer.Argument(Path("."), help="Project to upgrade (default: the current directory)"),
+    release: str = typer.Option(None, "--release", help="Upgrade to this template release tag (e.g. v0.0.42) instead of the latest"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Show what the upgrade would change, then exit without writing anything"),
+    merge: bool = typer.Option(False, "--merge", help="Three-way merge files changed both upstream and locally (needs git); overlapping edits still get a .new copy"),
+    skip_tls: bool = typer.Option(False, "--skip-tls", help="Skip SSL/TLS verification (not recommended)"),
+    debug: bool = typer.Option(False, "--debug", help="Show verbose diagnostic output for network failures"),
+    github_token: str = typer.Option(None, "--github-token", help="GitHub token to use for API requests (or set GH_TOKEN or GITHUB_TOKEN environment variable)"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Do not read or write the local template and release metadata cache"),
+    template_source: str = typer.Option(None, "--template-source", envvar="SPECIFY_TEMPLATE_SOURCE", help="Read releases from a template mirror (file:// directory or http(s):// base URL, see 'specify mirror sync') instead of GitHub"),
+):
+    """Upgrade a project's templates to a newer release, writing only what changed.
+
+    Uses the .specify/manifest.json written by init to tell template files from local
+    edits. Files you have not touched are replaced, files you edited are kept (the new
+    version is saved next to them as <file>.new, or merged in with --merge), and files
+    the release dropped are deleted unless you edited them. Nothing is committed, so the
+    upgrade can be reviewed with git diff.
+    """
+    from .upgrade import ManifestError, apply_upgrade, base_release, load_manifest as load_template_manifest, plan_upgrade, template_files, upgraded_files
+
+    project_path = path.resolve()
+    try:
+        manifest = load_template_manifest(project_path)
+    except ManifestError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+    agents, script = manifest["agents"], manifest["script"]
+    local_client = _http_client(skip_tls)
+    template_cache = None if no_cache else TemplateCache()
+    release_index = None if no_cache else ReleaseIndex()
+    merge_tool = which("git") if merge else None
+    if merge and merge_tool is None:
+        console.print("[yellow]git not found; conflicting files get a .new copy instead of a merge[/yellow]")
+
+    def fetch(tag: str | None, download_dir: Path) -> tuple[str, list]:
+        """Download the template archives of release tag (None = latest) for the project's agents."""
+        try:
+            release_data, _ = _fetch_release_data(local_client, release=tag, release_index=release_index, github_token=github_token, debug=debug, template_source=template_source)
+        except Exception as e:
+            console.print("[red]Error fetching release information[/red]")
+            console.print(Panel(str(e), title="Fetch Error", border_style="red"))
+            raise typer.Exit(1)
+        archives = _template_archives(release_data, agents, script)
+        downloads = _download_archives([(ai, layer) for _, ai, layer, _ in archives], download_dir, script_type=script, verbose=False, show_progress=False, client=local_client, debug=debug, github_token=github_token, cache=template_cache, release_data=release_data)
+        return release_data["tag_name"], [(zip_path, layer is None, exclude) for (zip_path, _), (_, _, layer, exclude) in zip(downloads, archives)]
+
+    with tempfile.TemporaryDirectory(prefix="specify-upgrade-") as download_dir:
+        with console.status("[cyan]Fetching templates...[/cyan]"):
+            tag, archives = fetch(release, Path(download_dir))
+        if tag == manifest["release"]:
+            console.print(f"[green]Already on release {tag}[/green] [dim]({project_path})[/dim]")
+            return
+        incoming = template_files(archives)
+        plan = plan_upgrade(project_path, manifest["files"], {rel: digest for rel, (digest, _) in incoming.items()})
+
+        table = Table(show_header=True, header_style="cyan", box=None, padding=(0, 2))
+        table.add_column("Action")
+        table.add_column("File")
+        for action, label in _UPGRADE_LABELS.items():
+            for rel in plan[action]:
+                table.add_row(label, rel)
+        if table.row_count:
+            console.print()
+            console.print(table)
+        counts = ", ".join(f"{len(plan[action])} {action}" for action in _UPGRADE_LABELS if plan[action]) or "no file changes"
+        heading = f"Release {manifest['release']} → {tag} ({', '.join(agents)}, {script})\n{counts}, {len(plan['current'])} already current"
+        if dry_run:
+            console.print(Panel(
+                f"{heading}\n\n[dim]Dry run: no files were written. Re-run without --dry-run to apply.[/dim]",
+                title="Upgrade Plan",
+                border_style="cyan",
+                padding=(1, 2),
+            ))
+            return
+
+        # A conflict merges against the release its recorded hash belongs to, which is older
+        # than manifest["release"] while an earlier upgrade's .new is still unresolved
+        base_releases = {rel: base_release(manifest, rel) for rel in plan["conflict"] if rel in manifest["files"]}
+        base_archives = {}
+        if merge_tool:
+            for base_tag in sorted(set(base_releases.values())):
+                with console.status(f"[cyan]Fetching release {base_tag} to merge against...[/cyan]"):
+                    _, base_archives[base_tag] = fetch(base_tag, Path(download_dir))
+        try:
+            stats = apply_upgrade(project_path, plan, archives, incoming, base_archives=base_archives, base_releases=base_releases, recorded=manifest["files"], merge_tool=merge_tool)
+        except Exception as e:
+            console.print(Panel(f"Upgrade failed: {e}", title="Failure", border_style="red"))
+            raise typer.Exit(1)
+    if stats["written"] and not stats["modes"]:
+        ensure_executable_scripts(project_path)
+    files, bases = upgraded_files(manifest, {rel: digest for rel, (digest, _) in incoming.items()}, stats["unresolved"])
+    write_manifest(project_path, release=tag, agents=agents, script=script, files=files, bases=bases)
+
+    lines = [heading, ""]
+    lines.append(f"{len(stats['written'])} written, {len(stats['deleted'])} deleted" + (f", {len(stats['merged'])} merged" if stats["merged"] else ""))
+    if stats["new_files"]:
+        lines.append(f"[yellow]{len(stats['new_files'])} edited file(s) also changed upstream;[/yellow] merge the new versions saved next to them:")
+        lines += [f"  {rel}" for rel in stats["new_files"]]
+    lines += ["", "[dim]Nothing was committed; review the changes with git diff.[/dim]"]
+    console.print(Panel("\n".join(lines), title="Upgrade Complete", border_style="green", padding=(1, 2)))
+
+
+cache_app = typer.Typer(
+    name="cache",
+    help="Manage the local template cache",
+    add_completion=False,
+)
+app.add_typer(cache_app, name="cache")
+
+
+@cache_app.command("ls")
+def cache_ls():
+    """List cached template archives, most recently used first."""
+    template_cache = TemplateCache()
+    entries = template_cache.entries()
+    if not entries:
+        console.print(f"[yellow]Template cache is empty[/yellow] [dim]({template_cache.root})[/dim]")
+        return
+
+    table = Table(show_header=True, header_style="cyan", box=None, padding=(0, 2))
+    table.add_column("Release")
+    table.add_column("Asset")
+    table.add_column("Size", justify="right")
+    table.add_column("Last used")
+    table.add_column("SHA-256", style="bright_black")
+    for entry in entries:
+        last_used = datetime.fromtimestamp(entry.get("last_used", 0)).strftime("%Y-%m-%d %H:%M")
+        table.add_row(entry.get("release", "?"), entry.get("asset", "?"), _format_size(entry.get("size", 0)), last_used, entry["sha256"][:12])
+    console.print(table)
+    console.print(f"\n[dim]{len(entries)} entries, {_format_size(template_cache.total_bytes())} in {template_cache.root}[/dim]")
+
+
+@cache_app.command("prune")
+def cache_prune(
+    max_size: int = typer.Option(None, "--max-size", help="Evict least-recently-used archives until the cache is at most this many MB"),
+    older_than: int = typer.Option(None, "--older-than", help="Remove archives not used in this many days"),
+    all_entries: bool = typer.Option(False, "--all", help="Remove every cached archive (and partial downloads no running process holds)"),
+):
+    """Evict cached template archives (defaults to the size limit used by init)."""
+    template_cache = TemplateCache()
+    max_bytes = max_size * 1024 * 1024 if max_size is not None else None
+    if max_bytes is None and older_than is None and not all_entries:
+        max_bytes = DEFAULT_MAX_BYTES
+    removed = template_cache.prune(
+        max_bytes=max_bytes,
+        older_than=older_than * 86400 if older_than is not None else None,
+        everything=all_entries,
+    )
+    if removed:
+        for entry in removed:
+            console.print(f"[yellow]Removed[/yellow] {entry.get('release', '?')}/{entry.get('asset', '?')}")
+    else:
+        console.print("[green]Nothing to prune[/green]")
+    console.print(f"[dim]Cache size: {_format_size(template_cache.total_bytes())} ({template_cache.root})[/dim]")
+
+
+mirror_app = typer.Typer(
+    name="mirror",
+    help="Maintain an offline mirror of the template releases",
+    add_completion=False,
+)
+app.add_typer(mirror_app, name="mirror")
+
+
+@mirror_app.command("sync")
+def mirror_sync(
+    directory: Path = typer.Argument(..., help="Mirror directory (created if missing); serve it over HTTP or use it as file://"),
+    releases: list[str] = typer.Option(None, "--release", help="Release tag to mirror (repeatable; default: the latest release)"),
+    latest: bool = typer.Option(False, "--latest", help="Also mirror the latest release when --release is given"),
+    workers: int = typer.Option(4, "--workers", min=1, help="Assets downloaded in parallel"),
+    skip_tls: bool = typer.Option(False, "--skip-tls", help="Skip SSL/TLS verification (not recommended)"),
+    github_token: str = typer.Option(None, "--github-token", help="GitHub token to use for API requests (or set GH_TOKEN or GITHUB_TOKEN environment variable)"),
+):
+    """Download every template asset of one or more releases, plus a release index, into a directory.
+
+    Point init at the result with --template-source file:///path/to/dir (or an HTTP URL
+    serving the directory), or set SPECIFY_TEMPLATE_SOURCE. Assets already mirrored with
+    a matching digest are not downloaded again.
+    """
+    from .mirror import sync
+
+    tags: list[str | None] = list(dict.fromkeys(releases or []))
+    if latest or not tags:
+        tags.insert(0, None)
+    local_client = _http_client(skip_tls)
+
+    def on_asset(tag: str, name: str, entry: dict, downloaded: bool) -> None:
+        note = f"[green]downloaded[/green] {_format_size(entry['size'])}" if downloaded else "[dim]up to date[/dim]"
+        console.print(f"  {tag}  {name}  {note}")
+
+    try:
+        with console.status("[cyan]Syncing template mirror...[/cyan]"):
+            summaries = sync(local_client, directory, tags, headers=_github_auth_headers(github_token), workers=workers, on_asset=on_asset)
+    except Exception as e:
+        console.print(Panel(str(e), title="[red]Mirror Sync Failed[/red]", border_style="red"))
+        raise typer.Exit(1)
+
+    table = Table(show_header=True, header_style="cyan", box=None, padding=(0, 2))
+    table.add_column("Release")
+    table.add_column("Assets", justify="right")
+    table.add_column("Downloaded", justify="right")
+    table.add_column("Size", justify="right")
+    for summary in summaries:
+        table.add_row(summary["tag"], str(summary["assets"]), str(summary["downloaded"]), _format_size(summary["bytes"]))
+    console.print()
+    console.print(table)
+    console.print(f"\n[bold green]Mirror ready.[/bold green] Use it with [cyan]--template-source {directory.resolve().as_uri()}[/cyan]")
+
+
+commands_app = typer.Typer(
+    name="commands",
+    help="Render agent command files from command templates",
+    add_completion=False,
+)
+app.add_typer(commands_app, name="commands")
+
+
+@commands_app.command("render")
+def commands_render(
+    ai_assistant: str = typer.Option(..., "--ai", help=f"Agent to render for: {', '.join(AI_CHOICES)}"),
+    script_type: str = typer.Option(None, "--script", help="Script type to reference: sh or ps (default: ps on Windows, otherwise sh)"),
+    templates_dir: Path = typer.Option(Path("templates/commands"), "--templates", help="Directory of command templates (*.md)"),
+    project: Path = typer.Option(Path("."), "--project", help="Project to write the agent's command files into"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Show what would change without writing"),
+):
+    """Render command templates into a project's agent command directory.
+
+    Uses the same engine as the release packager, so edited templates can be tried
+    in a project without building a release.
+    """
+    from .templating import AGENT_FORMATS, load_templates, render_commands
+
+    if ai_assistant not in AGENT_FORMATS:
+        console.print(f"[red]Error:[/red] Invalid AI assistant '{ai_assistant}'. Choose from: {', '.join(AGENT_FORMATS)}")
+        raise typer.Exit(1)
+    script_type = script_type or ("ps" if os.name == "nt" else "sh")
+    if script_type not in SCRIPT_TYPE_CHOICES:
+        console.print(f"[red]Error:[/red] Invalid script type '{script_type}'. Choose from: {', '.join(SCRIPT_TYPE_CHOICES.keys())}")
+        raise typer.Exit(1)
+    templates = load_templates(templates_dir)
+    if not templates:
+        console.print(f"[red]Error:[/red] No command templates found in {templates_dir}")
+        raise typer.Exit(1)
+
+    table = Table(show_header=True, header_style="cyan", box=None, padding=(0, 2))
+    table.add_column("File")
+    table.add_column("Status")
+    changed = 0
+    for rel, content in render_commands(templates, ai_assistant, script_type):
+        target = project / rel
+        try:
+            current = target.read_bytes()
+        except OSError:
+            current = None
+        if current == content:
+            table.add_row(rel, "[dim]unchanged[/dim]")
+            continue
+        changed += 1
+        status = "new" if current is None else "updated"
+        if not dry_run:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(content)
+        table.add_row(rel, f"[green]{status}[/green]")
+    console.print(table)
+    verb = "would change" if dry_run else "changed"
+    console.print(f"\n[dim]{len(templates)} commands rendered for {ai_assistant} ({script_type}), {changed} {verb}[/dim]")
+
+
+context_app = typer.Typer(
+    name="context",
+    help="Maintain AI agent context files (CLAUDE.md, AGENTS.md, ...)",
+    add_completion=False,
+)
+app.add_typer(context_app, name="context")
+
+
+@context_app.command("update")
+def context_update(
+    agent: str = typer.Argument(None, help="Agent whose context file to update (default: every existing agent file)"),
+):
+    """Update agent context files with the current feature's plan.md.
+
+    Same as .specify/scripts/bash/update-agent-context.sh: plan.md is parsed once and
+    every agent file is updated concurrently; files that would not change are left alone.
+    """
+    from .agent_context import AGENT_CONTEXT_FILES, ContextError, update_context
+
+    try:
+        result = update_context(agent)
+    except ValueError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+    except ContextError as e:
+        console.print(Panel("\n".join([str(e), *e.hints]), title="Agent Context", border_style="red"))
+        raise typer.Exit(1)
+
+    plan = result["plan"]
+    found = [f"{label}: {plan[key]}" for key, label in (("language", "Language"), ("framework", "Framework"), ("database", "Storage"), ("project_type", "Project type")) if plan[key]]
+    console.print(f"[cyan]Feature:[/cyan] {result['feature']}  [dim]({result['plan_path']})[/dim]")
+    if found:
+        console.print("[dim]" + "; ".join(found) + "[/dim]")
+    else:
+        console.print("[yellow]No language information found in plan[/yellow]")
+
+    styles = {"created": "green", "updated": "green", "unchanged": "dim", "failed": "red"}
+    table = Table(show_header=True, header_style="cyan", box=None, padding=(0, 2))
+    table.add_column("File")
+    table.add_column("Agents")
+    table.add_column("Status")
+    for entry in result["files"]:
+        status = entry["action"] + (f" ({entry['error']})" if entry["error"] else "")
+        table.add_row(entry["path"].relative_to(result["repo_root"]).as_posix(), ", ".join(AGENT_CONTEXT_FILES[a][1] for a in entry["agents"]), f"[{styles[entry['action']]}]{status}[/{styles[entry['action']]}]")
+    console.print(table)
+    console.print(f"[dim]{result['repo_root']}[/dim]")
+    if any(entry["action"] == "failed" for entry in result["files"]):
+        raise typer.Exit(1)
+
+
+features_app = typer.Typer(
+    name="features",
+    help="Inspect the project's features (specs/NNN-*) via the .specify/index feature index",
+    add_completion=False,
+)
+app.add_typer(features_app, name="features")
+
+
+@features_app.command("list")
+def features_list(
+    json_output: bool = typer.Option(False, "--json", help="Print the index as JSON for scripts and agents"),
+):
+    """List features with the design docs each one has, refreshing .specify/index incrementally."""
+    from .features import FEATURE_DOCS, feature_index, find_repo_root
+
+    repo_root = find_repo_root()
+    if repo_root is None:
+        console.print("[red]Error:[/red] Not inside a Spec Kit project (no .specify or .git directory found)")
+        raise typer.Exit(1)
+    index = feature_index(repo_root)
+    features = [{k: v for k, v in f.items() if not k.endswith("_ns")} for f in index.features]
+
+    if json_output:
+        print(json.dumps({"repo_root": str(repo_root), "latest": index.latest, "next_number": index.next_number, "features": features}, indent=2))
+        return
+
+    if not features:
+        console.print(f"[yellow]No features yet[/yellow] [dim]({repo_root / 'specs'})[/dim]")
+        return
+    table = Table(show_header=True, header_style="cyan", box=None, padding=(0, 2))
+    table.add_column("Feature", no_wrap=True)
+    for doc in FEATURE_DOCS:
+        table.add_column(doc.replace("_", "-"), justify="center")
+    for feature in features:
+        marks = ["[green]✓[/green]" if feature["docs"][doc] else "[dim]-[/dim]" for doc in FEATURE_DOCS]
+        name = f"[bold]{feature['name']}[/bold]" if feature["name"] == index.latest else feature["name"]
+        table.add_row(name, *marks)
+    console.print(table)
+    console.print(f"\n[dim]{len(features)} features, latest {index.latest or '-'}, next number {index.next_number:03d}[/dim]")
+
+
+tasks_app = typer.Typer(
+    name="tasks",
+    help="Inspect a feature's tasks.md",
+    add_completion=False,
+)
+app.add_typer(tasks_app, name="tasks")
+
+
+@tasks_app.command("graph")
+def tasks_graph(
+    tasks_file: Path = typer.Argument(None, help="tasks.md to read (default: the current feature's)"),
+    json_output: bool = typer.Option(False, "--json", help="Print tasks, edges, waves and critical path as JSON"),
+    mermaid: bool = typer.Option(False, "--mermaid", help="Print a Mermaid flowchart of the task graph"),
+    remaining: bool = typer.Option(False, "--remaining", help="Leave out tasks already checked off"),
+):
+    """Build the task dependency graph and show its parallel waves and critical path."""
+    from .paths import resolve_paths
+    from .tasks import TaskGraph, TaskGraphError
+
+    if json_output and mermaid:
+        console.print("[red]Error:[/red] Choose one of --json and --mermaid")
+        raise typer.Exit(1)
+    tasks_file = tasks_file or Path(resolve_paths()["TASKS"])
+    try:
+        graph = TaskGraph.from_file(tasks_file, remaining=remaining)
+    except OSError as e:
+        console.print(f"[red]Error:[/red] Cannot read {tasks_file}: {e.strerror or e}")
+        console.print("[dim]Run /tasks first to create the task list, or pass the file to read.[/dim]")
+        raise typer.Exit(1)
+    except TaskGraphError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+
+    # Plain print: agents and docs consume these verbatim
+    if json_output:
+        print(json.dumps({"tasks_file": str(tasks_file), **graph.to_dict()}, indent=2, ensure_ascii=False))
+        return
+    if mermaid:
+        print(graph.to_mermaid())
+        return
+
+    if not graph.tasks:
+        console.print(f"[yellow]No tasks found[/yellow] [dim]({tasks_file})[/dim]")
+        return
+    critical = set(graph.critical_path())
+    table = Table(show_header=True, header_style="cyan", box=None, padding=(0, 2))
+    table.add_column("Wave", justify="right")
+    table.add_column("Tasks")
+    table.add_column("Phase", style="bright_black", no_wrap=True, overflow="ellipsis")
+    for i, wave in enumerate(graph.waves(), start=1):
+        ids = " ".join(f"[bold red]{t}[/bold red]" if t in critical else t for t in wave)
+        phases = ", ".join(dict.fromkeys(graph.tasks[t].phase or "-" for t in wave))
+        table.add_row(str(i), ids, phases)
+    console.print(table)
+    summary = graph.summary()
+    console.print(f"\n[cyan]Critical path:[/cyan] {' → '.join(graph.critical_path())}")
+    console.print(f"[dim]{summary['tasks']} tasks in {summary['waves']} waves, at most {summary['max_parallel']} at once, parallelism {summary['parallelism']:.2f}[/dim]")
+    for conflict in graph.conflicts:
+        a, b = conflict["tasks"]
+        console.print(f"[yellow]Warning:[/yellow] {a} and {b} are both [P] but touch {conflict['file']}; they run in order")
+
+
+@app.command()
+def implement(
+    workers: int = typer.Option(4, "--workers", min=1, help="Agent processes to run at once"),
+    ai: str = typer.Option(None, "--ai", help="Agent CLI to run tasks with: claude, gemini, qwen, codex, opencode, cursor or auggie (default: detected)"),
+    tasks_file: Path = typer.Option(None, "--tasks", help="tasks.md to execute (default: the current feature's)"),
+    agent_args: list[str] = typer.Option(None, "--agent-arg", help="Extra argument for every agent invocation, e.g. --agent-arg=--yolo (repeatable)"),
+    timeout: float = typer.Option(None, "--timeout", help="Stop a task's agent after this many seconds and count the task as failed"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Show the schedule and agent command without running anything"),
+    output: str = typer.Option("text", "--output", help="Progress output: text (live tree on a terminal, plain lines otherwise) or json (NDJSON task events on stdout)"),
+    events: Path = typer.Option(None, "--events", help="Also write every task event as NDJSON to this file"),
+):
+    """Run the feature's unchecked tasks on parallel agent processes, following the task graph."""
+    from .implement import AGENT_COMMANDS, TaskRunner, agent_command, default_agent
+    from .paths import PrerequisiteError, check_prerequisites, resolve_paths
+    from .tasks import TaskGraph, TaskGraphError
+
+    _check_output(output)
+    resolved = resolve_paths()
+    repo_root = Path(resolved["REPO_ROOT"])
+    if tasks_file is None:
+        try:
+            check_prerequisites(resolved, require_tasks=True)
+        except PrerequisiteError as e:
+            console.print(f"[red]Error:[/red] {e}")
+            if e.hint:
+                console.print(f"[dim]{e.hint}[/dim]")
+            raise typer.Exit(1)
+        tasks_file = Path(resolved["TASKS"])
+    tasks_file = tasks_file.resolve()
+    # The feature is the directory holding tasks.md, so --tasks wins over the current branch
+    feature_dir = tasks_file.parent
+    try:
+        graph = TaskGraph.from_file(tasks_file, remaining=True)
+    except OSError as e:
+        console.print(f"[red]Error:[/red] Cannot read {tasks_file}: {e.strerror or e}")
+        raise typer.Exit(1)
+    except TaskGraphError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+    if not graph.tasks:
+        console.print(f"[green]All tasks in {tasks_file} are already checked off.[/green]")
+        return
+
+    if ai is None:
+        ai = default_agent(repo_root, which)
+        if ai is None:
+            console.print(f"[red]Error:[/red] No agent CLI found; install one of: {', '.join(AGENT_COMMANDS)}")
+            raise typer.Exit(1)
+    elif ai not in AGENT_COMMANDS:
+        console.print(f"[red]Error:[/red] '{ai}' has no command-line agent to run tasks with. Choose from: {', '.join(AGENT_COMMANDS)}")
+        raise typer.Exit(1)
+    command = agent_command(ai, which, agent_args)
+    if command is None and not dry_run:
+        console.print(f"[red]Error:[/red] {AGENT_COMMANDS[ai][0]} not found on PATH")
+        raise typer.Exit(1)
+
+    summary = graph.summary()
+    console.print(f"[cyan]Tasks:[/cyan] {summary['tasks']} remaining in {tasks_file}")
+    console.print(f"[cyan]Agent:[/cyan] {ai} [dim]({' '.join(command or AGENT_COMMANDS[ai])} <prompt>)[/dim]")
+    console.print(f"[cyan]Schedule:[/cyan] {summary['waves']} waves, up to {summary['max_parallel']} tasks at once, {workers} workers")
+    if dry_run:
+        for i, wave in enumerate(graph.waves(), start=1):
+            console.print(f"  [bright_black]wave {i}:[/bright_black] {' '.join(wave)}")
+        return
+
+    outputs = ExitStack()
+    tracker, live_view = _tracker_outputs(f"Implement {feature_dir.name}", output, events, outputs)
+    for task in graph.tasks.values():
+        label = task.description if len(task.description) <= 60 else task.description[:59] + "…"
+        tracker.add(task.id, f"{task.id} {label}")
+    runner_events = {"running": tracker.start, "done": tracker.complete, "failed": tracker.error, "blocked": tracker.skip}
+    runner = TaskRunner(
+        graph,
+        command,
+        repo_root=repo_root,
+        feature_dir=feature_dir,
+        tasks_file=tasks_file,
+        workers=workers,
+        timeout=timeout,
+        on_event=lambda task_id, status, detail: runner_events[status](task_id, detail or status),
+    )
+
+    from rich.live import Live
+    interrupted = False
+    with outputs, (Live(tracker, console=console, refresh_per_second=8, transient=True) if live_view else nullcontext()):
+        try:
+            statuses = runner.run()
+        except KeyboardInterrupt:
+            interrupted = True
+            statuses = runner.status
+    if live_view:
+        console.print(tracker.render())
+
+    counts = {status: sum(1 for s in statuses.values() if s == status) for status in ("done", "failed", "blocked")}
+    console.print(f"\n{counts['done']} done, {counts['failed']} failed, {counts['blocked']} blocked [dim](agent logs in {runner.log_dir})[/dim]")
+    if interrupted or counts["failed"] or counts["blocked"]:
+        raise typer.Exit(1)
+
+
+@app.command("paths")
+def paths_command(
+    json_output: bool = typer.Option(False, "--json", help="Output in JSON format"),
+    require_tasks: bool = typer.Option(False, "--require-tasks", help="Require tasks.md to exist (for implementation phase)"),
+    include_tasks: bool = typer.Option(False, "--include-tasks", help="Include tasks.md in AVAILABLE_DOCS"),
+    paths_only: bool = typer.Option(False, "--paths-only", help="Only output path variables (no prerequisite validation)"),
+):
+    """Resolve the current feature's paths and available docs (like check-prerequisites.sh, without forking git)."""
+    from .paths import PrerequisiteError, check_prerequisites, resolve_paths
+
+    resolved = resolve_paths()
+    if not resolved["HAS_GIT"]:
+        print("[specify] Warning: Git repository not detected; skipped branch validation", file=sys.stderr)
+    try:
+        result = check_prerequisites(resolved, require_tasks=require_tasks, include_tasks=include_tasks, paths_only=paths_only)
+    except PrerequisiteError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        if e.hint:
+            print(e.hint, file=sys.stderr)
+        raise typer.Exit(1)
+
+    # Plain print: agents parse this output, so no Rich markup or wrapping
+    if json_output:
+        print(json.dumps(result, ensure_ascii=False, separators=(",", ":")))
+    elif paths_only:
+        for key, value in result.items():
+            print(f"{key}: {value}")
+    else:
+        print(f"FEATURE_DIR:{result['FEATURE_DIR']}")
+        print("AVAILABLE_DOCS:")
+        candidates = ["research.md", "data-model.md", "contracts/", "quickstart.md"] + (["tasks.md"] if include_tasks else [])
+        for doc in candidates:
+            print(f"  {'✓' if doc in result['AVAILABLE_DOCS'] else '✗'} {doc}")
+
+
+@app.command()
+def daemon(
+    socket_path: Path = typer.Option(None, "--socket", help="Unix socket to listen on (default: <repo>/.specify/daemon.sock)"),
+    idle_timeout: float = typer.Option(3600.0, "--idle-timeout", help="Exit after this many seconds without requests (0 = never)"),
+):
+    """Answer `specify paths` queries over a Unix socket from an mtime-invalidated cache (opt-in)."""
+    from .daemon import DEFAULT_SOCKET, DaemonError, serve
+    from .paths import resolve_paths
+
+    root = Path(resolve_paths()["REPO_ROOT"])
+    socket_path = socket_path or root / DEFAULT_SOCKET
+    try:
+        serve(
+            root,
+            socket_path,
+            idle_timeout=idle_timeout or None,
+            on_ready=lambda path: console.print(f"[cyan]Listening on[/cyan] {path} [dim](repository {root}; Ctrl+C to stop)[/dim]"),
+        )
+    except DaemonError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+    except KeyboardInterrupt:
+        pass
+
+
 def main():
     app()
 
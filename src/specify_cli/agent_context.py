@@ -0,0 +1,319 @@
+"""
+Update AI agent context files (CLAUDE.md, GEMINI.md, AGENTS.md, ...) from a feature's plan.md.
+
+Python port of ``update-agent-context.sh``/``.ps1``. ``plan.md`` is parsed in one pass,
+the update (technology entries, recent-change entry, the content of a new file) is
+computed once and then applied to every agent file concurrently. Each file is written
+atomically (temporary file in the same directory, then rename) and only when its
+content actually changes.
+
+Usage:
+    specify context update [AGENT]
+    python .specify/scripts/python/agent_context.py [AGENT]
+
+Without AGENT every existing agent file is updated (a CLAUDE.md is created when none
+exist). This module only uses the standard library: release archives ship a copy at
+``.specify/scripts/python/agent_context.py``, which the bash and PowerShell
+``update-agent-context`` scripts run.
+"""
+
+# Run by whatever python3 the project has, so keep annotations lazy for older interpreters
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+
+try:
+    from .paths import resolve_paths
+except ImportError:  # run as a script: paths.py sits next to this file
+    from paths import resolve_paths
+
+# Agent -> (context file relative to the repository root, display name)
+AGENT_CONTEXT_FILES = {
+    "claude": ("CLAUDE.md", "Claude Code"),
+    "gemini": ("GEMINI.md", "Gemini CLI"),
+    "copilot": (".github/copilot-instructions.md", "GitHub Copilot"),
+    "cursor": (".cursor/rules/specify-rules.mdc", "Cursor IDE"),
+    "qwen": ("QWEN.md", "Qwen Code"),
+    "opencode": ("AGENTS.md", "opencode"),
+    "codex": ("AGENTS.md", "Codex CLI"),
+    "windsurf": (".windsurf/rules/specify-rules.md", "Windsurf"),
+    "kilocode": (".kilocode/rules/specify-rules.md", "Kilo Code"),
+    "auggie": (".augment/rules/specify-rules.md", "Auggie CLI"),
+    "roo": (".roo/rules/specify-rules.md", "Roo Code"),
+}
+TEMPLATE_PATH = ".specify/templates/agent-file-template.md"
+
+# plan.md "**Field**: value" lines -> parsed key
+PLAN_FIELDS = {
+    "Language/Version": "language",
+    "Primary Dependencies": "framework",
+    "Storage": "database",
+    "Project Type": "project_type",
+}
+_PLAN_FIELD = re.compile(r"^\*\*(" + "|".join(re.escape(f) for f in PLAN_FIELDS) + r")\*\*: (.*)$")
+_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_LAST_UPDATED = re.compile(r"\*\*Last updated\*\*:.*\d{4}-\d{2}-\d{2}")
+
+
+class ContextError(RuntimeError):
+    """The update cannot run (no feature, no plan.md); hints say how to fix it."""
+
+    def __init__(self, message: str, hints: list[str] | None = None):
+        super().__init__(message)
+        self.hints = hints or []
+
+
+def feature_paths(cwd: Path | None = None) -> dict:
+    """Repository root, current feature and its plan.md, resolved like common.sh's get_feature_paths."""
+    paths = resolve_paths(cwd)
+    return {
+        "repo_root": Path(paths["REPO_ROOT"]),
+        "branch": paths["CURRENT_BRANCH"],
+        "has_git": paths["HAS_GIT"],
+        "feature_dir": Path(paths["FEATURE_DIR"]),
+        "impl_plan": Path(paths["IMPL_PLAN"]),
+    }
+
+
+def parse_plan(path: Path) -> dict:
+    """Read the technical-context fields from plan.md in one pass (first occurrence of each)."""
+    plan = {key: "" for key in PLAN_FIELDS.values()}
+    seen = set()
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            match = _PLAN_FIELD.match(line.rstrip("\r\n"))
+            if not match or match.group(1) in seen:
+                continue
+            seen.add(match.group(1))
+            value = match.group(2).strip()
+            if "NEEDS CLARIFICATION" in value or value == "N/A":
+                value = ""
+            plan[PLAN_FIELDS[match.group(1)]] = value
+            if len(seen) == len(PLAN_FIELDS):
+                break
+    return plan
+
+
+def _commands_for(language: str) -> str:
+    if "Python" in language:
+        return "cd src && pytest && ruff check ."
+    if "Rust" in language:
+        return "cargo test && cargo clippy"
+    if "JavaScript" in language or "TypeScript" in language:
+        return "npm test && npm run lint"
+    return f"# Add commands for {language}"
+
+
+def _replace_first_per_line(text: str, old: str, new: str) -> str:
+    return "\n".join(line.replace(old, new, 1) for line in text.split("\n"))
+
+
+class ContextUpdate:
+    """The changes derived from one plan.md, computed once and applied to every agent file."""
+
+    def __init__(self, plan: dict, branch: str, project_name: str, today: str):
+        self.plan = plan
+        self.branch = branch
+        self.project_name = project_name
+        self.today = today
+        self.tech_stack = " + ".join(v for v in (plan["language"], plan["framework"]) if v)
+        self.database = plan["database"]
+        if self.tech_stack:
+            self.change_entry = f"- {branch}: Added {self.tech_stack}"
+        elif self.database:
+            self.change_entry = f"- {branch}: Added {self.database}"
+        else:
+            self.change_entry = ""
+
+    def new_file(self, template: str) -> str:
+        """Content of a new agent file created from agent-file-template.md."""
+        language = self.plan["language"]
+        subject = self.tech_stack
+        tech = f"- {subject} ({self.branch})" if subject else f"- ({self.branch})"
+        change = f"- {self.branch}: Added {subject}" if subject else f"- {self.branch}: Added"
+        structure = "backend/\nfrontend/\ntests/" if "web" in self.plan["project_type"] else "src/\ntests/"
+        text = template
+        for old, new in (
+            ("[PROJECT NAME]", self.project_name),
+            ("[DATE]", self.today),
+            ("[EXTRACTED FROM ALL PLAN.MD FILES]", tech),
+            ("[ONLY COMMANDS FOR ACTIVE TECHNOLOGIES]", _commands_for(language)),
+            ("[LANGUAGE-SPECIFIC, ONLY FOR LANGUAGES IN USE]", f"{language}: Follow standard conventions"),
+            ("[LAST 3 FEATURES AND WHAT THEY ADDED]", change),
+        ):
+            text = _replace_first_per_line(text, old, new)
+        return text.replace("[ACTUAL STRUCTURE FROM PLANS]", structure)
+
+    def apply(self, text: str) -> str:
+        """Update an existing agent file: add technologies, prepend the change, refresh the date."""
+        new_tech = []
+        if self.tech_stack and self.tech_stack not in text:
+            new_tech.append(f"- {self.tech_stack} ({self.branch})")
+        if self.database and self.database not in text:
+            new_tech.append(f"- {self.database} ({self.branch})")
+
+        out = []
+        in_tech = in_changes = tech_added = False
+        kept_changes = 0
+        for line in text.splitlines():
+            if line == "## Active Technologies":
+                out.append(line)
+                in_tech = True
+                continue
+            if in_tech and (line.startswith("## ") or line.startswith("##\t") or not line):
+                if not tech_added and new_tech:
+                    out.extend(new_tech)
+                    tech_added = True
+                out.append(line)
+                in_tech = bool(not line)
+                continue
+            if line == "## Recent Changes":
+                out.append(line)
+                if self.change_entry:
+                    out.append(self.change_entry)
+                in_changes = True
+                continue
+            if in_changes and (line.startswith("## ") or line.startswith("##\t")):
+                out.append(line)
+                in_changes = False
+                continue
+            if in_changes and line.startswith("- "):
+                # Keep the two most recent earlier changes; re-running for the same feature
+                # must not push its own entry down the list
+                if kept_changes < 2 and line != self.change_entry:
+                    out.append(line)
+                    kept_changes += 1
+                continue
+            if _LAST_UPDATED.search(line):
+                line = _DATE.sub(self.today, line, count=1)
+            out.append(line)
+        if in_tech and not tech_added and new_tech:
+            out.extend(new_tech)
+        return "\n".join(out) + "\n"
+
+
+def write_atomic(path: Path, text: str) -> None:
+    """Replace path with text via a temporary file in the same directory."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as fh:
+            fh.write(text)
+        if path.exists():
+            os.chmod(tmp, path.stat().st_mode & 0o7777)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _update_file(path: Path, update: ContextUpdate, template: str | None) -> tuple[str, str | None]:
+    """Apply the update to one file; returns (action, error) with action created/updated/unchanged/failed."""
+    try:
+        try:
+            current = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            current = None
+        if current is None:
+            if template is None:
+                return "failed", "agent file template not found"
+            write_atomic(path, update.new_file(template))
+            return "created", None
+        content = update.apply(current)
+        if content == current:
+            return "unchanged", None
+        write_atomic(path, content)
+        return "updated", None
+    except OSError as e:
+        return "failed", str(e)
+
+
+def update_context(agent: str | None = None, *, cwd: Path | None = None, workers: int | None = None, today: str | None = None) -> dict:
+    """Update one agent's context file, or every existing one when agent is None.
+
+    Returns {"repo_root", "feature", "plan_path", "plan", "files": [{"path", "agents", "action", "error"}]}.
+    Raises ContextError when there is no feature or plan.md, ValueError for an unknown agent.
+    """
+    if agent is not None and agent not in AGENT_CONTEXT_FILES:
+        raise ValueError(f"Unknown agent type '{agent}' (expected: {'|'.join(AGENT_CONTEXT_FILES)})")
+    paths = feature_paths(cwd)
+    repo_root, branch, plan_path = paths["repo_root"], paths["branch"], paths["impl_plan"]
+    if not plan_path.is_file():
+        hints = ["Make sure you're working on a feature with a corresponding spec directory"]
+        if not paths["has_git"]:
+            hints.append("Use: export SPECIFY_FEATURE=your-feature-name or create a new feature first")
+        raise ContextError(f"No plan.md found at {plan_path}", hints)
+
+    plan = parse_plan(plan_path)
+    update = ContextUpdate(plan, branch, repo_root.name, today or date.today().isoformat())
+    try:
+        template = (repo_root / TEMPLATE_PATH).read_text(encoding="utf-8")
+    except OSError:
+        template = None
+
+    # Several agents can share a file (AGENTS.md); update each file once
+    targets: dict[str, list[str]] = {}
+    candidates = [agent] if agent else list(AGENT_CONTEXT_FILES)
+    for name in candidates:
+        rel = AGENT_CONTEXT_FILES[name][0]
+        if agent or (repo_root / rel).is_file():
+            targets.setdefault(rel, []).append(name)
+    if not targets:
+        targets[AGENT_CONTEXT_FILES["claude"][0]] = ["claude"]
+
+    with ThreadPoolExecutor(max_workers=workers or min(len(targets), 8)) as pool:
+        futures = {rel: pool.submit(_update_file, repo_root / rel, update, template) for rel in targets}
+    files = []
+    for rel, future in futures.items():
+        action, error = future.result()
+        files.append({"path": repo_root / rel, "agents": targets[rel], "action": action, "error": error})
+    return {"repo_root": repo_root, "feature": branch, "plan_path": plan_path, "plan": plan, "files": files}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="update-agent-context", description="Update agent context files with information from plan.md.")
+    parser.add_argument("agent", nargs="?", choices=list(AGENT_CONTEXT_FILES), help="Agent to update (default: every existing agent file)")
+    args = parser.parse_args(argv)
+
+    try:
+        result = update_context(args.agent)
+    except ContextError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        for hint in e.hints:
+            print(f"INFO: {hint}")
+        return 1
+
+    print(f"INFO: === Updating agent context files for feature {result['feature']} ===")
+    print(f"INFO: Parsed plan data from {result['plan_path']}")
+    plan = result["plan"]
+    if not plan["language"]:
+        print("WARNING: No language information found in plan", file=sys.stderr)
+    for key, label in (("language", "language"), ("framework", "framework"), ("database", "database"), ("project_type", "project type")):
+        if plan[key]:
+            print(f"INFO: Found {label}: {plan[key]}")
+    failed = False
+    for entry in result["files"]:
+        names = "/".join(AGENT_CONTEXT_FILES[a][1] for a in entry["agents"])
+        if entry["action"] == "failed":
+            failed = True
+            print(f"ERROR: Failed to update {names} context file {entry['path']}: {entry['error']}", file=sys.stderr)
+        elif entry["action"] == "unchanged":
+            print(f"INFO: {names} context file already up to date: {entry['path']}")
+        else:
+            print(f"✓ {entry['action'].capitalize()} {names} context file: {entry['path']}")
+    if failed:
+        print("ERROR: Agent context update completed with errors", file=sys.stderr)
+        return 1
+    print("✓ Agent context update completed successfully")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+"""
+Manifest-driven batch provisioning for ``specify init --batch``.
+
+A manifest lists the projects to create. Shared settings go in ``defaults`` and
+every project may override them:
+
+    [defaults]
+    ai = "claude"
+    script = "sh"
+
+    [[projects]]
+    path = "services/api"
+
+    [[projects]]
+    path = "services/web"
+    ai = "copilot"
+    no_git = true
+
+JSON manifests use the same shape (``{"defaults": {...}, "projects": [...]}``) or a
+bare list of projects. Relative paths resolve against the manifest's directory.
+``merge = true`` merges into an existing directory like ``init --here --force``.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+PROJECT_KEYS = {"path", "ai", "script", "no_git", "merge"}
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 4
+
+
+def load_manifest(manifest_path: Path, ai_choices: dict, script_choices: dict, default_script: str) -> list[dict]:
+    """Parse and validate a batch manifest into normalized project entries.
+
+    Raises ValueError describing the first invalid entry.
+    """
+    manifest_path = Path(manifest_path)
+    raw = manifest_path.read_bytes()
+    if manifest_path.suffix == ".toml":
+        import tomllib
+        data = tomllib.loads(raw.decode("utf-8"))
+    elif manifest_path.suffix == ".json":
+        data = json.loads(raw)
+    else:
+        raise ValueError(f"Unsupported manifest type '{manifest_path.suffix}' (use .json or .toml)")
+
+    if isinstance(data, list):
+        data = {"projects": data}
+    defaults = data.get("defaults", {})
+    projects = data.get("projects")
+    if not isinstance(projects, list) or not projects:
+        raise ValueError("Manifest must contain a non-empty 'projects' list")
+
+    base_dir = manifest_path.resolve().parent
+    entries = []
+    seen = set()
+    for i, project in enumerate(projects, start=1):
+        if not isinstance(project, dict):
+            raise ValueError(f"Project #{i} must be a table/object")
+        entry = {**defaults, **project}
+        unknown = set(entry) - PROJECT_KEYS
+        if unknown:
+            raise ValueError(f"Project #{i} has unknown keys: {', '.join(sorted(unknown))}")
+        if not entry.get("path"):
+            raise ValueError(f"Project #{i} is missing 'path'")
+        ai = entry.get("ai")
+        if ai not in ai_choices:
+            raise ValueError(f"Project #{i} ({entry['path']}): invalid ai '{ai}'. Choose from: {', '.join(ai_choices)}")
+        script = entry.get("script") or default_script
+        if script not in script_choices:
+            raise ValueError(f"Project #{i} ({entry['path']}): invalid script '{script}'. Choose from: {', '.join(script_choices)}")
+        path = Path(entry["path"]).expanduser()
+        if not path.is_absolute():
+            path = base_dir / path
+        path = path.resolve()
+        if path in seen:
+            raise ValueError(f"Project #{i}: path {path} is listed more than once")
+        seen.add(path)
+        entries.append({
+            "path": path,
+            "ai": ai,
+            "script": script,
+            "no_git": bool(entry.get("no_git", False)),
+            "merge": bool(entry.get("merge", False)),
+        })
+    return entries
+
+
+def run_batch(
+    projects: list[dict],
+    *,
+    client,
+    release_data: dict,
+    download_dir: Path,
+    cache=None,
+    github_token: str | None = None,
+    workers: int | None = None,
+    debug: bool = False,
+    on_result: Callable[[dict], None] | None = None,
+) -> list[dict]:
+    """Provision every project; returns one result dict per project in manifest order.
+
+    Each distinct asset is downloaded once: from a layered release that is one base per
+    script type plus one overlay per (ai, script), otherwise one full archive per (ai, script).
+    Downloads are queued ahead of the per-project work so a worker never waits on a download
+    that has not started.
+    """
+    from . import (
+        StepTracker,
+        _apply_overlay,
+        _combine_stats,
+        check_tool,
+        download_template_from_github,
+        ensure_executable_scripts,
+        extract_template,
+        init_git_repo,
+        is_git_repo,
+        write_manifest,
+    )
+    from .release import asset_layers, find_asset
+
+    git_available = any(not p["no_git"] for p in projects) and check_tool("git", "https://git-scm.com/downloads")
+
+    def archives(project: dict) -> list[tuple[str, str, str, str | None]]:
+        """(asset name, ai, script, layer) of every archive project needs, in the order they are applied."""
+        ai, script = project["ai"], project["script"]
+        found = []
+        for layer in asset_layers(release_data, ai, script):
+            asset = find_asset(release_data, ai, script, layer)
+            found.append((asset["name"] if asset else f"{ai}/{script}", ai, script, layer))
+        return found
+
+    def download(ai: str, script: str, layer: str | None):
+        try:
+            return download_template_from_github(
+                ai,
+                download_dir,
+                script_type=script,
+                verbose=False,
+                show_progress=False,
+                client=client,
+                debug=debug,
+                github_token=github_token,
+                cache=cache,
+                release_data=release_data,
+                layer=layer,
+            )
+        except Exception as e:
+            # download_template_from_github prints its own error panel before raising typer.Exit
+            raise RuntimeError(f"download failed for {ai}/{script}") from e
+
+    def failed_detail(tracker: StepTracker, fallback: str) -> str:
+        errors = [s.detail for s in tracker.steps if s.status == "error" and s.detail]
+        return errors[0] if errors else fallback
+
+    def provision(project: dict, asset_futures: list[Future]) -> dict:
+        path = project["path"]
+        result = {
+            "path": str(path),
+            "ai": project["ai"],
+            "script": project["script"],
+            "status": "ok",
+            "detail": "",
+            "git": "skipped",
+            "seconds": 0.0,
+        }
+        start = time.perf_counter()
+        tracker = StepTracker(str(path))
+        try:
+            if path.exists() and not project["merge"]:
+                raise RuntimeError("directory already exists (set merge = true to merge into it)")
+            (zip_path, meta), *overlays = [f.result() for f in asset_futures]
+            result["release"] = meta["release"]
+            if project["merge"]:
+                path.mkdir(parents=True, exist_ok=True)
+            try:
+                extraction = extract_template(zip_path, path, project["merge"], verbose=False, tracker=tracker, debug=debug, strip_root=not overlays)
+                for overlay_path, _ in overlays:
+                    _combine_stats(extraction, _apply_overlay(overlay_path, path, key="overlay", tracker=tracker, backup=False))
+            except Exception as e:
+                raise RuntimeError(failed_detail(tracker, f"extraction failed: {e}")) from e
+            ensure_executable_scripts(path, tracker=tracker, extraction=extraction)
+            manifest_path = write_manifest(path, release=meta["release"], agents=[project["ai"]], script=project["script"], paths=extraction["paths"])
+            extraction["paths"].append(manifest_path.relative_to(path).as_posix())
+            if project["no_git"]:
+                result["git"] = "skipped"
+            elif is_git_repo(path):
+                result["git"] = "existing repo"
+            elif git_available:
+                git = init_git_repo(path, quiet=True, paths=extraction["paths"])
+                result["git"] = "initialized" if git else "init failed"
+                if git:
+                    result["git_ms"] = git["phases"]
+            else:
+                result["git"] = "git not available"
+        except Exception as e:
+            result["status"] = "error"
+            result["detail"] = str(e)
+        result["seconds"] = round(time.perf_counter() - start, 3)
+        if on_result:
+            on_result(result)
+        return result
+
+    with ThreadPoolExecutor(max_workers=workers or default_workers()) as pool:
+        asset_futures = {}
+        needed = []
+        for project in projects:
+            project_archives = archives(project)
+            for name, *args in project_archives:
+                if name not in asset_futures:
+                    asset_futures[name] = pool.submit(download, *args)
+            needed.append([asset_futures[name] for name, *_ in project_archives])
+        result_futures = [pool.submit(provision, p, futures) for p, futures in zip(projects, needed)]
+        return [f.result() for f in result_futures]
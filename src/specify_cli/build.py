@@ -0,0 +1,415 @@
+"""
+Release packager for the Spec Kit templates.
+
+Builds ``spec-kit-template-<agent>-<script>-<version>.zip`` for every agent and script
+type, the assets ``specify init`` downloads. Every variant carries the same ``.specify/``
+payload for its script type, so releases are also layered: one
+``spec-kit-base-<script>-<version>.zip`` per script type (memory, scripts, templates) and
+a small ``spec-kit-overlay-<agent>-<script>-<version>.zip`` per variant (the agent's
+commands and plan template) that is applied on top of it. Clients that know about layers
+download and cache the base once for all agents; older clients keep using the full
+archives. ``--layout`` picks which of the two sets to build (default: both). The shared tree (memory/, scripts/,
+templates/) is read and the command templates are compiled once (see templating.py);
+variants are then rendered and zipped in parallel over a process pool. Archives are reproducible: entries
+are sorted, timestamps are fixed (``SOURCE_DATE_EPOCH`` or 1980-01-01) and permissions
+are normalised (0755 for scripts with a shebang, 0644 otherwise, stored as Unix mode bits
+that ``specify init`` applies while extracting), so the same inputs always produce the same bytes.
+
+Builds are incremental. ``build-manifest.json`` in the output directory records, per
+variant, hashes of its inputs (memory files, the script variant, templates, command
+templates, the agent's command format, the packager and the template engine) and of
+the archive. A variant whose inputs are unchanged reuses its previous archive
+byte-for-byte (renamed for the new version); ``--explain`` prints why each variant was rebuilt or reused.
+
+Usage:
+    specify-build v0.0.30
+    python -m specify_cli.build v0.0.30 --agents claude,gemini --scripts sh
+    python src/specify_cli/build.py v0.0.30 --output .genreleases --jobs 4
+    specify-build v0.0.31 --explain   # show why each variant was rebuilt
+    specify-build v0.0.31 --force     # ignore the manifest and rebuild everything
+    specify-build v0.0.31 --layout layered   # base and overlay archives only
+
+``AGENTS``, ``SCRIPTS`` and ``LAYOUT`` environment variables are honoured as defaults, like
+the original create-release-packages.sh. This module only uses the standard library so the
+release workflow can run it straight from a checkout.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import stat
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    from .templating import AGENT_FORMATS, load_templates, render_commands, render_plan_template
+except ImportError:  # run as a script from a checkout: templating.py sits next to this file
+    from templating import AGENT_FORMATS, load_templates, render_commands, render_plan_template
+
+ASSET_TEMPLATE = "spec-kit-template-{agent}-{script}-{version}.zip"
+BASE_TEMPLATE = "spec-kit-base-{script}-{version}.zip"
+OVERLAY_TEMPLATE = "spec-kit-overlay-{agent}-{script}-{version}.zip"
+LAYOUTS = ("full", "layered", "both")
+DEFAULT_OUTPUT = ".genreleases"
+MANIFEST_NAME = "build-manifest.json"
+# Bump when the manifest layout changes
+MANIFEST_VERSION = 1
+VERSION_PATTERN = re.compile(r"^v\d+\.\d+\.\d+$")
+
+SCRIPT_DIRS = {"sh": "bash", "ps": "powershell"}
+
+# Python helpers the generated project's scripts run, shipped with every script variant
+# .specify/.gitignore: per-machine state the CLI and scripts keep under .specify/
+SPECIFY_GITIGNORE = (".specify/.gitignore", b"# Per-machine state written by the Specify CLI and scripts\n/index\n/.index.*.tmp\n", 0o644)
+RUNTIME_MODULES = {
+    "agent_context.py": ".specify/scripts/python/agent_context.py",
+    "features.py": ".specify/scripts/python/features.py",
+    "paths.py": ".specify/scripts/python/paths.py",
+    "tasks.py": ".specify/scripts/python/tasks.py",
+}
+
+# The packager's output also depends on the template engine
+_TEMPLATING_SOURCE = Path(__file__).with_name("templating.py").read_bytes()
+
+# zip cannot represent timestamps before 1980
+_ZIP_EPOCH = 315532800
+
+
+def _warn(message: str) -> None:
+    print(f"Warning: {message}", file=sys.stderr)
+
+
+def _file_mode(path: Path, data: bytes) -> int:
+    # Scripts with a shebang ship executable whatever the checkout's permissions (git on
+    # Windows, or a file committed without +x); extraction applies these modes
+    return 0o755 if data.startswith(b"#!") or path.stat().st_mode & stat.S_IXUSR else 0o644
+
+
+def _collect(src: Path, dest: str, *, exclude: str | None = None) -> list[tuple[str, bytes, int]]:
+    files = []
+    for path in sorted(src.rglob("*")):
+        if not path.is_file():
+            continue
+        rel = path.relative_to(src).as_posix()
+        if exclude and (rel == exclude or rel.startswith(exclude + "/")):
+            continue
+        data = path.read_bytes()
+        files.append((f"{dest}/{rel}", data, _file_mode(path, data)))
+    return files
+
+
+def load_tree(root: Path) -> dict:
+    """Read everything the variants are built from, once."""
+    root = Path(root)
+    tree = {"common": [SPECIFY_GITIGNORE], "scripts": {}, "commands": [], "plan_template": None, "extra": {}}
+    if (root / "memory").is_dir():
+        tree["common"] += _collect(root / "memory", ".specify/memory")
+    if (root / "templates").is_dir():
+        for arcname, data, mode in _collect(root / "templates", ".specify/templates", exclude="commands"):
+            if arcname == ".specify/templates/plan-template.md":
+                tree["plan_template"] = (data, mode)
+            else:
+                tree["common"].append((arcname, data, mode))
+        commands_dir = root / "templates" / "commands"
+        tree["commands"] = load_templates(commands_dir)
+        for template in tree["commands"]:
+            for script in SCRIPT_DIRS:
+                if template.script_command(script) is None:
+                    _warn(f"no script command found for {script} in templates/commands/{template.name}.md")
+    scripts_dir = root / "scripts"
+    runtime = [(arcname, Path(__file__).with_name(module).read_bytes(), 0o644) for module, arcname in RUNTIME_MODULES.items()]
+    for script, subdir in SCRIPT_DIRS.items():
+        files = []
+        if scripts_dir.is_dir():
+            if (scripts_dir / subdir).is_dir():
+                files += _collect(scripts_dir / subdir, f".specify/scripts/{subdir}")
+            # Loose files in scripts/ ship with every variant
+            for path in sorted(scripts_dir.iterdir()):
+                if path.is_file():
+                    data = path.read_bytes()
+                    files.append((f".specify/scripts/{path.name}", data, _file_mode(path, data)))
+        tree["scripts"][script] = files + runtime
+    for fmt in AGENT_FORMATS.values():
+        for src, dest in fmt.get("extra", {}).items():
+            if (root / src).is_file():
+                data = (root / src).read_bytes()
+                tree["extra"][src] = (data, _file_mode(root / src, data))
+    return tree
+
+
+def base_files(tree: dict, script: str) -> list[tuple[str, bytes, int]]:
+    """The entries every agent's variant of script shares: memory, scripts and templates."""
+    return list(tree["common"]) + list(tree["scripts"][script])
+
+
+def overlay_files(tree: dict, agent: str, script: str) -> list[tuple[str, bytes, int]]:
+    """The entries one variant adds to its base: plan template, commands and agent extras."""
+    files = []
+    if tree["plan_template"] is not None:
+        raw, mode = tree["plan_template"]
+        rendered = render_plan_template(raw, agent, script)
+        if rendered is None:
+            _warn(f"no plan-template script command found for {script} in YAML frontmatter")
+            rendered = raw
+        files.append((".specify/templates/plan-template.md", rendered, mode))
+    files += [(arcname, content, 0o644) for arcname, content in render_commands(tree["commands"], agent, script)]
+    for src, dest in AGENT_FORMATS[agent].get("extra", {}).items():
+        if src in tree["extra"]:
+            data, mode = tree["extra"][src]
+            files.append((dest, data, mode))
+    return files
+
+
+def variant_files(tree: dict, agent: str, script: str) -> list[tuple[str, bytes, int]]:
+    """All (archive path, content, mode) entries of one variant."""
+    return base_files(tree, script) + overlay_files(tree, agent, script)
+
+
+def write_zip(path: Path, files: list[tuple[str, bytes, int]], epoch: int) -> None:
+    """Write a reproducible zip: sorted entries, explicit directories, fixed timestamps and modes."""
+    date_time = time.gmtime(max(epoch, _ZIP_EPOCH))[:6]
+    dirs = set()
+    for arcname, _, _ in files:
+        parts = arcname.split("/")[:-1]
+        for i in range(1, len(parts) + 1):
+            dirs.add("/".join(parts[:i]) + "/")
+    entries = sorted([(d, None, 0o755) for d in dirs] + list(files), key=lambda e: e[0])
+
+    tmp = path.with_name(path.name + ".tmp")
+    with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for arcname, data, mode in entries:
+            info = zipfile.ZipInfo(arcname, date_time=date_time)
+            info.create_system = 3  # unix, so external_attr carries permissions
+            if data is None:
+                info.external_attr = (stat.S_IFDIR | mode) << 16 | 0x10
+                zf.writestr(info, b"")
+            else:
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.external_attr = (stat.S_IFREG | mode) << 16
+                zf.writestr(info, data)
+    os.replace(tmp, path)
+
+
+def _hash_files(files) -> str:
+    digest = hashlib.sha256()
+    for arcname, data, mode in sorted(files, key=lambda f: f[0]):
+        digest.update(f"{arcname}\0{mode:o}\0{len(data)}\0".encode("utf-8"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def input_hashes(tree: dict, agent: str | None, script: str, epoch: int, kind: str = "full") -> dict[str, str]:
+    """Hashes of everything an archive is built from, one per input group.
+
+    kind is "full" (a variant), "base" (agent is ignored) or "overlay".
+    """
+    templates = [f for f in tree["common"] if f[0].startswith(".specify/templates/")]
+    plan = [(".specify/templates/plan-template.md", *tree["plan_template"])] if tree["plan_template"] else []
+    packager = hashlib.sha256(Path(__file__).read_bytes() + _TEMPLATING_SOURCE + str(epoch).encode("ascii")).hexdigest()
+    base = {
+        "memory": _hash_files([f for f in tree["common"] if f[0].startswith(".specify/memory/")]),
+        "scripts": _hash_files(tree["scripts"][script]),
+    }
+    if kind == "base":
+        return {**base, "templates": _hash_files(templates), "packager": packager}
+    fmt = AGENT_FORMATS[agent]
+    extra = [(dest, *tree["extra"][src]) for src, dest in fmt.get("extra", {}).items() if src in tree["extra"]]
+    commands = [(t.name, t.text.encode("utf-8"), 0) for t in tree["commands"]]
+    overlay = {
+        "commands": _hash_files(commands),
+        "format": hashlib.sha256(json.dumps({"agent": agent, **fmt}, sort_keys=True).encode("utf-8") + _hash_files(extra).encode("ascii")).hexdigest(),
+        "packager": packager,
+    }
+    if kind == "overlay":
+        return {"templates": _hash_files(plan), **overlay}
+    return {**base, "templates": _hash_files(templates + plan), **overlay}
+
+
+def _sha256_file(path: Path) -> str | None:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def load_manifest(output: Path) -> dict:
+    try:
+        data = json.loads((output / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data.get("variants", {}) if data.get("manifest_version") == MANIFEST_VERSION else {}
+
+
+def save_manifest(output: Path, version: str, variants: dict) -> None:
+    tmp = output / (MANIFEST_NAME + ".tmp")
+    tmp.write_text(json.dumps({"manifest_version": MANIFEST_VERSION, "version": version, "variants": variants}, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(tmp, output / MANIFEST_NAME)
+
+
+def plan_build(output: Path, previous: dict, key: str, inputs: dict) -> tuple[Path | None, str]:
+    """Decide whether a variant can reuse its previous archive; returns (archive to reuse, reason)."""
+    entry = previous.get(key)
+    if not entry:
+        return None, "no previous build"
+    changed = sorted(k for k in inputs if entry.get("inputs", {}).get(k) != inputs[k])
+    if changed:
+        return None, f"{', '.join(changed)} changed"
+    archive = output / entry.get("archive", "")
+    if not entry.get("archive") or not archive.is_file():
+        return None, "previous archive missing"
+    if _sha256_file(archive) != entry.get("sha256"):
+        return None, "previous archive modified"
+    return archive, "inputs unchanged"
+
+
+_worker_tree: dict | None = None
+
+
+def _init_worker(tree: dict) -> None:
+    global _worker_tree
+    _worker_tree = tree
+
+
+def archive_name(kind: str, agent: str | None, script: str, version: str) -> str:
+    template = {"full": ASSET_TEMPLATE, "base": BASE_TEMPLATE, "overlay": OVERLAY_TEMPLATE}[kind]
+    return template.format(agent=agent, script=script, version=version)
+
+
+def _manifest_key(kind: str, agent: str | None, script: str) -> str:
+    # Full variants keep their original "<agent>-<script>" keys so older manifests still match
+    return {"full": f"{agent}-{script}", "base": f"base-{script}", "overlay": f"overlay-{agent}-{script}"}[kind]
+
+
+def _archive_files(tree: dict, kind: str, agent: str | None, script: str) -> list[tuple[str, bytes, int]]:
+    if kind == "base":
+        return base_files(tree, script)
+    if kind == "overlay":
+        return overlay_files(tree, agent, script)
+    return variant_files(tree, agent, script)
+
+
+def _build_variant(kind: str, agent: str | None, script: str, version: str, output: str, epoch: int) -> str:
+    path = Path(output) / archive_name(kind, agent, script, version)
+    write_zip(path, _archive_files(_worker_tree, kind, agent, script), epoch)
+    return str(path)
+
+
+def _parse_list(value: str | None, allowed, kind: str) -> list[str]:
+    if not value:
+        return list(allowed)
+    items = []
+    for item in re.split(r"[,\s]+", value.strip()):
+        if item and item not in items:
+            items.append(item)
+    unknown = [i for i in items if i not in allowed]
+    if unknown:
+        raise SystemExit(f"Error: unknown {kind} '{', '.join(unknown)}' (allowed: {' '.join(allowed)})")
+    return items
+
+
+def build(version: str, *, root: Path = Path("."), output: Path | None = None, agents: list[str] | None = None, scripts: list[str] | None = None, jobs: int | None = None, epoch: int | None = None, force: bool = False, layout: str = "both") -> list[dict]:
+    """Build the requested archives, reusing unchanged ones.
+
+    layout is "full" (one archive per variant), "layered" (a base per script type plus an
+    overlay per variant) or "both". Returns one dict per archive: kind ("full", "base" or
+    "overlay"), agent (None for a base), script, path, action ("built" or "reused") and reason.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"layout must be one of {', '.join(LAYOUTS)}")
+    root = Path(root)
+    output = Path(output) if output else root / DEFAULT_OUTPUT
+    agents = agents or list(AGENT_FORMATS)
+    scripts = scripts or list(SCRIPT_DIRS)
+    if epoch is None:
+        epoch = int(os.environ.get("SOURCE_DATE_EPOCH", _ZIP_EPOCH))
+    output.mkdir(parents=True, exist_ok=True)
+
+    tree = load_tree(root)
+    previous = {} if force else load_manifest(output)
+    manifest = {}
+    results = []
+    to_build = []
+    archives = []
+    for script in scripts:
+        if layout != "full":
+            archives.append(("base", None, script))
+        for agent in agents:
+            if layout != "layered":
+                archives.append(("full", agent, script))
+            if layout != "full":
+                archives.append(("overlay", agent, script))
+    for kind, agent, script in archives:
+        key = _manifest_key(kind, agent, script)
+        inputs = input_hashes(tree, agent, script, epoch, kind)
+        path = output / archive_name(kind, agent, script, version)
+        reuse, reason = plan_build(output, previous, key, inputs) if not force else (None, "--force")
+        if reuse is not None and reuse != path:
+            os.replace(reuse, path)
+        result = {"kind": kind, "agent": agent, "script": script, "path": path, "action": "reused" if reuse else "built", "reason": reason}
+        results.append(result)
+        manifest[key] = {"inputs": inputs, "archive": path.name, "sha256": previous[key]["sha256"] if reuse else None}
+        if reuse is None:
+            to_build.append(result)
+
+    if to_build:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(tree,)) as pool:
+            futures = [(r, pool.submit(_build_variant, r["kind"], r["agent"], r["script"], version, str(output), epoch)) for r in to_build]
+            for result, future in futures:
+                future.result()
+                manifest[_manifest_key(result["kind"], result["agent"], result["script"])]["sha256"] = _sha256_file(result["path"])
+
+    # Keep entries for variants outside this build's subset so a later full build can reuse them
+    for key, entry in previous.items():
+        if key not in manifest and entry.get("archive") and (output / entry["archive"]).is_file():
+            manifest[key] = entry
+    # Any other archive is from an earlier version and was neither reused nor rebuilt
+    referenced = {entry["archive"] for entry in manifest.values()}
+    for stale in output.glob("spec-kit-*.zip"):
+        if stale.name not in referenced:
+            stale.unlink()
+    save_manifest(output, version, manifest)
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="specify-build", description="Build Spec Kit template release archives.")
+    parser.add_argument("version", help="Release version with leading 'v' (e.g. v0.2.0)")
+    parser.add_argument("--agents", default=os.environ.get("AGENTS"), help=f"Comma or space separated subset of: {' '.join(AGENT_FORMATS)} (default: all, or $AGENTS)")
+    parser.add_argument("--scripts", default=os.environ.get("SCRIPTS"), help="Comma or space separated subset of: sh ps (default: both, or $SCRIPTS)")
+    parser.add_argument("--root", type=Path, default=Path("."), help="Repository root containing memory/, scripts/ and templates/")
+    parser.add_argument("--output", type=Path, help=f"Output directory (default: <root>/{DEFAULT_OUTPUT})")
+    parser.add_argument("--jobs", type=int, help="Worker processes (default: number of CPUs)")
+    parser.add_argument("--force", action="store_true", help="Rebuild every variant even if its inputs are unchanged")
+    parser.add_argument("--layout", choices=LAYOUTS, default=os.environ.get("LAYOUT") or "both", help="full: one archive per variant; layered: a base per script type plus an overlay per variant; both (default, or $LAYOUT)")
+    parser.add_argument("--explain", action="store_true", help="Print why each variant was rebuilt or reused")
+    args = parser.parse_args(argv)
+
+    if not VERSION_PATTERN.match(args.version):
+        parser.error("Version must look like v0.0.0")
+    agents = _parse_list(args.agents, AGENT_FORMATS, "agent")
+    scripts = _parse_list(args.scripts, SCRIPT_DIRS, "script")
+
+    print(f"Building release packages for {args.version}")
+    print(f"Agents: {' '.join(agents)}")
+    print(f"Scripts: {' '.join(scripts)}")
+    print(f"Layout: {args.layout}")
+    started = time.perf_counter()
+    results = build(args.version, root=args.root, output=args.output, agents=agents, scripts=scripts, jobs=args.jobs, force=args.force, layout=args.layout)
+    for result in results:
+        verb = "Created" if result["action"] == "built" else "Reused "
+        line = f"{verb} {result['path']}"
+        if args.explain:
+            line += f"  ({result['reason']})"
+        print(line)
+    built = sum(r["action"] == "built" for r in results)
+    print(f"Built {built}, reused {len(results) - built} archives in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
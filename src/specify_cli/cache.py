@@ -0,0 +1,290 @@
+"""
+Content-addressed on-disk cache for downloaded template archives.
+
+Archives are stored once under ``objects/`` by SHA-256 and referenced from
+``refs/<release>/<asset>.json``. Every mutation happens under a cache-wide
+file lock and new objects are moved into place with an atomic rename, so
+several ``specify`` processes can safely share one cache directory.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+CACHE_DIR_ENV = "SPECIFY_CACHE_DIR"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Temp files older than this are leftovers from killed processes
+STALE_TMP_SECONDS = 24 * 60 * 60
+
+
+def default_cache_dir() -> Path:
+    """Return the specify cache root (``SPECIFY_CACHE_DIR`` overrides the platform default)."""
+    override = os.getenv(CACHE_DIR_ENV)
+    if override:
+        return Path(override).expanduser()
+    from platformdirs import user_cache_dir
+    return Path(user_cache_dir("specify-cli", appauthor=False))
+
+
+def parse_digest(digest: str | None) -> str | None:
+    """Return the hex SHA-256 from a GitHub asset ``digest`` field (``sha256:<hex>``), if any."""
+    if not digest or not digest.startswith("sha256:"):
+        return None
+    return digest.split(":", 1)[1].lower() or None
+
+
+@contextmanager
+def file_lock(lock_path: Path, blocking: bool = True):
+    """Hold an exclusive advisory lock on ``lock_path`` for the duration of the block.
+
+    With blocking=False, raises BlockingIOError instead of waiting when another process holds it.
+    """
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a+b") as fh:
+        if os.name == "nt":
+            import msvcrt
+            fh.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    if not blocking:
+                        raise BlockingIOError(f"{lock_path} is locked") from None
+                    # LK_LOCK gives up after ~10s; keep waiting like flock does
+                    continue
+            try:
+                yield
+            finally:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+def write_json_atomic(path: Path, data: dict) -> None:
+    """Write JSON to path via a temp file and rename so readers never see partial content."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+class TemplateCache:
+    """Release-asset cache keyed by release tag, asset name and SHA-256."""
+
+    def __init__(self, root: Path | None = None, max_bytes: int | None = DEFAULT_MAX_BYTES):
+        self.root = Path(root) if root else default_cache_dir() / "templates"
+        self.max_bytes = max_bytes
+        self.objects_dir = self.root / "objects"
+        self.refs_dir = self.root / "refs"
+        self.tmp_dir = self.root / "tmp"
+        self.lock_path = self.root / ".lock"
+
+    def _ref_path(self, release: str, asset_name: str) -> Path:
+        safe_release = release.replace("/", "_").replace("\\", "_")
+        return self.refs_dir / safe_release / f"{asset_name}.json"
+
+    def object_path(self, sha256: str) -> Path:
+        return self.objects_dir / sha256[:2] / f"{sha256}.zip"
+
+    def _read_ref(self, ref_path: Path) -> dict | None:
+        try:
+            return json.loads(ref_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def lookup(self, release: str, asset_name: str, sha256: str | None = None) -> Path | None:
+        """Return the cached archive path for a release asset, or None on a miss.
+
+        When ``sha256`` is known (from the release metadata) it must match the cached object,
+        so an asset re-uploaded under the same tag is treated as a miss.
+        """
+        ref_path = self._ref_path(release, asset_name)
+        ref = self._read_ref(ref_path)
+        if not ref:
+            return None
+        if sha256 and ref.get("sha256") != sha256:
+            return None
+        obj = self.object_path(ref["sha256"])
+        try:
+            if obj.stat().st_size != ref.get("size"):
+                return None
+        except OSError:
+            return None
+        with file_lock(self.lock_path):
+            ref = self._read_ref(ref_path)
+            if ref is None:
+                return None
+            ref["last_used"] = time.time()
+            write_json_atomic(ref_path, ref)
+        return obj
+
+    def partial_path(self, release: str, asset_name: str) -> Path:
+        """Stable download target for a release asset so an interrupted download can resume in a later run."""
+        safe_release = release.replace("/", "_").replace("\\", "_")
+        return self.tmp_dir / f"{safe_release}-{asset_name}"
+
+    @contextmanager
+    def download_lock(self, target: Path):
+        """Serialize processes downloading the same asset into the same partial file."""
+        with file_lock(target.with_name(target.name + ".lock")):
+            yield
+
+    def add_file(self, path: Path, release: str, asset_name: str, expected_sha256: str | None = None, *, sha256: str | None = None) -> Path:
+        """Verify a completed download and move it into the cache; returns the object path.
+
+        sha256 is the digest computed while the file was downloaded (see download.ContentHash);
+        without it the file is read and hashed here.
+        """
+        size = Path(path).stat().st_size
+        if sha256 is None:
+            digest = hashlib.sha256()
+            with open(path, "rb") as fh:
+                for block in iter(lambda: fh.read(1024 * 1024), b""):
+                    digest.update(block)
+            sha256 = digest.hexdigest()
+        if expected_sha256 and sha256 != expected_sha256:
+            Path(path).unlink(missing_ok=True)
+            raise RuntimeError(f"Checksum mismatch for {asset_name}: expected {expected_sha256}, got {sha256}")
+        return self._commit(Path(path), release, asset_name, sha256, size)
+
+    def _commit(self, tmp_path: Path, release: str, asset_name: str, sha256: str, size: int) -> Path:
+        obj = self.object_path(sha256)
+        now = time.time()
+        with file_lock(self.lock_path):
+            obj.parent.mkdir(parents=True, exist_ok=True)
+            if obj.exists():
+                tmp_path.unlink(missing_ok=True)
+            else:
+                os.replace(tmp_path, obj)
+            write_json_atomic(self._ref_path(release, asset_name), {
+                "release": release,
+                "asset": asset_name,
+                "sha256": sha256,
+                "size": size,
+                "created": now,
+                "last_used": now,
+            })
+            if self.max_bytes is not None:
+                self._prune_locked(max_bytes=self.max_bytes, keep=obj)
+        return obj
+
+    def entries(self) -> list[dict]:
+        """Return all cache entries, most recently used first."""
+        result = []
+        if not self.refs_dir.is_dir():
+            return result
+        for ref_path in self.refs_dir.glob("*/*.json"):
+            ref = self._read_ref(ref_path)
+            if not ref or "sha256" not in ref:
+                continue
+            ref["path"] = self.object_path(ref["sha256"])
+            ref["ref_path"] = ref_path
+            result.append(ref)
+        result.sort(key=lambda r: r.get("last_used", 0), reverse=True)
+        return result
+
+    def total_bytes(self) -> int:
+        total = 0
+        if self.objects_dir.is_dir():
+            for obj in self.objects_dir.glob("*/*.zip"):
+                try:
+                    total += obj.stat().st_size
+                except OSError:
+                    pass
+        return total
+
+    def prune(self, *, max_bytes: int | None = None, older_than: float | None = None, everything: bool = False) -> list[dict]:
+        """Evict entries and return the removed ones.
+
+        everything: drop the whole cache
+        older_than: drop entries not used within this many seconds
+        max_bytes: drop least-recently-used entries until the cache fits
+        """
+        with file_lock(self.lock_path):
+            return self._prune_locked(max_bytes=max_bytes, older_than=older_than, everything=everything)
+
+    def _prune_locked(self, *, max_bytes: int | None = None, older_than: float | None = None, everything: bool = False, keep: Path | None = None) -> list[dict]:
+        now = time.time()
+        entries = self.entries()
+        removed = []
+        survivors = []
+        for entry in entries:
+            expired = older_than is not None and now - entry.get("last_used", 0) > older_than
+            if everything or expired:
+                removed.append(entry)
+            else:
+                survivors.append(entry)
+
+        if max_bytes is not None:
+            sizes = {e["sha256"]: e.get("size", 0) for e in survivors}
+            total = sum(sizes.values())
+            # survivors are sorted most recent first; evict from the tail
+            while survivors and total > max_bytes:
+                victim = survivors[-1]
+                if keep is not None and victim["path"] == keep:
+                    break
+                survivors.pop()
+                removed.append(victim)
+                if all(s["sha256"] != victim["sha256"] for s in survivors):
+                    total -= sizes.get(victim["sha256"], 0)
+
+        for entry in removed:
+            entry["ref_path"].unlink(missing_ok=True)
+            try:
+                entry["ref_path"].parent.rmdir()
+            except OSError:
+                pass
+        live = {e["sha256"] for e in survivors}
+        if self.objects_dir.is_dir():
+            for obj in self.objects_dir.glob("*/*.zip"):
+                if obj.stem not in live:
+                    obj.unlink(missing_ok=True)
+        if self.tmp_dir.is_dir():
+            for tmp in self.tmp_dir.iterdir():
+                self._prune_tmp(tmp, now, everything)
+        return removed
+
+    def _prune_tmp(self, tmp: Path, now: float, everything: bool) -> None:
+        """Remove a leftover partial download unless another process may still be writing it.
+
+        Lock files are never removed: a process that opened one before the unlink would lock
+        an orphaned inode while the next one locks a fresh file, and the lock would no
+        longer serialize anything. A partial file goes once it is stale, or with everything
+        when nobody holds its download lock.
+        """
+        if tmp.suffix == ".lock":
+            return
+        try:
+            if now - tmp.stat().st_mtime > STALE_TMP_SECONDS:
+                tmp.unlink()
+                return
+            if not everything:
+                return
+            base = tmp.name
+            for suffix in (".part.json", ".part"):
+                base = base.removesuffix(suffix)
+            lock_path = tmp.with_name(base + ".lock")
+            if not lock_path.exists():
+                tmp.unlink()
+                return
+            with file_lock(lock_path, blocking=False):
+                tmp.unlink()
+        except OSError:
+            # BlockingIOError included: a download is in progress
+            pass
@@ -0,0 +1,151 @@
+"""
+``specify daemon``: answer feature-path queries over a Unix socket.
+
+Agents call ``check-prerequisites`` many times during ``/implement``; each call pays
+for a shell, several ``git`` forks and a test per document. The daemon keeps one
+``PathsCache`` per repository in memory and answers from it until the mtimes it depends
+on change, so a query costs a socket round trip. It is opt-in: the bundled
+``check-prerequisites`` scripts do not query it, so only clients that connect to the
+socket (``query`` below, ``nc -U``) benefit.
+
+Protocol: one request per line, written as the flags of ``specify paths``
+(``--require-tasks``, ``--include-tasks``, ``--paths-only``, ``--feature NAME``; an
+empty line means none), answered by one line of JSON: the same object ``specify paths
+--json`` prints, or ``{"ERROR": ..., "HINT": ...}``. For example::
+
+    printf -- '--require-tasks --include-tasks\\n' | nc -U .specify/daemon.sock
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from pathlib import Path
+
+from .paths import PathsCache, PrerequisiteError
+
+DEFAULT_SOCKET = ".specify/daemon.sock"
+DEFAULT_IDLE_TIMEOUT = 3600.0
+_FLAGS = {"--require-tasks": "require_tasks", "--include-tasks": "include_tasks", "--paths-only": "paths_only"}
+
+
+class DaemonError(RuntimeError):
+    """The daemon cannot start (unsupported platform, socket in use)."""
+
+
+def parse_request(line: str) -> dict:
+    """Turn a request line into PathsCache.query keyword arguments; raises ValueError."""
+    options = {}
+    tokens = line.split()
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token in _FLAGS:
+            options[_FLAGS[token]] = True
+        elif token == "--feature" and i + 1 < len(tokens):
+            options["feature"] = tokens[i + 1]
+            i += 1
+        elif token != "--json":
+            raise ValueError(f"Unknown option '{token}'")
+        i += 1
+    return options
+
+
+def answer(cache: PathsCache, line: str) -> dict:
+    try:
+        return cache.query(**parse_request(line))
+    except PrerequisiteError as e:
+        return {"ERROR": str(e), "HINT": e.hint}
+    except (ValueError, OSError) as e:
+        return {"ERROR": str(e), "HINT": None}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "PathsDaemon"
+
+    def handle(self):
+        # Several requests may share a connection
+        for raw in self.rfile:
+            self.server.touch()
+            with self.server.lock:
+                reply = answer(self.server.cache, raw.decode("utf-8", "replace").strip())
+            self.wfile.write(json.dumps(reply, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+
+    class PathsDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+        def __init__(self, socket_path: Path, cache: PathsCache):
+            self.cache = cache
+            self.lock = threading.Lock()
+            self.last_activity = time.monotonic()
+            super().__init__(str(socket_path), _Handler)
+
+        def touch(self) -> None:
+            self.last_activity = time.monotonic()
+
+else:  # pragma: no cover - Windows without AF_UNIX support in socketserver
+    PathsDaemon = None
+
+
+def _remove_stale_socket(socket_path: Path) -> None:
+    """Delete a socket file left by a daemon that is gone; fail if one is still answering."""
+    if not socket_path.exists():
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(socket_path))
+    except OSError:
+        socket_path.unlink()
+        return
+    finally:
+        probe.close()
+    raise DaemonError(f"A daemon is already listening on {socket_path}")
+
+
+def serve(root: Path, socket_path: Path, *, idle_timeout: float | None = DEFAULT_IDLE_TIMEOUT, on_ready=None) -> None:
+    """Serve queries for the repository at root until interrupted or idle for idle_timeout seconds."""
+    if PathsDaemon is None:
+        raise DaemonError("Unix sockets are not supported on this platform")
+    socket_path = Path(socket_path)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    _remove_stale_socket(socket_path)
+    server = PathsDaemon(socket_path, PathsCache(root))
+    try:
+        os.chmod(socket_path, 0o600)
+        if idle_timeout:
+            def watchdog():
+                while True:
+                    time.sleep(min(idle_timeout, 5))
+                    if time.monotonic() - server.last_activity > idle_timeout:
+                        server.shutdown()
+                        return
+
+            threading.Thread(target=watchdog, daemon=True).start()
+        if on_ready:
+            on_ready(socket_path)
+        server.serve_forever(poll_interval=0.5)
+    finally:
+        server.server_close()
+        socket_path.unlink(missing_ok=True)
+
+
+def query(socket_path: Path, line: str = "", timeout: float = 5.0) -> dict:
+    """Send one request to a running daemon and return its reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(str(socket_path))
+        client.sendall(line.encode("utf-8") + b"\n")
+        client.shutdown(socket.SHUT_WR)
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    return json.loads(data)
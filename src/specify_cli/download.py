@@ -0,0 +1,375 @@
+"""
+Resumable, retrying HTTP downloads for release assets.
+
+Bytes land in a ``<dest>.part`` file next to a small JSON sidecar that records which
+byte ranges are complete. A failed request is retried with jittered exponential
+backoff and resumes with an HTTP ``Range`` request from the last byte written; the
+sidecar lets a later process resume too. When the server supports ranges and the
+asset is large enough, the file is split into segments that are fetched concurrently
+over the client's connection pool (multiplexed on one connection when the client
+speaks HTTP/2). Read sizes adapt to the observed throughput. A ContentHash passed
+to download_file is fed as a single stream is written, so the caller gets the
+SHA-256 without reading the file back.
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+from .cache import write_json_atomic
+
+if TYPE_CHECKING:
+    import httpx
+
+DEFAULT_RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+# Assets smaller than this are never split into segments
+MIN_SEGMENT_BYTES = 4 * 1024 * 1024
+MIN_CHUNK = 64 * 1024
+MAX_CHUNK = 4 * 1024 * 1024
+# Aim for roughly this many seconds of data per write when sizing chunks
+CHUNK_TARGET_SECONDS = 0.25
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+
+
+class DownloadError(RuntimeError):
+    """The download failed and retrying will not help (or retries are exhausted)."""
+
+
+class _RetryableError(Exception):
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _RestartRequired(Exception):
+    """The server answered a range request with the full body; the partial file is useless."""
+
+
+class ContentHash:
+    """SHA-256 of a downloaded file, computed while download_file writes it.
+
+    A single stream feeds the hash as its bytes arrive. Bytes already on disk from an
+    earlier attempt, and files fetched in parallel segments, are read back once instead.
+    """
+
+    def __init__(self):
+        self.hexdigest: str | None = None  # set when download_file succeeds
+        self._hash = hashlib.sha256()
+        self._offset = 0
+
+    def _feed(self, path: Path, start: int, data: bytes) -> None:
+        """data was just written at offset start of path."""
+        if start < self._offset:
+            # The stream started over
+            self._hash = hashlib.sha256()
+            self._offset = 0
+        if start > self._offset:
+            self._read(path, start)
+        self._hash.update(data)
+        self._offset += len(data)
+
+    def _read(self, path: Path, end: int | None = None) -> None:
+        with open(path, "rb") as fh:
+            fh.seek(self._offset)
+            while end is None or self._offset < end:
+                block = fh.read(MAX_CHUNK if end is None else min(MAX_CHUNK, end - self._offset))
+                if not block:
+                    break
+                self._hash.update(block)
+                self._offset += len(block)
+
+    def _finish(self, path: Path) -> None:
+        self._read(path)
+        self.hexdigest = self._hash.hexdigest()
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def _retry_after(response: "httpx.Response") -> float | None:
+    value = response.headers.get("retry-after", "")
+    return min(float(value), BACKOFF_CAP * 4) if value.isdigit() else None
+
+
+class _ChunkSizer:
+    """Grow or shrink write sizes so each write carries about CHUNK_TARGET_SECONDS of data."""
+
+    def __init__(self):
+        self.size = MIN_CHUNK
+
+    def update(self, nbytes: int, seconds: float) -> None:
+        target = MAX_CHUNK if seconds <= 0 else int(nbytes / seconds * CHUNK_TARGET_SECONDS)
+        self.size = max(MIN_CHUNK, min(MAX_CHUNK, target))
+
+
+class _PartState:
+    """Sidecar for a .part file: the asset size and its ranges as [start, end (inclusive), next byte]."""
+
+    def __init__(self, path: Path, url: str, size: int | None, etag: str | None, ranges: list[list[int]]):
+        self.path = path
+        self.url = url
+        self.size = size
+        self.etag = etag
+        self.ranges = ranges
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+
+    @classmethod
+    def load(cls, path: Path, url: str, size: int | None) -> "_PartState | None":
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if data.get("url") != url or data.get("size") is None or data.get("size") != size or not data.get("ranges"):
+            return None
+        return cls(path, url, size, data.get("etag"), data["ranges"])
+
+    def advance(self, index: int, nbytes: int) -> None:
+        with self._lock:
+            self.ranges[index][2] += nbytes
+        if time.monotonic() - self._last_save > 1.0:
+            self.save()
+
+    def save(self) -> None:
+        with self._lock:
+            data = {"url": self.url, "size": self.size, "etag": self.etag, "ranges": [list(r) for r in self.ranges]}
+            self._last_save = time.monotonic()
+        write_json_atomic(self.path, data)
+
+    def completed(self) -> int:
+        return sum(r[2] - r[0] for r in self.ranges)
+
+
+def _split(size: int, segments: int) -> list[list[int]]:
+    step = -(-size // segments)
+    return [[start, min(start + step, size) - 1, start] for start in range(0, size, step)]
+
+
+def _probe(client: "httpx.Client", url: str, headers: dict, timeout) -> tuple[int | None, bool, str | None]:
+    """Return (size, accepts_ranges, etag) from a one-byte ranged GET."""
+    with client.stream("GET", url, headers={**headers, "Range": "bytes=0-0"}, timeout=timeout, follow_redirects=True) as response:
+        status = response.status_code
+        if status == 206:
+            match = _CONTENT_RANGE.match(response.headers.get("content-range", ""))
+            if match and match.group(3) != "*":
+                return int(match.group(3)), True, response.headers.get("etag")
+        if status == 200:
+            length = response.headers.get("content-length")
+            return (int(length) if length else None), False, response.headers.get("etag")
+        if status in RETRY_STATUSES:
+            raise _RetryableError(f"HTTP {status}", _retry_after(response))
+        raise DownloadError(f"Download failed with {status}\nHeaders: {response.headers}")
+
+
+def _fetch_range(client: "httpx.Client", url: str, headers: dict, timeout, part_path: Path, state: _PartState, index: int, on_bytes: Callable[[int], None], on_write: Callable[[int, bytes], None] | None = None) -> None:
+    """Fetch range ``index`` from its next byte into part_path; on_write(offset, data) follows every write.
+
+    Raises _RetryableError when the request can be retried (and resumed), DownloadError otherwise.
+    """
+    import httpx
+
+    known_size = state.size is not None
+    if not known_size:
+        # Unknown length: nothing to resume from, every attempt starts over
+        state.ranges[index][2] = 0
+        open(part_path, "wb").close()
+    start, end, next_byte = state.ranges[index]
+    if known_size and next_byte > end:
+        return
+    request_headers = dict(headers)
+    ranged = known_size and (next_byte > 0 or end < state.size - 1)
+    if ranged:
+        request_headers["Range"] = f"bytes={next_byte}-{end}"
+        if state.etag:
+            request_headers["If-Range"] = state.etag
+
+    sizer = _ChunkSizer()
+    buffer = bytearray()
+    try:
+        with client.stream("GET", url, headers=request_headers, timeout=timeout, follow_redirects=True) as response:
+            status = response.status_code
+            if status in RETRY_STATUSES:
+                raise _RetryableError(f"HTTP {status}", _retry_after(response))
+            if ranged and status == 200:
+                raise _RestartRequired()
+            if status not in (200, 206):
+                body_sample = response.read()[:400]
+                raise DownloadError(f"Download failed with {status}\nHeaders: {response.headers}\nBody (truncated): {body_sample!r}")
+            if state.etag is None:
+                state.etag = response.headers.get("etag")
+            with open(part_path, "r+b") as fh:
+                fh.seek(next_byte)
+                remaining = end + 1 - next_byte if known_size else None
+
+                def flush(elapsed: float) -> None:
+                    fh.write(buffer)
+                    if on_write:
+                        on_write(state.ranges[index][2], buffer)
+                    state.advance(index, len(buffer))
+                    on_bytes(len(buffer))
+                    sizer.update(len(buffer), elapsed)
+                    buffer.clear()
+
+                started = time.monotonic()
+                try:
+                    for chunk in response.iter_bytes():
+                        if remaining is not None:
+                            chunk = chunk[:remaining]
+                            remaining -= len(chunk)
+                        buffer += chunk
+                        if len(buffer) >= sizer.size or remaining == 0:
+                            flush(time.monotonic() - started)
+                            started = time.monotonic()
+                        if remaining == 0:
+                            break
+                finally:
+                    # Keep whatever arrived before a failure so the retry resumes after it
+                    if buffer:
+                        flush(time.monotonic() - started)
+    except httpx.TransportError as e:
+        raise _RetryableError(f"{type(e).__name__}: {e}") from e
+    if known_size and state.ranges[index][2] <= end:
+        raise _RetryableError(f"connection closed after {state.ranges[index][2] - start} of {end + 1 - start} bytes")
+
+
+def download_file(
+    client: "httpx.Client",
+    url: str,
+    dest: Path,
+    *,
+    headers: dict | None = None,
+    expected_size: int | None = None,
+    retries: int = DEFAULT_RETRIES,
+    segments: int = 1,
+    timeout: float = 60,
+    on_progress: Callable[[int, int | None], None] | None = None,
+    keep_partial: bool = True,
+    sleep: Callable[[float], None] = time.sleep,
+    content_hash: ContentHash | None = None,
+) -> Path:
+    """Download url to dest, resuming an earlier ``dest.part`` when its sidecar matches.
+
+    segments > 1 fetches that many ranges concurrently when the server supports ranges and
+    the asset is at least MIN_SEGMENT_BYTES. on_progress(done, total) is called as bytes
+    arrive. With keep_partial=False the partial file is removed when the download finally
+    fails; otherwise it stays for the next attempt. content_hash receives the SHA-256 of
+    the finished file. Raises DownloadError.
+    """
+    import httpx
+
+    dest = Path(dest)
+    # Byte offsets must refer to the stored file, not a compressed transfer encoding
+    headers = {**(headers or {}), "Accept-Encoding": "identity"}
+    part_path = dest.with_name(dest.name + ".part")
+    state_path = dest.with_name(dest.name + ".part.json")
+    http_timeout = httpx.Timeout(timeout, connect=min(timeout, 15))
+    progress_lock = threading.Lock()
+    progress = {"done": 0, "total": expected_size}
+
+    def report(nbytes: int) -> None:
+        with progress_lock:
+            progress["done"] += nbytes
+            if on_progress:
+                on_progress(progress["done"], progress["total"])
+
+    def reset_progress(done: int) -> None:
+        with progress_lock:
+            progress["done"] = done
+
+    def with_retries(action, what: str):
+        attempt = 0
+        while True:
+            try:
+                return action()
+            except (_RetryableError, httpx.TransportError) as e:
+                if attempt >= retries:
+                    raise DownloadError(f"{what} failed after {attempt + 1} attempts: {e}") from e
+                retry_after = getattr(e, "retry_after", None)
+                sleep(retry_after if retry_after is not None else backoff_delay(attempt))
+                attempt += 1
+
+    def fresh_state(size: int | None, etag: str | None, ranges_supported: bool) -> _PartState:
+        if size and ranges_supported and segments > 1 and size >= MIN_SEGMENT_BYTES:
+            # Never make segments much smaller than MIN_SEGMENT_BYTES / 2
+            count = min(segments, max(1, size // (MIN_SEGMENT_BYTES // 2)))
+            ranges = _split(size, count)
+        else:
+            ranges = [[0, size - 1 if size else -1, 0]]
+        with open(part_path, "wb") as fh:
+            if size:
+                fh.truncate(size)
+        state = _PartState(state_path, url, size, etag, ranges)
+        state.save()
+        return state
+
+    state = None
+    try:
+        state = _PartState.load(state_path, url, expected_size) if part_path.exists() else None
+        if state is None:
+            if segments > 1 and (expected_size is None or expected_size >= MIN_SEGMENT_BYTES):
+                size, ranges_supported, etag = with_retries(lambda: _probe(client, url, headers, http_timeout), "download")
+                if expected_size is not None and size is not None and size != expected_size:
+                    raise DownloadError(f"Server reports {size} bytes but the release lists {expected_size}")
+                state = fresh_state(size if size is not None else expected_size, etag, ranges_supported)
+            else:
+                # Single stream: skip the probe, a retry discovers range support on its own
+                state = fresh_state(expected_size, None, False)
+        progress["total"] = state.size
+        report(state.completed())
+
+        for _attempt in range(2):
+            try:
+                if len(state.ranges) == 1:
+                    on_write = (lambda start, data: content_hash._feed(part_path, start, data)) if content_hash else None
+                    with_retries(lambda: _fetch_range(client, url, headers, http_timeout, part_path, state, 0, report, on_write), "download")
+                else:
+                    with ThreadPoolExecutor(max_workers=len(state.ranges)) as pool:
+                        futures = [
+                            pool.submit(
+                                with_retries,
+                                lambda i=i: _fetch_range(client, url, headers, http_timeout, part_path, state, i, report),
+                                f"segment {i + 1}/{len(state.ranges)}",
+                            )
+                            for i in range(len(state.ranges))
+                        ]
+                        for future in futures:
+                            future.result()
+                break
+            except _RestartRequired:
+                # The server ignored Range or the asset changed (If-Range); start over once
+                reset_progress(0)
+                state = fresh_state(state.size, None, False)
+        else:
+            raise DownloadError("Server ignored range requests while resuming")
+
+        if state.size is not None and state.completed() != state.size:
+            raise DownloadError(f"Downloaded {state.completed()} bytes, expected {state.size}")
+        os.replace(part_path, dest)
+        state_path.unlink(missing_ok=True)
+        if content_hash:
+            # Reads only what was not hashed in flight: resumed bytes, or every segment
+            content_hash._finish(dest)
+        return dest
+    except BaseException:
+        if not keep_partial:
+            part_path.unlink(missing_ok=True)
+            state_path.unlink(missing_ok=True)
+        elif state is not None and state_path.exists():
+            try:
+                state.save()
+            except OSError:
+                pass
+        raise
@@ -0,0 +1,62 @@
+"""
+Sinks for StepTracker events.
+
+A tracker calls its sink with one dict per step change::
+
+    {"tracker": "Initialize Specify Project", "key": "download", "label": "Download template",
+     "status": "done", "detail": "spec-kit-template-claude-sh-v0.0.31.zip", "t": 0.412}
+
+where ``t`` is seconds since the tracker was created (perf_counter clock). Sinks
+are plain callables, so several can be combined with ``fan_out``.
+
+NDJSONSink  one JSON object per line (``--output json``, ``--events FILE``)
+TextSink    a plain line per finished step, for logs and pipes where a live Rich tree
+            would only produce escape codes
+"""
+
+import json
+import threading
+from typing import Callable, TextIO
+
+STATUS_WORDS = {"done": "ok", "error": "FAILED", "skipped": "skipped"}
+
+
+class NDJSONSink:
+    """Write each event as a line of JSON; thread-safe, flushed per line so consumers see events live."""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def __call__(self, event: dict) -> None:
+        line = json.dumps(event, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+class TextSink:
+    """Write ``<status>  <label> (<detail>)`` whenever a step finishes (done, error or skipped)."""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def __call__(self, event: dict) -> None:
+        word = STATUS_WORDS.get(event["status"])
+        if word is None:
+            return
+        detail = f" ({event['detail']})" if event["detail"] else ""
+        with self._lock:
+            self.stream.write(f"{word:<8} {event['label']}{detail}\n")
+            self.stream.flush()
+
+
+def fan_out(*sinks: Callable[[dict], None]) -> Callable[[dict], None]:
+    """A sink that passes every event to each of sinks."""
+
+    def emit(event: dict) -> None:
+        for sink in sinks:
+            sink(event)
+
+    return emit
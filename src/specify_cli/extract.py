@@ -0,0 +1,534 @@
+"""
+Single-pass template extraction.
+
+Members are written straight to their final location. A GitHub-style single root
+directory is stripped from each member name as it is written, so there is no
+intermediate tree, no move/rename dance and no second copy for ``--here``.
+
+``extract_zip`` works on a seekable archive (central directory known up front).
+``plan_merge`` compares such an archive with an existing tree so merges can skip
+byte-identical files and report what will change before anything is written.
+``extract_stream`` decompresses directly from an iterator of bytes, such as an
+HTTP response body, by walking the local file headers, so the archive never
+touches the disk.
+
+Unix mode bits stored in an archive (``external_attr`` of entries made on Unix) are
+applied as each member is written: members marked executable are created with
+execute permission (under the umask), so no pass over the tree is needed afterwards.
+A stream only learns the modes from the central directory at its end; the few
+executable members are then updated. Stats report whether the modes can be relied on
+(``"modes"``): every file must carry one and at least one must be executable, since
+archives zipped from a checkout without +x record 0644 for their scripts too. Callers
+fall back to fixing permissions themselves otherwise.
+"""
+
+import os
+import struct
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
+from typing import Iterable, Iterator
+import zipfile
+
+COPY_BUFSIZE = 1024 * 1024
+# While a stream's root is still ambiguous, members are held in memory up to this size
+MAX_PENDING_BYTES = 32 * 1024 * 1024
+
+_LOCAL_SIG = b"PK\x03\x04"
+_DESCRIPTOR_SIG = b"PK\x07\x08"
+_END_SIGS = (b"PK\x01\x02", b"PK\x05\x06", b"PK\x06\x06", b"PK\x06\x07")
+_LOCAL_HEADER = struct.Struct("<HHHHHIIIHH")
+_CENTRAL_HEADER = struct.Struct("<HHHHHHIIIHHHHHII")
+_CENTRAL_SIG = b"PK\x01\x02"
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+_UNIX = 3  # "version made by" host system whose external_attr holds st_mode in its high 16 bits
+
+
+def default_write_workers() -> int:
+    """Thread count for parallel member writes (I/O bound, so more than the CPU count)."""
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+class UnsafeArchiveError(ValueError):
+    """An archive member would be written outside the destination."""
+
+
+class StreamingUnsupportedError(RuntimeError):
+    """The archive uses a feature the streaming reader cannot handle; extract from a file instead."""
+
+
+def _member_parts(name: str) -> tuple[str, ...]:
+    name = name.replace("\\", "/")
+    if name.startswith("/") or (len(name) > 1 and name[1] == ":"):
+        raise UnsafeArchiveError(f"Absolute path in archive: {name}")
+    parts = tuple(p for p in PurePosixPath(name).parts if p not in ("", "."))
+    if ".." in parts:
+        raise UnsafeArchiveError(f"Path traversal in archive: {name}")
+    return parts
+
+
+def common_root(names: Iterable[str]) -> str | None:
+    """Return the single top-level directory shared by every member, or None."""
+    root = None
+    nested = False
+    for name in names:
+        parts = _member_parts(name)
+        if not parts:
+            continue
+        if len(parts) == 1 and not name.endswith("/"):
+            # A plain file at the top level means there is no wrapper directory
+            return None
+        if root is None:
+            root = parts[0]
+        elif parts[0] != root:
+            return None
+        nested = nested or len(parts) > 1
+    return root if nested else None
+
+
+def unix_mode(create_system: int, external_attr: int) -> int | None:
+    """The st_mode recorded for an archive entry, or None when it was not made on Unix."""
+    mode = external_attr >> 16
+    return mode if create_system == _UNIX and mode else None
+
+
+def modes_usable(modes: Iterable[int | None]) -> bool:
+    """Whether file modes from an archive can be relied on (see the module docstring)."""
+    modes = list(modes)
+    return all(mode is not None for mode in modes) and any(mode & 0o111 for mode in modes)
+
+
+def _make_executable(target: "Path | int") -> None:
+    """Add execute permission wherever read permission is set, like ``chmod +x`` under a umask."""
+    if os.name == "nt":
+        return
+    mode = os.stat(target).st_mode
+    wanted = mode | (mode & 0o444) >> 2
+    if wanted != mode:
+        os.chmod(target, wanted)
+
+
+def _relative_parts(name: str, root: str | None) -> tuple[str, ...]:
+    parts = _member_parts(name)
+    if root and parts and parts[0] == root:
+        parts = parts[1:]
+    return parts
+
+
+class _Writer:
+    """Places members under dest, stripping an optional root and tracking what was written.
+
+    Safe to share between threads: counters are updated under a lock.
+    """
+
+    def __init__(self, dest: Path, strip_root: str | None = None, *, skip: set[str] | None = None, backup: set[str] | None = None, exclude: Iterable[str] = ()):
+        self.dest = dest
+        self.strip_root = strip_root
+        self.exclude = frozenset(exclude)
+        self.skip = skip or set()
+        self.backup = backup or set()
+        self.files = 0
+        self.dirs = 0
+        self.bytes = 0
+        self.skipped = 0
+        self.backed_up = []
+        self.top_level = set()
+        self.written = []  # relative POSIX paths of files written
+        self.unchanged = []  # ... and of files skipped as identical
+        self.executable = 0  # files given execute permission from the archive's modes
+        self.modes = False  # set by the caller when the archive's modes are usable (modes_usable)
+        self._made_dirs = set()
+        self._lock = threading.Lock()
+
+    def target(self, name: str) -> tuple[str, Path] | None:
+        parts = _relative_parts(name, self.strip_root)
+        if not parts or parts[0] in self.exclude:
+            return None
+        with self._lock:
+            self.top_level.add(parts[0])
+        rel = "/".join(parts)
+        return rel, self.dest.joinpath(*parts)
+
+    def _mkdir(self, path: Path) -> None:
+        if path not in self._made_dirs:
+            path.mkdir(parents=True, exist_ok=True)
+            self._made_dirs.add(path)
+
+    def directory(self, name: str) -> None:
+        placed = self.target(name)
+        if placed:
+            self._mkdir(placed[1])
+            with self._lock:
+                self.dirs += 1
+
+    def file(self, name: str, chunks: Iterable[bytes], mode: int | None = None) -> None:
+        placed = self.target(name)
+        if placed is None:
+            return
+        rel, path = placed
+        executable = bool(mode and mode & 0o111)
+        if rel in self.skip:
+            if executable:
+                # Identical content, but the existing copy may have lost its +x
+                self.set_executable(path)
+            with self._lock:
+                self.skipped += 1
+                self.unchanged.append(rel)
+            return
+        self._mkdir(path.parent)
+        if rel in self.backup and path.exists():
+            os.replace(path, path.with_name(path.name + ".bak"))
+            with self._lock:
+                self.backed_up.append(rel)
+        written = 0
+        # New files are created with the archive's execute bit; an existing file keeps its
+        # mode on open, so an executable member checks it explicitly
+        fd = os.open(path, _WRITE_FLAGS, 0o777 if executable else 0o666)
+        with open(fd, "wb") as out:
+            if executable:
+                self.set_executable(fd)
+            for chunk in chunks:
+                out.write(chunk)
+                written += len(chunk)
+        with self._lock:
+            self.bytes += written
+            self.files += 1
+            self.written.append(rel)
+
+    def set_executable(self, target: "Path | int") -> None:
+        _make_executable(target)
+        with self._lock:
+            self.executable += 1
+
+    def apply_modes(self, modes: dict[str, int | None]) -> None:
+        """Give execute permission to written members whose mode was only learned afterwards (streams)."""
+        for name, mode in modes.items():
+            if not (mode and mode & 0o111) or name.endswith("/"):
+                continue
+            placed = self.target(name)
+            if placed is not None and placed[1].is_file():
+                self.set_executable(placed[1])
+
+    def stats(self) -> dict:
+        return {
+            "files": self.files,
+            "dirs": self.dirs,
+            "bytes": self.bytes,
+            "skipped": self.skipped,
+            "backed_up": sorted(self.backed_up),
+            "root": self.strip_root,
+            "top_level": sorted(self.top_level),
+            "executable": self.executable,
+            "modes": self.modes,
+            "written": sorted(self.written),
+            # Every template file now in place (written or already identical), e.g. for git to stage
+            "paths": sorted(self.written + self.unchanged),
+        }
+
+
+def _iter_zip_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> Iterator[bytes]:
+    with zf.open(info) as src:
+        while True:
+            chunk = src.read(COPY_BUFSIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+def _crc32_file(path: Path) -> int:
+    crc = 0
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(COPY_BUFSIZE)
+            if not block:
+                return crc
+            crc = zlib.crc32(block, crc)
+
+
+def plan_merge(zf: zipfile.ZipFile, dest: Path, *, strip_root: bool = True, exclude: Iterable[str] = ()) -> dict:
+    """Classify every file in zf against what already exists under dest.
+
+    new        nothing at the destination path
+    identical  same size and same CRC-32 as the archive member (skipped on merge)
+    changed    different content (overwritten, or backed up first)
+
+    Sizes are compared first so only same-size files are read and hashed; the archive
+    side needs no decompression because the central directory already holds each CRC.
+    Members under a top-level directory in exclude are left out.
+    """
+    infos = zf.infolist()
+    root = common_root(i.filename for i in infos) if strip_root else None
+    plan = {"root": root, "new": [], "identical": [], "changed": []}
+    for info in infos:
+        if info.is_dir():
+            continue
+        parts = _relative_parts(info.filename, root)
+        if not parts or parts[0] in exclude:
+            continue
+        rel = "/".join(parts)
+        target = Path(dest).joinpath(*parts)
+        try:
+            st = target.stat()
+        except FileNotFoundError:
+            plan["new"].append(rel)
+            continue
+        except NotADirectoryError:
+            plan["changed"].append(rel)
+            continue
+        if target.is_file() and st.st_size == info.file_size and _crc32_file(target) == info.CRC:
+            plan["identical"].append(rel)
+        else:
+            plan["changed"].append(rel)
+    return plan
+
+
+def extract_zip(zf: zipfile.ZipFile, dest: Path, *, strip_root: bool = True, plan: dict | None = None, backup: bool = False, workers: int | None = None, exclude: Iterable[str] = (), only: set[str] | None = None) -> dict:
+    """Extract every member of zf into dest in one pass; returns extraction stats.
+
+    With a plan from plan_merge, identical files are left untouched and (with backup)
+    changed files are renamed to ``<name>.bak`` before being replaced. workers > 1 writes
+    files on a thread pool; ZipFile supports concurrent member reads. Members under a
+    top-level directory in exclude (e.g. ``.specify``) are not written. Execute bits from
+    the entries' Unix modes are applied as each file is written. With only, just the files
+    at those relative paths are written (and no directories are created for the others).
+    """
+    infos = zf.infolist()
+    if plan is not None:
+        root = plan["root"]
+    else:
+        root = common_root(i.filename for i in infos) if strip_root else None
+    writer = _Writer(
+        Path(dest),
+        root,
+        skip=set(plan["identical"]) if plan else None,
+        backup=set(plan["changed"]) if plan and backup else None,
+        exclude=exclude,
+    )
+    files = []
+    for info in infos:
+        if info.is_dir():
+            if only is None:
+                writer.directory(info.filename)
+        else:
+            files.append(info)
+    modes = {info.filename: unix_mode(info.create_system, info.external_attr) for info in files}
+    writer.modes = modes_usable(modes.values())
+    if only is not None:
+        files = [info for info in files if "/".join(_relative_parts(info.filename, root)) in only]
+
+    def write(info: zipfile.ZipInfo) -> None:
+        writer.file(info.filename, _iter_zip_member(zf, info), modes[info.filename])
+
+    if workers and workers > 1 and len(files) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # list() re-raises the first worker exception
+            list(pool.map(write, files))
+    else:
+        for info in files:
+            write(info)
+    return writer.stats()
+
+
+class _ChunkReader:
+    """Exact-size reads over an iterator of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._buf = bytearray()
+        self.consumed = 0
+
+    def _fill(self, n: int) -> None:
+        while len(self._buf) < n:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buf += chunk
+
+    def read_exact(self, n: int) -> bytes:
+        self._fill(n)
+        if len(self._buf) < n:
+            raise zipfile.BadZipFile("Unexpected end of archive stream")
+        data = bytes(self._buf[:n])
+        del self._buf[:n]
+        self.consumed += n
+        return data
+
+    def read_some(self, limit: int) -> bytes:
+        if not self._buf:
+            self._fill(1)
+        data = bytes(self._buf[:limit])
+        del self._buf[:len(data)]
+        self.consumed += len(data)
+        return data
+
+    def peek(self, n: int) -> bytes:
+        self._fill(n)
+        return bytes(self._buf[:n])
+
+    def unread(self, data: bytes) -> None:
+        self._buf[:0] = data
+        self.consumed -= len(data)
+
+
+def _zip64_sizes(extra: bytes, csize: int, usize: int) -> tuple[int, int, bool]:
+    pos = 0
+    while pos + 4 <= len(extra):
+        header_id, size = struct.unpack_from("<HH", extra, pos)
+        body = extra[pos + 4:pos + 4 + size]
+        if header_id == 0x0001:
+            values = list(struct.unpack_from(f"<{len(body) // 8}Q", body))
+            if usize == 0xFFFFFFFF and values:
+                usize = values.pop(0)
+            if csize == 0xFFFFFFFF and values:
+                csize = values.pop(0)
+            return csize, usize, True
+        pos += 4 + size
+    return csize, usize, False
+
+
+def _read_central_modes(reader: _ChunkReader, modes: dict[str, int | None]) -> None:
+    while reader.peek(4) == _CENTRAL_SIG:
+        reader.read_exact(4)
+        fields = _CENTRAL_HEADER.unpack(reader.read_exact(_CENTRAL_HEADER.size))
+        made_by, flags, name_len, extra_len, comment_len, external_attr = fields[0], fields[2], fields[9], fields[10], fields[11], fields[14]
+        name = reader.read_exact(name_len).decode("utf-8" if flags & 0x800 else "cp437")
+        reader.read_exact(extra_len + comment_len)
+        modes[name] = unix_mode(made_by >> 8, external_attr)
+
+
+def iter_zip_stream(chunks: Iterable[bytes], modes: dict[str, int | None] | None = None) -> Iterator[tuple[str, bool, Iterator[bytes]]]:
+    """Yield (name, is_dir, data_chunks) for each member by walking local file headers.
+
+    Each member's data iterator must be exhausted before advancing to the next member.
+    With a modes dict, the central directory after the last member is read as well and
+    each member's Unix mode (or None) stored in it by name.
+    """
+    reader = _ChunkReader(chunks)
+    while True:
+        sig = reader.peek(4)
+        if len(sig) < 4 or sig in _END_SIGS:
+            if sig == _CENTRAL_SIG and modes is not None:
+                _read_central_modes(reader, modes)
+            return
+        if sig != _LOCAL_SIG:
+            raise zipfile.BadZipFile("Bad local file header in archive stream")
+        reader.read_exact(4)
+        (_version, flags, method, _mtime, _mdate, crc, csize, usize, name_len, extra_len) = _LOCAL_HEADER.unpack(
+            reader.read_exact(_LOCAL_HEADER.size)
+        )
+        raw_name = reader.read_exact(name_len)
+        extra = reader.read_exact(extra_len)
+        name = raw_name.decode("utf-8" if flags & 0x800 else "cp437")
+        csize, usize, is_zip64 = _zip64_sizes(extra, csize, usize)
+        has_descriptor = bool(flags & 0x08)
+
+        if flags & 0x01:
+            raise StreamingUnsupportedError(f"Encrypted member: {name}")
+        if method not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            raise StreamingUnsupportedError(f"Unsupported compression method {method}: {name}")
+        if has_descriptor and method == zipfile.ZIP_STORED:
+            raise StreamingUnsupportedError(f"Stored member with data descriptor: {name}")
+
+        state = {"crc": 0}
+
+        def data(method=method, csize=csize, has_descriptor=has_descriptor):
+            inflater = zlib.decompressobj(-15) if method == zipfile.ZIP_DEFLATED else None
+            if has_descriptor:
+                # Compressed size unknown: inflate until the deflate stream ends
+                while not inflater.eof:
+                    block = reader.read_some(COPY_BUFSIZE)
+                    if not block:
+                        raise zipfile.BadZipFile(f"Truncated member in archive stream: {name}")
+                    out = inflater.decompress(block)
+                    if inflater.unused_data:
+                        reader.unread(inflater.unused_data)
+                    if out:
+                        state["crc"] = zlib.crc32(out, state["crc"])
+                        yield out
+                return
+            remaining = csize
+            while remaining:
+                block = reader.read_some(min(remaining, COPY_BUFSIZE))
+                if not block:
+                    raise zipfile.BadZipFile(f"Truncated member in archive stream: {name}")
+                remaining -= len(block)
+                out = inflater.decompress(block) if inflater else block
+                if out:
+                    state["crc"] = zlib.crc32(out, state["crc"])
+                    yield out
+            if inflater:
+                tail = inflater.flush()
+                if tail:
+                    state["crc"] = zlib.crc32(tail, state["crc"])
+                    yield tail
+
+        member = data()
+        yield name, name.endswith("/"), member
+        # Drain anything the consumer left unread so the reader is positioned at the next header
+        for _ in member:
+            pass
+
+        if has_descriptor:
+            if reader.peek(4) == _DESCRIPTOR_SIG:
+                reader.read_exact(4)
+            crc = struct.unpack("<I", reader.read_exact(4))[0]
+            reader.read_exact(16 if is_zip64 else 8)
+        if state["crc"] != crc:
+            raise zipfile.BadZipFile(f"CRC mismatch for {name}")
+
+
+def extract_stream(chunks: Iterable[bytes], dest: Path, *, strip_root: bool = True) -> dict:
+    """Extract an archive from a byte stream into dest; returns extraction stats.
+
+    Without the central directory the wrapper root is not known up front: members are
+    held in memory while every member seen so far shares one top-level directory, then
+    flushed as soon as the answer is known (or once MAX_PENDING_BYTES is reached, at
+    which point the shared directory is treated as the root). Modes come from the central
+    directory, so execute bits are applied once the last member has been written.
+    """
+    writer = _Writer(Path(dest))
+    modes: dict[str, int | None] = {}
+    if not strip_root:
+        writer.strip_root = None
+    pending = []
+    pending_bytes = 0
+    candidate = None
+    decided = not strip_root
+
+    def flush(root: str | None):
+        writer.strip_root = root
+        for name, is_dir, data in pending:
+            if is_dir:
+                writer.directory(name)
+            else:
+                writer.file(name, [data])
+        pending.clear()
+
+    for name, is_dir, member in iter_zip_stream(chunks, modes):
+        if not decided:
+            parts = _member_parts(name)
+            top_level_file = len(parts) == 1 and not is_dir
+            if parts and (top_level_file or (candidate is not None and parts[0] != candidate)):
+                decided = True
+                flush(None)
+            elif parts:
+                candidate = candidate or parts[0]
+                data = b"" if is_dir else b"".join(member)
+                pending.append((name, is_dir, data))
+                pending_bytes += len(data)
+                if pending_bytes > MAX_PENDING_BYTES:
+                    decided = True
+                    flush(candidate)
+                continue
+        if is_dir:
+            writer.directory(name)
+        else:
+            writer.file(name, member)
+
+    if not decided:
+        nested = any(len(_member_parts(n)) > 1 for n, _, _ in pending)
+        flush(candidate if nested else None)
+    writer.modes = modes_usable(mode for name, mode in modes.items() if not name.endswith("/"))
+    writer.apply_modes(modes)
+    return writer.stats()
@@ -0,0 +1,240 @@
+"""
+Feature index for a Spec Kit project: ``.specify/index``.
+
+Records every ``specs/<NNN-slug>`` feature (number, slug, branch and which design docs
+exist) together with the modification times it was read at, so "latest feature" and
+"next feature number" are single lookups instead of a walk over specs/. Refreshes are
+incremental: when the mtime of specs/ is unchanged the feature set is unchanged, and
+only feature directories whose own mtime (or their contracts/ mtime) moved are
+re-read for docs.
+
+The index is JSON with the lookup keys on their own top-level lines, so the bash and
+PowerShell scripts can read ``latest`` and ``next_number`` without parsing JSON or
+forking; they treat the index as stale when specs/ is newer than it. The index is
+per-machine state (mtimes, the next free number on this checkout): the ``.specify/.gitignore``
+that releases ship keeps it out of commits, so merging feature branches never conflicts
+on it and a checkout never replaces it.
+
+Usage:
+    specify features list [--json]
+    python .specify/scripts/python/features.py refresh
+
+This module only uses the standard library: release archives ship a copy at
+``.specify/scripts/python/features.py`` for the scripts to refresh the index with.
+"""
+
+# Run by whatever python3 the project has, so keep annotations lazy for older interpreters
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+INDEX_PATH = ".specify/index"
+# Bump when the index layout changes
+INDEX_VERSION = 1
+# Doc key -> file (or directory, for contracts) inside a feature directory
+FEATURE_DOCS = {
+    "spec": "spec.md",
+    "plan": "plan.md",
+    "tasks": "tasks.md",
+    "research": "research.md",
+    "data_model": "data-model.md",
+    "quickstart": "quickstart.md",
+    "contracts": "contracts",
+}
+_NUMBER = re.compile(r"^(\d+)")
+# get_current_branch only treats NNN- directories as features
+_FEATURE_NAME = re.compile(r"^(\d{3})-(.*)$")
+
+
+def _new_file_mode() -> int:
+    """0666 under the process umask, the mode open() gives a new file."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def find_repo_root(start: Path | None = None) -> Path | None:
+    """Nearest directory at or above start containing .git or .specify."""
+    start = Path(start or Path.cwd()).resolve()
+    for directory in [start, *start.parents]:
+        if (directory / ".git").exists() or (directory / ".specify").is_dir():
+            return directory
+    return None
+
+
+def _mtime(path: str | Path) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _scan_feature(path: str, name: str) -> dict:
+    """Read one feature directory: its docs and the mtimes they were read at."""
+    match = _FEATURE_NAME.match(name)
+    number = _NUMBER.match(name)
+    docs = {}
+    try:
+        present = {entry.name: entry for entry in os.scandir(path)}
+    except OSError:
+        present = {}
+    for key, filename in FEATURE_DOCS.items():
+        entry = present.get(filename)
+        if key == "contracts":
+            try:
+                docs[key] = entry is not None and entry.is_dir() and any(os.scandir(entry.path))
+            except OSError:
+                docs[key] = False
+        else:
+            docs[key] = entry is not None and entry.is_file()
+    return {
+        "name": name,
+        "number": int(number.group(1)) if number else None,
+        "slug": match.group(2) if match else name,
+        "branch": name,
+        "is_feature": match is not None,
+        "docs": docs,
+        "mtime_ns": _mtime(path),
+        "contracts_mtime_ns": _mtime(os.path.join(path, "contracts")),
+    }
+
+
+def _summary(features: list[dict]) -> tuple[str | None, int]:
+    latest = max((f for f in features if f["is_feature"]), key=lambda f: f["number"], default=None)
+    highest = max((f["number"] for f in features if f["number"] is not None), default=0)
+    return (latest["name"] if latest else None), highest + 1
+
+
+class FeatureIndex:
+    """The features under <repo>/specs, cached in <repo>/.specify/index."""
+
+    def __init__(self, repo_root: Path):
+        self.repo_root = Path(repo_root)
+        self.specs_dir = self.repo_root / "specs"
+        self.path = self.repo_root / INDEX_PATH
+        self.data = self._load()
+
+    def _load(self) -> dict:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) and data.get("version") == INDEX_VERSION else {}
+
+    def refresh(self, *, docs: bool = True, save: bool = True) -> bool:
+        """Bring the index up to date; returns True if anything changed.
+
+        With docs=False only the feature set is checked (one stat of specs/ when it is
+        unchanged), which is all ``latest`` and ``next_number`` need.
+        """
+        specs_mtime = _mtime(self.specs_dir)
+        known = {f["name"]: f for f in self.data.get("features", [])}
+        changed = False
+        if not self.data or self.data.get("specs_mtime_ns") != specs_mtime:
+            features = []
+            try:
+                entries = sorted((e for e in os.scandir(self.specs_dir) if e.is_dir()), key=lambda e: e.name)
+            except OSError:
+                entries = []
+            for entry in entries:
+                previous = known.get(entry.name)
+                if previous and previous["mtime_ns"] == _mtime(entry.path):
+                    features.append(previous)
+                else:
+                    features.append(_scan_feature(entry.path, entry.name))
+            changed = True
+        else:
+            features = list(known.values())
+        if docs:
+            for i, feature in enumerate(features):
+                path = self.specs_dir / feature["name"]
+                if feature["mtime_ns"] != _mtime(path) or feature["contracts_mtime_ns"] != _mtime(path / "contracts"):
+                    features[i] = _scan_feature(str(path), feature["name"])
+                    changed = True
+        if changed:
+            latest, next_number = _summary(features)
+            self.data = {
+                "version": INDEX_VERSION,
+                "latest": latest or "",
+                "next_number": next_number,
+                "specs_mtime_ns": specs_mtime,
+                "features": features,
+            }
+            if save:
+                self.save()
+        return changed
+
+    def save(self) -> None:
+        """Write the index atomically (best effort: a read-only tree just goes without)."""
+        tmp = None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=".index.", suffix=".tmp", dir=self.path.parent)
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(self.data, fh, indent=2)
+                fh.write("\n")
+            # mkstemp creates 0600; give the index the mode any other new project file gets
+            os.chmod(tmp, _new_file_mode())
+            os.replace(tmp, self.path)
+        except OSError:
+            if tmp is not None:
+                Path(tmp).unlink(missing_ok=True)
+
+    @property
+    def features(self) -> list[dict]:
+        return list(self.data.get("features", []))
+
+    @property
+    def latest(self) -> str | None:
+        """Highest-numbered NNN- feature directory, or None."""
+        return self.data.get("latest") or None
+
+    @property
+    def next_number(self) -> int:
+        """One more than the highest leading number of any specs/ directory."""
+        return self.data.get("next_number", 1)
+
+    def get(self, name: str) -> dict | None:
+        return next((f for f in self.data.get("features", []) if f["name"] == name), None)
+
+
+def feature_index(repo_root: Path, *, docs: bool = True) -> FeatureIndex:
+    """Load and refresh the index for a repository."""
+    index = FeatureIndex(repo_root)
+    index.refresh(docs=docs)
+    return index
+
+
+def latest_feature(repo_root: Path) -> str | None:
+    """The highest-numbered ``NNN-name`` directory under specs/, from the index."""
+    return feature_index(repo_root, docs=False).latest
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="features", description="Maintain the .specify/index feature index.")
+    parser.add_argument("command", choices=["refresh", "list", "latest", "next"], help="refresh the index, list features as JSON, or print the latest feature / next number")
+    parser.add_argument("--repo-root", type=Path, help="Repository root (default: nearest directory with .git or .specify)")
+    args = parser.parse_args(argv)
+
+    repo_root = args.repo_root or find_repo_root()
+    if repo_root is None:
+        print("ERROR: Could not determine repository root", file=sys.stderr)
+        return 1
+    index = feature_index(repo_root, docs=args.command in ("refresh", "list"))
+    if args.command == "list":
+        print(json.dumps({"latest": index.latest, "next_number": index.next_number, "features": index.features}, indent=2))
+    elif args.command == "latest":
+        print(index.latest or "")
+    elif args.command == "next":
+        print(f"{index.next_number:03d}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
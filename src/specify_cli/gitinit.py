@@ -0,0 +1,160 @@
+"""
+Initial git commit for a freshly extracted project.
+
+``git add .`` hashes every file under the project, which for ``init --here`` on a large
+existing directory is mostly work that has nothing to do with the template. Instead:
+
+template  (default) stage exactly the paths the template extraction wrote or found
+          identical, fed to one ``git add --pathspec-from-file`` over stdin
+tree      commit the whole directory (respecting .gitignore) by streaming its files
+          through one ``git fast-import`` process: a single packfile instead of a
+          loose object per file, then ``git read-tree`` to populate the index
+
+Every git process runs with ``cwd=`` set; the process working directory is never
+changed, so projects can be initialised concurrently from a worker pool. Each phase
+is timed so callers can report where the time went (and recorded as a span when
+``init --profile`` is active).
+"""
+
+import os
+import subprocess
+import time
+from pathlib import Path
+from typing import Iterable
+
+from .profiling import span
+
+COMMIT_MESSAGE = "Initial commit from Specify template"
+# git add reads at most this many arguments per call when --pathspec-from-file is unavailable
+_ARG_CHUNK = 500
+
+
+class GitInitError(RuntimeError):
+    """A git step failed; the message carries the step and git's stderr."""
+
+
+def _git(args: list[str], cwd: Path, *, input: bytes | None = None, check: bool = True) -> subprocess.CompletedProcess:
+    result = subprocess.run(["git", *args], cwd=cwd, input=input, capture_output=True)
+    if check and result.returncode != 0:
+        stderr = result.stderr.decode("utf-8", "replace").strip()
+        raise GitInitError(f"git {args[0]} failed: {stderr or f'exit code {result.returncode}'}")
+    return result
+
+
+class _Phases:
+    """Wall-clock milliseconds per named phase, in the order they ran."""
+
+    def __init__(self):
+        self.ms: dict[str, float] = {}
+
+    def run(self, name: str, fn, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            with span(f"git {name}", "git"):
+                return fn(*args, **kwargs)
+        finally:
+            self.ms[name] = round(self.ms.get(name, 0.0) + (time.perf_counter() - started) * 1000, 1)
+
+
+def _add_paths(project_path: Path, paths: list[str]) -> None:
+    """Stage paths literally (no glob magic); paths the user's .gitignore excludes are left out."""
+    stdin = b"".join(p.encode("utf-8") + b"\0" for p in paths)
+    result = _git(["--literal-pathspecs", "add", "--pathspec-from-file=-", "--pathspec-file-nul"], project_path, input=stdin, check=False)
+    if result.returncode == 129:
+        # git older than 2.25: no --pathspec-from-file
+        for i in range(0, len(paths), _ARG_CHUNK):
+            _git(["--literal-pathspecs", "add", "--", *paths[i:i + _ARG_CHUNK]], project_path, check=False)
+
+
+def _quote_path(path: str) -> str:
+    """fast-import path syntax: C-style quoting only when the path needs it."""
+    if "\n" in path or "\\" in path or path.startswith('"'):
+        return '"' + path.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+    return path
+
+
+def _head_ref(project_path: Path) -> str:
+    head = (project_path / ".git" / "HEAD").read_text(encoding="utf-8").strip()
+    if not head.startswith("ref:"):
+        raise GitInitError(f"unexpected HEAD after git init: {head}")
+    return head[len("ref:"):].strip()
+
+
+def _fast_import(project_path: Path, paths: list[str], ref: str, author: bytes, committer: bytes, message: str) -> None:
+    """Write one commit of paths onto ref through a single git fast-import stream."""
+    process = subprocess.Popen(["git", "fast-import", "--quiet"], cwd=project_path, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    executable_bits = os.name != "nt"
+    entries = []
+    try:
+        out = process.stdin
+        for mark, rel in enumerate(paths, start=1):
+            full = project_path / rel
+            st = full.lstat()
+            if os.path.islink(full):
+                data, mode = os.fsencode(os.readlink(full)), "120000"
+            else:
+                data = full.read_bytes()
+                mode = "100755" if executable_bits and st.st_mode & 0o100 else "100644"
+            out.write(b"blob\nmark :%d\ndata %d\n" % (mark, len(data)))
+            out.write(data)
+            out.write(b"\n")
+            entries.append(f"M {mode} :{mark} {_quote_path(rel)}\n")
+        body = message.encode("utf-8")
+        out.write(f"commit {ref}\n".encode("utf-8"))
+        out.write(b"author " + author + b"\ncommitter " + committer + b"\n")
+        out.write(b"data %d\n" % len(body) + body + b"\n")
+        out.write(os.fsencode("".join(entries)))
+        out.write(b"\n")
+        out.close()
+    except BrokenPipeError:
+        pass
+    finally:
+        stderr = process.stderr.read()
+        process.wait()
+    if process.returncode != 0:
+        raise GitInitError(f"git fast-import failed: {stderr.decode('utf-8', 'replace').strip()}")
+
+
+def init_repository(project_path: Path, paths: Iterable[str] | None = None, *, whole_tree: bool = False, message: str = COMMIT_MESSAGE) -> dict:
+    """Create a repository at project_path with one initial commit; returns per-phase timings.
+
+    paths: project-relative POSIX paths to commit (the template's files). None commits
+    everything ``git add .`` would. whole_tree commits the whole directory through
+    ``git fast-import`` instead (paths is then ignored).
+
+    Returns {"mode", "files", "phases": {phase: ms}}; raises GitInitError.
+    """
+    project_path = Path(project_path)
+    phases = _Phases()
+    phases.run("init", _git, ["init", "-q"], project_path)
+    if whole_tree:
+        listing = phases.run("scan", _git, ["ls-files", "-z", "--others", "--exclude-standard"], project_path).stdout
+        # Entries ending in "/" are nested repositories; git add would only record a gitlink
+        files = [p for p in os.fsdecode(listing).split("\0") if p and not p.endswith("/")]
+
+        def identities():
+            return (_git(["var", "GIT_AUTHOR_IDENT"], project_path).stdout.strip(), _git(["var", "GIT_COMMITTER_IDENT"], project_path).stdout.strip())
+
+        author, committer = phases.run("ident", identities)
+        ref = _head_ref(project_path)
+        phases.run("import", _fast_import, project_path, files, ref, author, committer, message)
+        # Index entries without stat data: the first `git status` refreshes them
+        phases.run("index", _git, ["read-tree", ref], project_path)
+        return {"mode": "tree", "files": len(files), "phases": phases.ms}
+
+    if paths is None:
+        phases.run("add", _git, ["add", "."], project_path)
+        files = None
+    else:
+        files = sorted(set(paths))
+        phases.run("add", _add_paths, project_path, files)
+    phases.run("commit", _git, ["commit", "-q", "-m", message], project_path)
+    return {"mode": "all" if paths is None else "template", "files": len(files) if files is not None else None, "phases": phases.ms}
+
+
+def describe(result: dict) -> str:
+    """One-line summary for the tracker, e.g. ``42 files (init 4 ms, add 21 ms, commit 12 ms)``."""
+    timings = ", ".join(f"{name} {ms:.0f} ms" for name, ms in result["phases"].items())
+    count = result["files"]
+    files = "" if count is None else f"{count} file{'' if count == 1 else 's'} "
+    return f"{files}({timings})"
@@ -0,0 +1,198 @@
+"""
+Parallel task execution for ``specify implement``.
+
+The task graph (tasks.py) says which tasks may run at the same time; this module runs
+them. Every task whose dependencies are done is handed to an agent CLI in
+non-interactive mode (``claude -p``, ``gemini -p``, ``codex exec``, ...), up to N at a
+time, each process told to implement exactly that one task.
+
+- A task holds a lock on every file it names while it runs, so two tasks touching the
+  same path never overlap, whatever tasks.md says about [P].
+- A task that fails (non-zero exit or timeout) blocks everything that depends on it;
+  independent tasks keep going.
+- Finished tasks are checked off in tasks.md by the orchestrator, not by the agents, so
+  concurrent agents never race on that file.
+
+Each agent's output goes to ``.specify/logs/<feature>/<task>.log``.
+"""
+
+import re
+import subprocess
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable
+
+from .agent_context import write_atomic
+from .tasks import Task, TaskGraph
+from .templating import AGENT_FORMATS
+
+# Agent -> command line that runs one prompt non-interactively (the prompt is appended)
+AGENT_COMMANDS = {
+    "claude": ["claude", "-p"],
+    "gemini": ["gemini", "-p"],
+    "qwen": ["qwen", "-p"],
+    "codex": ["codex", "exec"],
+    "opencode": ["opencode", "run"],
+    "cursor": ["cursor-agent", "-p"],
+    "auggie": ["auggie", "--print"],
+}
+LOG_DIR = ".specify/logs"
+
+PROMPT = """You are one of several agents implementing the feature in {feature_dir} at the same time.
+Implement only this task from {tasks_file}:
+
+{task_id} {description}
+{files}
+Read {feature_dir}/plan.md and the other design documents next to it as needed. Other tasks are being implemented concurrently by other processes: do not modify files that belong to other tasks, and do not edit tasks.md (completed tasks are checked off for you). Stop when this task is done."""
+
+
+def build_prompt(task: Task, feature_dir: Path, tasks_file: Path) -> str:
+    files = f"\nFiles for this task: {', '.join(task.files)}\n" if task.files else ""
+    return PROMPT.format(feature_dir=feature_dir, tasks_file=tasks_file, task_id=task.id, description=task.description, files=files)
+
+
+def check_off(tasks_file: Path, task_id: str) -> bool:
+    """Mark ``- [ ] <task_id>`` as ``- [X]`` in tasks_file; returns False when it was not found unchecked."""
+    text = tasks_file.read_text(encoding="utf-8")
+    updated, count = re.subn(rf"^(\s*[-*]\s+\[) (\]\s+{re.escape(task_id)}\b)", r"\1X\2", text, count=1, flags=re.M)
+    if count:
+        write_atomic(tasks_file, updated)
+    return bool(count)
+
+
+class TaskRunner:
+    """Runs a TaskGraph's tasks on up to workers agent processes.
+
+    on_event(task_id, status, detail) is called from the dispatching thread with status
+    "running", "done", "failed" or "blocked".
+    """
+
+    def __init__(self, graph: TaskGraph, command: list[str], *, repo_root: Path, feature_dir: Path, tasks_file: Path, workers: int = 4, timeout: float | None = None, log_dir: Path | None = None, on_event: Callable[[str, str, str], None] | None = None):
+        self.graph = graph
+        self.command = command
+        self.repo_root = repo_root
+        self.feature_dir = feature_dir
+        self.tasks_file = tasks_file
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.log_dir = log_dir or repo_root / LOG_DIR / feature_dir.name
+        self.on_event = on_event or (lambda *_: None)
+        self.status = {task_id: "pending" for task_id in graph.tasks}
+        self._predecessors: dict[str, list[str]] = {task_id: [] for task_id in graph.tasks}
+        self._successors: dict[str, list[str]] = {task_id: [] for task_id in graph.tasks}
+        for before, after in graph.edges:
+            self._predecessors[after].append(before)
+            self._successors[before].append(after)
+        self._processes: dict[str, subprocess.Popen] = {}
+        self._processes_lock = threading.Lock()
+        self._stopping = False
+
+    def _event(self, task_id: str, status: str, detail: str = "") -> None:
+        self.status[task_id] = status
+        self.on_event(task_id, status, detail)
+
+    def _ready(self) -> list[str]:
+        return [t for t in self.graph.order if self.status[t] == "pending" and all(self.status[p] == "done" for p in self._predecessors[t])]
+
+    def _block_dependents(self, task_id: str) -> None:
+        stack = list(self._successors[task_id])
+        while stack:
+            after = stack.pop()
+            if self.status[after] == "pending":
+                self._event(after, "blocked", f"blocked by {task_id}")
+                stack.extend(self._successors[after])
+
+    def _run_task(self, task: Task) -> tuple[bool, str]:
+        """Run one agent process to completion; returns (succeeded, detail)."""
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        log_path = self.log_dir / f"{task.id}.log"
+        started = time.monotonic()
+        with open(log_path, "wb") as log:
+            try:
+                process = subprocess.Popen(
+                    [*self.command, build_prompt(task, self.feature_dir, self.tasks_file)],
+                    cwd=self.repo_root,
+                    stdin=subprocess.DEVNULL,
+                    stdout=log,
+                    stderr=subprocess.STDOUT,
+                )
+            except OSError as e:
+                return False, f"could not start {self.command[0]}: {e.strerror or e}"
+            with self._processes_lock:
+                self._processes[task.id] = process
+            try:
+                returncode = process.wait(timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+                return False, f"timed out after {self.timeout:g}s, log {log_path}"
+            finally:
+                with self._processes_lock:
+                    self._processes.pop(task.id, None)
+        elapsed = time.monotonic() - started
+        if returncode != 0:
+            return False, f"exit {returncode} after {elapsed:.1f}s, log {log_path}"
+        return True, f"{elapsed:.1f}s"
+
+    def stop(self) -> None:
+        """Terminate every running agent process (on Ctrl+C)."""
+        self._stopping = True
+        with self._processes_lock:
+            for process in self._processes.values():
+                process.terminate()
+
+    def run(self) -> dict[str, str]:
+        """Run until every task is done, failed or blocked; returns the final status per task."""
+        locked: set[str] = set()
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            try:
+                while True:
+                    if not self._stopping:
+                        for task_id in self._ready():
+                            if len(running) >= self.workers:
+                                break
+                            task = self.graph.tasks[task_id]
+                            # Per-file locks: a task whose files are in use waits for the next round
+                            if locked.intersection(task.files):
+                                continue
+                            locked.update(task.files)
+                            self._event(task_id, "running", "")
+                            running[pool.submit(self._run_task, task)] = task
+                    if not running:
+                        break
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        task = running.pop(future)
+                        locked.difference_update(task.files)
+                        succeeded, detail = future.result()
+                        if succeeded:
+                            check_off(self.tasks_file, task.id)
+                            self._event(task.id, "done", detail)
+                        else:
+                            self._event(task.id, "failed", detail)
+                            self._block_dependents(task.id)
+            except BaseException:
+                self.stop()
+                raise
+        return dict(self.status)
+
+
+def agent_command(ai: str, which: Callable[[str], str | None], extra_args: list[str] | None = None) -> list[str] | None:
+    """Command line for ai with its executable resolved, or None when the CLI is not installed."""
+    executable, *args = AGENT_COMMANDS[ai]
+    path = which(executable)
+    if path is None:
+        return None
+    return [path, *args, *(extra_args or [])]
+
+
+def default_agent(repo_root: Path, which: Callable[[str], str | None]) -> str | None:
+    """The agent to run tasks with: an installed CLI whose commands the project has, else any installed one."""
+    installed = [ai for ai, (executable, *_) in AGENT_COMMANDS.items() if which(executable)]
+    for ai in installed:
+        if (repo_root / AGENT_FORMATS[ai]["dir"]).is_dir():
+            return ai
+    return installed[0] if installed else None
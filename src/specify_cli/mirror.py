@@ -0,0 +1,184 @@
+"""
+Template mirrors for networks without access to GitHub.
+
+``specify mirror sync DIR`` copies the template assets of one or more releases into a
+directory; ``--template-source`` (or ``SPECIFY_TEMPLATE_SOURCE``) makes ``init`` read
+releases from such a directory (``file://...``) or from any HTTP server publishing it
+(``https://mirror.internal/spec-kit``). The layout is the same either way::
+
+    index.json                  {"latest": "v0.0.37", "releases": ["v0.0.36", "v0.0.37"]}
+    <tag>/release.json          release metadata in the GitHub API's shape
+    <tag>/spec-kit-template-<agent>-<script>-<tag>.zip
+    <tag>/spec-kit-base-<script>-<tag>.zip, <tag>/spec-kit-overlay-<agent>-<script>-<tag>.zip
+                                (layered releases)
+
+Asset URLs in release.json are relative to the release directory, so a mirror can be
+copied or served from anywhere. Every asset carries a ``sha256:`` digest, computed
+during sync when GitHub did not provide one, and init verifies it as usual.
+"""
+
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+from urllib.parse import quote, unquote, urlparse
+from urllib.request import url2pathname
+
+from .cache import parse_digest, write_json_atomic
+from .download import ContentHash, download_file
+from .release import fetch_release, is_template_asset
+
+if TYPE_CHECKING:
+    import httpx
+
+SOURCE_ENV = "SPECIFY_TEMPLATE_SOURCE"
+INDEX_FILE = "index.json"
+RELEASE_FILE = "release.json"
+DEFAULT_SYNC_WORKERS = 4
+
+
+class MirrorError(RuntimeError):
+    """The mirror is unreadable, or does not have the requested release."""
+
+
+def parse_source(source: str) -> tuple[str, str]:
+    """Return ("file", directory) or ("http", base URL) for a --template-source value."""
+    parsed = urlparse(source)
+    if parsed.scheme in ("http", "https"):
+        return "http", source.rstrip("/")
+    if parsed.scheme == "file":
+        return "file", url2pathname(unquote(parsed.path))
+    if Path(source).is_dir():
+        return "file", str(Path(source).resolve())
+    raise MirrorError(f"Template source must be a file:// directory or an http(s):// URL, got {source!r}")
+
+
+def local_asset(url: str) -> Path | None:
+    """The local path of a mirror asset URL, or None for URLs that need downloading."""
+    if not url.startswith("file:"):
+        return None
+    return Path(url2pathname(unquote(urlparse(url).path)))
+
+
+def _read_json(source: str, rel: str, client: "httpx.Client | None") -> dict:
+    kind, root = parse_source(source)
+    try:
+        if kind == "file":
+            return json.loads((Path(root) / rel).read_text(encoding="utf-8"))
+        response = client.get(f"{root}/{quote(rel)}", timeout=30, follow_redirects=True)
+        if response.status_code == 404:
+            raise FileNotFoundError(rel)
+        if response.status_code != 200:
+            raise MirrorError(f"Template mirror returned {response.status_code} for {root}/{rel}")
+        return response.json()
+    except FileNotFoundError:
+        raise MirrorError(f"{rel} not found in template mirror {source}") from None
+    except (OSError, ValueError) as e:
+        raise MirrorError(f"Could not read {rel} from template mirror {source}: {e}") from e
+
+
+def load_release(source: str, client: "httpx.Client | None" = None, tag: str | None = None) -> dict:
+    """Release metadata for tag (default: the mirror's latest) with absolute asset URLs.
+
+    The returned dict has the GitHub API's shape plus ``"mirror": source``, which tells
+    the downloader not to send GitHub credentials to the mirror.
+    """
+    kind, root = parse_source(source)
+    if tag is None:
+        tag = _read_json(source, INDEX_FILE, client).get("latest")
+        if not tag:
+            raise MirrorError(f"Template mirror {source} has no latest release; run 'specify mirror sync' first")
+    release = _read_json(source, f"{tag}/{RELEASE_FILE}", client)
+    base = (Path(root) / tag).as_uri() if kind == "file" else f"{root}/{quote(tag)}"
+    for asset in release.get("assets", []):
+        asset["browser_download_url"] = f"{base}/{quote(asset['name'])}"
+    release["mirror"] = source
+    return release
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _sync_asset(client: "httpx.Client", asset: dict, release_dir: Path, headers: dict) -> tuple[dict, bool]:
+    """Make release_dir/<asset> match the release; returns (mirror asset entry, downloaded)."""
+    target = release_dir / asset["name"]
+    expected = parse_digest(asset.get("digest"))
+    actual = sha256_file(target) if target.is_file() and target.stat().st_size == asset["size"] else None
+    downloaded = actual is None or (expected is not None and actual != expected)
+    if downloaded:
+        content_hash = ContentHash()
+        download_file(client, asset["browser_download_url"], target, headers=headers, expected_size=asset["size"] or None, content_hash=content_hash)
+        actual = content_hash.hexdigest
+    if expected and actual != expected:
+        target.unlink(missing_ok=True)
+        raise MirrorError(f"{asset['name']}: SHA-256 mismatch (expected {expected}, got {actual})")
+    return {"name": asset["name"], "size": target.stat().st_size, "digest": f"sha256:{actual}", "browser_download_url": asset["name"]}, downloaded
+
+
+def sync(
+    client: "httpx.Client",
+    directory: Path,
+    tags: list[str | None],
+    *,
+    headers: dict | None = None,
+    workers: int = DEFAULT_SYNC_WORKERS,
+    on_asset: Callable[[str, str, dict, bool], None] | None = None,
+) -> list[dict]:
+    """Mirror every template asset of each release in tags (None = latest) into directory.
+
+    Assets already present with the right size and digest are not downloaded again.
+    on_asset(tag, name, entry, downloaded) is called as each asset finishes. Returns one
+    {"tag", "assets", "downloaded", "bytes"} summary per release; raises MirrorError or
+    the underlying fetch/download error.
+    """
+    directory = Path(directory)
+    headers = headers or {}
+    try:
+        index = json.loads((directory / INDEX_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        index = {"latest": None, "releases": []}
+    summaries = []
+    for tag in tags:
+        release_data, _ = fetch_release(client, tag=tag, headers=headers)
+        tag_name = release_data["tag_name"]
+        release_dir = directory / tag_name
+        release_dir.mkdir(parents=True, exist_ok=True)
+        assets = [a for a in release_data.get("assets", []) if is_template_asset(a.get("name", ""))]
+        if not assets:
+            raise MirrorError(f"Release {tag_name} has no spec-kit template assets")
+
+        def one(asset: dict) -> tuple[dict, bool]:
+            entry, downloaded = _sync_asset(client, asset, release_dir, headers)
+            if on_asset:
+                on_asset(tag_name, asset["name"], entry, downloaded)
+            return entry, downloaded
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            results = list(pool.map(one, assets))
+        entries = [entry for entry, _ in results]
+        write_json_atomic(release_dir / RELEASE_FILE, {
+            "tag_name": tag_name,
+            "name": release_data.get("name"),
+            "published_at": release_data.get("published_at"),
+            "assets": entries,
+        })
+        if tag is None:
+            index["latest"] = tag_name
+        if tag_name not in index["releases"]:
+            index["releases"].append(tag_name)
+        summaries.append({
+            "tag": tag_name,
+            "assets": len(entries),
+            "downloaded": sum(1 for _, downloaded in results if downloaded),
+            "bytes": sum(e["size"] for e in entries),
+        })
+    if not index.get("latest") and index["releases"]:
+        index["latest"] = index["releases"][-1]
+    write_json_atomic(directory / INDEX_FILE, index)
+    return summaries
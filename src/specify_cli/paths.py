@@ -0,0 +1,206 @@
+"""
+Feature path resolution without forking git: the in-process equivalent of
+``get_feature_paths`` and ``check-prerequisites.sh``.
+
+The repository root is found by walking up to ``.git`` (a directory, or a ``gitdir:``
+file for worktrees and submodules) and the branch is read from ``HEAD`` directly,
+instead of three or four ``git rev-parse`` calls. Outside git the nearest ``.specify``
+directory is the root (the project holding the bundled copy when there is none above
+the working directory) and the latest feature (from the feature index) is current.
+
+``PathsCache`` memoises answers for the ``specify daemon`` socket server and
+invalidates them by the mtimes of ``HEAD``, specs/, the feature directory and its
+contracts/.
+
+This module only uses the standard library; release archives ship a copy under
+``.specify/scripts/python/`` for the bundled helpers.
+"""
+
+# Run by whatever python3 the project has, so keep annotations lazy for older interpreters
+from __future__ import annotations
+
+import os
+import re
+from pathlib import Path
+
+try:
+    from .features import latest_feature
+except ImportError:  # run as a script: features.py sits next to this file
+    from features import latest_feature
+
+_FEATURE_BRANCH = re.compile(r"^[0-9]{3}-")
+
+
+class PrerequisiteError(RuntimeError):
+    """A prerequisite for the current phase is missing; hint says which command creates it."""
+
+    def __init__(self, message: str, hint: str | None = None):
+        super().__init__(message)
+        self.hint = hint
+
+
+def find_git(start: Path) -> tuple[Path, Path] | None:
+    """(work tree root, git directory) for the repository containing start, or None."""
+    for directory in [start, *start.parents]:
+        dot_git = directory / ".git"
+        if dot_git.is_dir():
+            return directory, dot_git
+        if dot_git.is_file():
+            try:
+                content = dot_git.read_text(encoding="utf-8").strip()
+            except OSError:
+                return None
+            if content.startswith("gitdir:"):
+                git_dir = Path(content[len("gitdir:"):].strip())
+                return directory, (directory / git_dir).resolve() if not git_dir.is_absolute() else git_dir
+            return None
+    return None
+
+
+def _common_dir(git_dir: Path) -> Path:
+    """Where refs live: a worktree's git directory points at the main one via commondir."""
+    try:
+        common = (git_dir / "commondir").read_text(encoding="utf-8").strip()
+    except OSError:
+        return git_dir
+    return (git_dir / common).resolve()
+
+
+def _ref_exists(git_dir: Path, ref: str) -> bool:
+    common = _common_dir(git_dir)
+    if (git_dir / ref).is_file() or (common / ref).is_file():
+        return True
+    try:
+        with open(common / "packed-refs", encoding="utf-8") as fh:
+            return any(line.rstrip("\n").endswith(" " + ref) for line in fh)
+    except OSError:
+        return False
+
+
+def read_branch(git_dir: Path) -> str | None:
+    """Branch name from HEAD, "HEAD" when detached, None when unborn or unreadable.
+
+    Matches ``git rev-parse --abbrev-ref HEAD``, which fails before the first commit.
+    """
+    try:
+        head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    if head.startswith("ref:"):
+        ref = head[len("ref:"):].strip()
+        if not _ref_exists(git_dir, ref):
+            return None
+        return ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else ref
+    return "HEAD" if head else None
+
+
+def resolve_paths(cwd: Path | None = None, *, feature: str | None = None) -> dict:
+    """The variables get_feature_paths exports (REPO_ROOT, CURRENT_BRANCH, HAS_GIT, FEATURE_DIR, ...).
+
+    feature overrides the current feature like SPECIFY_FEATURE (which is honoured too).
+    """
+    cwd = Path(cwd or Path.cwd()).resolve()
+    git = find_git(cwd)
+    branch = None
+    if git:
+        repo_root, git_dir = git
+        branch = read_branch(git_dir)
+    else:
+        repo_root = next((p for p in [cwd, *cwd.parents] if (p / ".specify").is_dir()), None)
+        if repo_root is None:
+            # Bundled copy: <root>/.specify/scripts/python/paths.py
+            here = Path(__file__).resolve()
+            repo_root = here.parents[3] if here.parent.name == "python" and here.parents[2].name == ".specify" else cwd
+    current = feature or os.environ.get("SPECIFY_FEATURE") or branch or latest_feature(repo_root) or "main"
+    feature_dir = repo_root / "specs" / current
+    return {
+        "REPO_ROOT": str(repo_root),
+        "CURRENT_BRANCH": current,
+        "HAS_GIT": git is not None,
+        "FEATURE_DIR": str(feature_dir),
+        "FEATURE_SPEC": str(feature_dir / "spec.md"),
+        "IMPL_PLAN": str(feature_dir / "plan.md"),
+        "TASKS": str(feature_dir / "tasks.md"),
+        "RESEARCH": str(feature_dir / "research.md"),
+        "DATA_MODEL": str(feature_dir / "data-model.md"),
+        "QUICKSTART": str(feature_dir / "quickstart.md"),
+        "CONTRACTS_DIR": str(feature_dir / "contracts"),
+    }
+
+
+def check_prerequisites(paths: dict, *, require_tasks: bool = False, include_tasks: bool = False, paths_only: bool = False) -> dict:
+    """What check-prerequisites.sh --json prints, as a dict; raises PrerequisiteError like its exit 1 cases."""
+    branch = paths["CURRENT_BRANCH"]
+    if paths["HAS_GIT"] and not _FEATURE_BRANCH.match(branch):
+        raise PrerequisiteError(f"Not on a feature branch. Current branch: {branch}", "Feature branches should be named like: 001-feature-name")
+    if paths_only:
+        return {"REPO_ROOT": paths["REPO_ROOT"], "BRANCH": branch, **{key: paths[key] for key in ("FEATURE_DIR", "FEATURE_SPEC", "IMPL_PLAN", "TASKS")}}
+
+    feature_dir = paths["FEATURE_DIR"]
+    if not os.path.isdir(feature_dir):
+        raise PrerequisiteError(f"Feature directory not found: {feature_dir}", "Run /specify first to create the feature structure.")
+    # One listing of the feature directory instead of a test per document
+    with os.scandir(feature_dir) as it:
+        entries = {entry.name: entry for entry in it}
+
+    def is_file(name: str) -> bool:
+        entry = entries.get(name)
+        return entry is not None and entry.is_file()
+
+    if not is_file("plan.md"):
+        raise PrerequisiteError(f"plan.md not found in {feature_dir}", "Run /plan first to create the implementation plan.")
+    if require_tasks and not is_file("tasks.md"):
+        raise PrerequisiteError(f"tasks.md not found in {feature_dir}", "Run /tasks first to create the task list.")
+
+    docs = [name for name in ("research.md", "data-model.md") if is_file(name)]
+    contracts = entries.get("contracts")
+    if contracts is not None and contracts.is_dir() and any(os.scandir(contracts.path)):
+        docs.append("contracts/")
+    if is_file("quickstart.md"):
+        docs.append("quickstart.md")
+    if include_tasks and is_file("tasks.md"):
+        docs.append("tasks.md")
+    return {"FEATURE_DIR": feature_dir, "AVAILABLE_DOCS": docs}
+
+
+def _mtime(path: str | Path) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class PathsCache:
+    """Memoised resolve_paths + check_prerequisites for one repository (used by the daemon).
+
+    An answer is reused while the mtimes it depends on are unchanged: HEAD (checkout),
+    specs/ (features added or removed), the feature directory (docs added or removed)
+    and its contracts/ directory.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root).resolve()
+        git = find_git(self.root)
+        self.git_dir = git[1] if git else None
+        self._entries: dict[tuple, tuple[tuple, dict]] = {}
+
+    def _stamp(self, feature_dir: str | None) -> tuple:
+        paths = [self.git_dir / "HEAD" if self.git_dir else None, self.root / "specs"]
+        if feature_dir:
+            paths += [feature_dir, os.path.join(feature_dir, "contracts")]
+        return tuple(_mtime(p) if p is not None else None for p in paths)
+
+    def query(self, *, feature: str | None = None, require_tasks: bool = False, include_tasks: bool = False, paths_only: bool = False) -> dict:
+        """Same result (or PrerequisiteError) as check_prerequisites(resolve_paths(root, feature=...), ...)."""
+        key = (feature, require_tasks, include_tasks, paths_only)
+        cached = self._entries.get(key)
+        if cached is not None:
+            stamp, result = cached
+            if stamp == self._stamp(result.get("FEATURE_DIR")):
+                return result
+        paths = resolve_paths(self.root, feature=feature)
+        # Stamp before reading so a change during the read invalidates the entry
+        stamp = self._stamp(paths["FEATURE_DIR"])
+        result = check_prerequisites(paths, require_tasks=require_tasks, include_tasks=include_tasks, paths_only=paths_only)
+        self._entries[key] = (stamp, result)
+        return result
@@ -0,0 +1,204 @@
+"""
+Timing profile for ``specify init --profile``.
+
+A Profiler collects spans (name, category, start, end, thread) on one perf_counter
+clock from three sources:
+
+step   every StepTracker step, from its recorded start and end (see StepTracker)
+http   every HTTP request made through an instrumented httpx client, split into the
+       sub-phases httpcore reports through the ``trace`` request extension: connect
+       (DNS lookup + TCP), TLS handshake, sending the request, waiting for the response
+       headers and reading the body. The extension is attached by a request event hook,
+       so callers pass nothing per request.
+phase  code wrapped in ``span()`` while a profiler is active (e.g. the git phases)
+
+``summary()`` gives rows for a table; ``write_chrome_trace()`` writes the Trace Event
+Format that chrome://tracing and https://ui.perfetto.dev open, one track per thread.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# httpcore trace event prefix -> sub-phase name (http11.* and http2.* share the suffixes)
+HTTP_PHASES = {
+    "connect_tcp": "connect (DNS + TCP)",
+    "connect_unix_socket": "connect (unix socket)",
+    "start_tls": "TLS handshake",
+    "send_connection_init": "HTTP/2 preface",
+    "send_request_headers": "send request",
+    "send_request_body": "send request body",
+    "receive_response_headers": "wait for response",
+    "receive_response_body": "download body",
+}
+
+_active: "Profiler | None" = None
+
+
+class Span:
+    __slots__ = ("name", "category", "start", "end", "thread", "args")
+
+    def __init__(self, name: str, category: str, start: float, end: float, thread: int, args: dict | None = None):
+        self.name = name
+        self.category = category
+        self.start = start
+        self.end = end
+        self.thread = thread
+        self.args = args or {}
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class Profiler:
+    """Collects spans in seconds since origin; safe to feed from several threads."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+        self._requests: dict[int, dict] = {}
+        self._threads: dict[int, str] = {}
+
+    def now(self) -> float:
+        return time.perf_counter() - self.origin
+
+    def add(self, name: str, category: str, start: float, end: float, args: dict | None = None) -> None:
+        thread = threading.current_thread()
+        with self._lock:
+            self._threads.setdefault(thread.ident, thread.name)
+            self.spans.append(Span(name, category, start, end, thread.ident, args))
+
+    @contextmanager
+    def span(self, name: str, category: str = "phase", **args):
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.add(name, category, start, self.now(), args)
+
+    def add_steps(self, tracker) -> None:
+        """Record every finished step of a StepTracker (recorded on the main thread's track)."""
+        offset = tracker.origin - self.origin
+        for step in tracker.steps:
+            if step.ended is None:
+                continue
+            args = {"status": step.status, **({"detail": step.detail} if step.detail else {})}
+            self.add(step.label, "step", offset + step.started, offset + step.ended, args)
+
+    # HTTP ---------------------------------------------------------------
+
+    def instrument(self, client) -> None:
+        """Add request/response event hooks to an httpx.Client."""
+        hooks = client.event_hooks
+        hooks["request"].append(self._on_request)
+        hooks["response"].append(self._on_response)
+        client.event_hooks = hooks
+
+    def _on_request(self, request) -> None:
+        state = {"label": f"{request.method} {request.url.host}{request.url.path}", "start": self.now(), "open": {}, "response": None, "closed": False}
+        with self._lock:
+            self._requests[id(request)] = state
+        request.extensions = {**request.extensions, "trace": lambda event, info: self._on_trace(state, event)}
+
+    def _on_response(self, response) -> None:
+        with self._lock:
+            state = self._requests.get(id(response.request))
+        if state is not None:
+            state["response"] = self.now()
+            state["status"] = response.status_code
+
+    def _on_trace(self, state: dict, event: str) -> None:
+        base, _, outcome = event.rpartition(".")
+        now = self.now()
+        if outcome == "started":
+            state["open"][base] = now
+            return
+        start = state["open"].pop(base, None)
+        if start is None:
+            return
+        kind = base.rpartition(".")[2]
+        if kind == "response_closed":
+            self._close_request(state, now)
+        elif kind in HTTP_PHASES:
+            args = {"request": state["label"], **({"failed": True} if outcome == "failed" else {})}
+            self.add(HTTP_PHASES[kind], "http", start, now, args)
+
+    def _close_request(self, state: dict, end: float, suffix: str = "") -> None:
+        if state["closed"]:
+            return
+        state["closed"] = True
+        args = {"status": state["status"]} if "status" in state else {}
+        self.add(state["label"] + suffix, "http", state["start"], end, args)
+
+    def finish(self) -> None:
+        """Close requests whose body was never read to the end (or whose transport does not trace)."""
+        with self._lock:
+            states = list(self._requests.values())
+            self._requests.clear()
+        for state in states:
+            if not state["closed"] and state["response"] is not None:
+                self._close_request(state, state["response"], " (until headers)")
+
+    # Output -------------------------------------------------------------
+
+    def summary(self) -> list[tuple[str, str, float, float]]:
+        """(name, category, start, duration) per span in start order, in seconds."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: (s.start, -s.end))
+        return [(s.name, s.category, s.start, s.duration) for s in spans]
+
+    def to_chrome_trace(self, metadata: dict | None = None) -> dict:
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+            threads = dict(self._threads)
+        tids = {ident: n for n, ident in enumerate(threads, start=1)}
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "specify"}}]
+        events += [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tids[ident], "args": {"name": name}} for ident, name in threads.items()]
+        for s in spans:
+            events.append({
+                "name": s.name,
+                "cat": s.category,
+                "ph": "X",
+                "ts": round(s.start * 1e6, 1),
+                "dur": round(s.duration * 1e6, 1),
+                "pid": pid,
+                "tid": tids[s.thread],
+                "args": s.args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": metadata or {}}
+
+    def write_chrome_trace(self, path: Path, metadata: dict | None = None) -> None:
+        Path(path).write_text(json.dumps(self.to_chrome_trace(metadata), ensure_ascii=False), encoding="utf-8")
+
+
+def start() -> Profiler:
+    """Make a new profiler the active one (picked up by ``span()``) and return it."""
+    global _active
+    _active = Profiler()
+    return _active
+
+
+def stop() -> None:
+    global _active
+    _active = None
+
+
+def current() -> "Profiler | None":
+    return _active
+
+
+@contextmanager
+def span(name: str, category: str = "phase", **args):
+    """Time the enclosed block on the active profiler; does nothing when none is active."""
+    profiler = _active
+    if profiler is None:
+        yield
+        return
+    with profiler.span(name, category, **args):
+        yield
@@ -0,0 +1,278 @@
+"""
+Release metadata lookup with conditional requests and rate-limit awareness.
+
+The last release JSON for each query ("latest" or a pinned tag) is persisted with its
+ETag so repeat lookups send ``If-None-Match`` and a ``304`` costs no API quota. The
+``X-RateLimit-*`` headers are tracked as well: while the quota is exhausted the stored
+release is served instead of calling the API at all.
+"""
+
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .cache import write_json_atomic, default_cache_dir
+
+GITHUB_API = "https://api.github.com"
+# Points release lookups at another API host: GitHub Enterprise, or a local stand-in for benchmarks
+API_URL_ENV = "SPECIFY_GITHUB_API_URL"
+REPO_OWNER = "github"
+REPO_NAME = "spec-kit"
+
+# spec-kit-template-<agent>-<script>-<version>.zip
+ASSET_PATTERN = re.compile(r"^spec-kit-template-(?P<agent>.+)-(?P<script>sh|ps)-(?P<version>[^-]+)\.zip$")
+# Layered releases also publish spec-kit-base-<script>-<version>.zip (the shared .specify/
+# payload) and spec-kit-overlay-<agent>-<script>-<version>.zip (what the agent adds on top)
+BASE_PATTERN = re.compile(r"^spec-kit-base-(?P<script>sh|ps)-(?P<version>[^-]+)\.zip$")
+OVERLAY_PATTERN = re.compile(r"^spec-kit-overlay-(?P<agent>.+)-(?P<script>sh|ps)-(?P<version>[^-]+)\.zip$")
+
+if TYPE_CHECKING:
+    import httpx
+
+# Wait for the quota to reset instead of failing when it is this close (seconds)
+MAX_RATE_LIMIT_WAIT = 60
+# Only the fields the CLI uses are persisted
+_ASSET_FIELDS = ("name", "size", "browser_download_url", "digest")
+
+
+class ReleaseFetchError(RuntimeError):
+    """Release metadata could not be fetched and no stored copy is available."""
+
+
+class RateLimitError(ReleaseFetchError):
+    """The GitHub API quota is exhausted."""
+
+    def __init__(self, message: str, reset_at: float | None = None):
+        super().__init__(message)
+        self.reset_at = reset_at
+
+
+def _trim_release(release_data: dict) -> dict:
+    return {
+        "tag_name": release_data.get("tag_name"),
+        "name": release_data.get("name"),
+        "published_at": release_data.get("published_at"),
+        "assets": [
+            {k: a[k] for k in _ASSET_FIELDS if k in a}
+            for a in release_data.get("assets", [])
+        ],
+    }
+
+
+def build_asset_index(release_data: dict) -> dict[tuple[str, str], dict]:
+    """Map (agent, script) to the template asset of a release."""
+    index = {}
+    for asset in release_data.get("assets", []):
+        match = ASSET_PATTERN.match(asset.get("name", ""))
+        if match:
+            index.setdefault((match["agent"], match["script"]), asset)
+    return index
+
+
+def find_asset(release_data: dict, ai_assistant: str, script_type: str, layer: str | None = None) -> dict | None:
+    """Return the template asset for ai_assistant/script_type, or None.
+
+    layer selects the "base" or "overlay" archive of a layered release instead of the full one.
+    """
+    if layer == "base":
+        return next((a for a in release_data.get("assets", []) if (m := BASE_PATTERN.match(a.get("name", ""))) and m["script"] == script_type), None)
+    if layer == "overlay":
+        return next((a for a in release_data.get("assets", []) if (m := OVERLAY_PATTERN.match(a.get("name", ""))) and (m["agent"], m["script"]) == (ai_assistant, script_type)), None)
+    asset = build_asset_index(release_data).get((ai_assistant, script_type))
+    if asset is None:
+        # Fall back to the historical substring match for unexpected asset names
+        pattern = f"spec-kit-template-{ai_assistant}-{script_type}"
+        asset = next((a for a in release_data.get("assets", []) if pattern in a.get("name", "") and a["name"].endswith(".zip")), None)
+    return asset
+
+
+def asset_layers(release_data: dict, ai_assistant: str, script_type: str) -> tuple[str | None, ...]:
+    """The archives that make up ai_assistant/script_type, in the order they are applied.
+
+    ("base", "overlay") when the release publishes both, else (None,): the full archive
+    of releases that predate layered assets.
+    """
+    if find_asset(release_data, ai_assistant, script_type, "base") and find_asset(release_data, ai_assistant, script_type, "overlay"):
+        return ("base", "overlay")
+    return (None,)
+
+
+def has_template(release_data: dict, ai_assistant: str, script_type: str) -> bool:
+    """Whether the release can provide ai_assistant/script_type, layered or as a full archive."""
+    return asset_layers(release_data, ai_assistant, script_type) != (None,) or find_asset(release_data, ai_assistant, script_type) is not None
+
+
+def is_template_asset(name: str) -> bool:
+    return any(p.match(name) for p in (ASSET_PATTERN, BASE_PATTERN, OVERLAY_PATTERN))
+
+
+def api_base() -> str:
+    """The GitHub API base URL (``SPECIFY_GITHUB_API_URL`` when set)."""
+    return (os.environ.get(API_URL_ENV) or GITHUB_API).rstrip("/")
+
+
+def _format_reset(reset_at: float | None) -> str:
+    if not reset_at:
+        return "unknown"
+    return time.strftime("%H:%M:%S", time.localtime(reset_at))
+
+
+class ReleaseIndex:
+    """Persisted release JSON, ETags and rate-limit state under the specify cache directory."""
+
+    def __init__(self, root: Path | None = None, owner: str = REPO_OWNER, repo: str = REPO_NAME):
+        self.owner = owner
+        self.repo = repo
+        name = f"{owner}-{repo}"
+        if api_base() != GITHUB_API:
+            # Releases from another API host never answer for github.com's
+            name += "@" + re.sub(r"[^A-Za-z0-9.-]+", "_", api_base().split("://", 1)[-1])
+        self.root = (Path(root) if root else default_cache_dir() / "releases") / name
+
+    def _entry_path(self, tag: str | None) -> Path:
+        name = tag.replace("/", "_") if tag else "latest"
+        return self.root / f"{name}.json"
+
+    def _rate_limit_path(self, authenticated: bool) -> Path:
+        return self.root / f"ratelimit-{'token' if authenticated else 'anonymous'}.json"
+
+    def load(self, tag: str | None = None) -> dict | None:
+        try:
+            return json.loads(self._entry_path(tag).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def save(self, tag: str | None, release_data: dict, etag: str | None) -> None:
+        entry = {"etag": etag, "fetched_at": time.time(), "release": _trim_release(release_data)}
+        write_json_atomic(self._entry_path(tag), entry)
+        if tag is None and release_data.get("tag_name"):
+            # A "latest" lookup also answers later pins of the same tag
+            write_json_atomic(self._entry_path(release_data["tag_name"]), {**entry, "etag": None})
+
+    def rate_limit(self, authenticated: bool) -> dict:
+        try:
+            return json.loads(self._rate_limit_path(authenticated).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def record_rate_limit(self, headers: "httpx.Headers", authenticated: bool) -> dict:
+        remaining = headers.get("x-ratelimit-remaining")
+        reset = headers.get("x-ratelimit-reset")
+        if remaining is None:
+            return self.rate_limit(authenticated)
+        state = {
+            "remaining": int(remaining),
+            "limit": int(headers.get("x-ratelimit-limit", 0) or 0),
+            "reset": float(reset) if reset else None,
+            "recorded_at": time.time(),
+        }
+        write_json_atomic(self._rate_limit_path(authenticated), state)
+        return state
+
+    def exhausted_until(self, authenticated: bool) -> float | None:
+        """Return the reset time if the recorded quota is exhausted, else None."""
+        state = self.rate_limit(authenticated)
+        reset = state.get("reset")
+        if state.get("remaining") == 0 and reset and reset > time.time():
+            return reset
+        return None
+
+
+def fetch_release(
+    client: "httpx.Client",
+    *,
+    tag: str | None = None,
+    headers: dict | None = None,
+    index: ReleaseIndex | None = None,
+    owner: str = REPO_OWNER,
+    repo: str = REPO_NAME,
+    debug: bool = False,
+    refresh: bool = False,
+) -> tuple[dict, dict]:
+    """Fetch release metadata for the latest release (or ``tag``).
+
+    Returns (release_data, info) where info["source"] is one of:
+      index         pinned tag answered from the stored index without a request
+      network       fresh 200 response
+      not-modified  304 for the stored ETag (no quota used)
+      stale         stored copy served because the API is rate limited or unreachable
+    """
+    import httpx
+
+    headers = dict(headers or {})
+    authenticated = "Authorization" in headers
+    api_url = f"{api_base()}/repos/{owner}/{repo}/releases/" + (f"tags/{tag}" if tag else "latest")
+    stored = index.load(tag) if index else None
+    info = {"source": "network", "url": api_url, "rate_limit": {}}
+
+    if tag and stored and not refresh:
+        # Published tags are immutable for our purposes; no need to ask again
+        info["source"] = "index"
+        return stored["release"], info
+
+    if index:
+        reset_at = index.exhausted_until(authenticated)
+        if reset_at and stored:
+            info.update(source="stale", reason=f"rate limited until {_format_reset(reset_at)}")
+            return stored["release"], info
+        if reset_at:
+            wait = reset_at - time.time()
+            if wait > MAX_RATE_LIMIT_WAIT:
+                raise RateLimitError(
+                    f"GitHub API rate limit exhausted; resets at {_format_reset(reset_at)}. "
+                    "Set GH_TOKEN/GITHUB_TOKEN or use --github-token for a higher limit.",
+                    reset_at,
+                )
+            time.sleep(max(wait, 0) + 1)
+        if stored and stored.get("etag"):
+            headers["If-None-Match"] = stored["etag"]
+
+    try:
+        response = client.get(api_url, timeout=30, follow_redirects=True, headers=headers)
+    except httpx.HTTPError as e:
+        if stored:
+            info.update(source="stale", reason=f"network error: {e}")
+            return stored["release"], info
+        raise
+
+    if index:
+        info["rate_limit"] = index.record_rate_limit(response.headers, authenticated)
+
+    status = response.status_code
+    if status == 304 and stored:
+        info["source"] = "not-modified"
+        index.save(tag, stored["release"], stored.get("etag"))
+        return stored["release"], info
+
+    if status in (403, 429) and response.headers.get("x-ratelimit-remaining") == "0":
+        reset = response.headers.get("x-ratelimit-reset")
+        reset_at = float(reset) if reset else None
+        if stored:
+            info.update(source="stale", reason=f"rate limited until {_format_reset(reset_at)}")
+            return stored["release"], info
+        raise RateLimitError(
+            f"GitHub API rate limit exhausted ({status}); resets at {_format_reset(reset_at)}. "
+            "Set GH_TOKEN/GITHUB_TOKEN or use --github-token for a higher limit.",
+            reset_at,
+        )
+
+    if status != 200:
+        msg = f"GitHub API returned {status} for {api_url}"
+        if debug:
+            msg += f"\nResponse headers: {response.headers}\nBody (truncated 500): {response.text[:500]}"
+        if stored and status >= 500:
+            info.update(source="stale", reason=msg)
+            return stored["release"], info
+        raise ReleaseFetchError(msg)
+
+    try:
+        release_data = response.json()
+    except ValueError as je:
+        raise ReleaseFetchError(f"Failed to parse release JSON: {je}\nRaw (truncated 400): {response.text[:400]}")
+
+    if index:
+        index.save(tag, release_data, response.headers.get("etag"))
+    return release_data, info
@@ -0,0 +1,394 @@
+"""
+Task graph for a feature's tasks.md: ``specify tasks graph``.
+
+tasks.md (see templates/tasks-template.md) lists ``- [ ] T### [P] Description`` lines
+under ``## Phase`` headings. The graph has a node per task and an edge wherever one task
+has to finish before another may start:
+
+phase     a phase waits for the previous one (edges run from the previous phase's last
+          tasks to the phase's first tasks)
+order     a task without [P] is a sequence point in its phase: it waits for the tasks
+          listed before it, and the tasks listed after it wait for it
+file      tasks naming the same file run in document order, even when both are [P]
+explicit  "T008 blocks T009, T015", "Tests (T004-T007) before implementation (T008-T014)"
+          or "T011 depends on T008" lines under ``## Dependencies``
+
+From the DAG come the waves (every task in the earliest wave its dependencies allow, so
+the tasks of a wave can all run at once) and the critical path (the longest chain of
+tasks, which bounds how fast any number of workers can finish).
+
+This module only uses the standard library; release archives ship a copy at
+``.specify/scripts/python/tasks.py`` so ``/implement`` can read a precomputed schedule:
+
+    python3 .specify/scripts/python/tasks.py graph --json
+"""
+
+# Run by whatever python3 the project has, so keep annotations lazy for older interpreters
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import re
+import sys
+from pathlib import Path
+
+_HEADING = re.compile(r"^(#{2,6})\s+(.*?)\s*#*\s*$")
+_TASK = re.compile(r"^\s*[-*]\s+\[([ xX])\]\s+(T\d+)\b:?\s*(.*)$")
+_LABEL = re.compile(r"^\[([^\]]+)\]\s*")
+_TASK_REF = re.compile(r"\bT(\d+)(?:\s*[-–]\s*T?(\d+))?")
+# Dependency phrasing -> whether the tasks on the left come first
+_DEPENDENCY_WORDS = ((" blocks ", True), (" before ", True), (" depends on ", False), (" requires ", False), (" after ", False))
+_PATH_STRIP = "`'\"()[],;:*"
+_FILE_NAME = re.compile(r"^[\w.@+-]*\w\.[A-Za-z][A-Za-z0-9]{1,7}$")
+# Technology names that look like file names
+_NOT_FILES = {"node.js", "next.js", "nuxt.js", "vue.js", "react.js", "express.js", "three.js", "d3.js", "asp.net", "ado.net", "vb.net", "socket.io"}
+_MERMAID_LABEL = 60
+
+
+class TaskGraphError(ValueError):
+    """tasks.md cannot be turned into a schedule (duplicate task IDs, a dependency cycle)."""
+
+
+class Task:
+    """One ``T###`` line of tasks.md."""
+
+    __slots__ = ("id", "description", "phase", "parallel", "done", "labels", "files", "line")
+
+    def __init__(self, id: str, description: str, phase: str | None, parallel: bool, done: bool, labels: list[str], line: int):
+        self.id = id
+        self.description = description
+        self.phase = phase
+        self.parallel = parallel
+        self.done = done
+        self.labels = labels
+        self.files = extract_files(description)
+        self.line = line
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "description": self.description,
+            "phase": self.phase,
+            "parallel": self.parallel,
+            "done": self.done,
+            "labels": self.labels,
+            "files": self.files,
+            "line": self.line,
+        }
+
+
+def extract_files(description: str) -> list[str]:
+    """File paths named in a task description (``src/models/user.py``, ``README.md``), in order.
+
+    Endpoints (``/api/users``), URLs and directories are not files; a bare word only
+    counts when it has an extension.
+    """
+    files = []
+    for token in description.split():
+        token = token.strip(_PATH_STRIP).rstrip(".").strip(_PATH_STRIP)
+        if token.startswith("./"):
+            token = token[2:]
+        if not token or token.startswith("/") or "://" in token or "{" in token or "<" in token:
+            continue
+        if token.lower() in _NOT_FILES or not _FILE_NAME.match(token.rsplit("/", 1)[-1]):
+            continue
+        if token not in files:
+            files.append(token)
+    return files
+
+
+def _task_refs(text: str) -> list[str]:
+    """T### references in text, with ranges such as T004-T007 expanded."""
+    refs = []
+    for match in _TASK_REF.finditer(text):
+        width = len(match.group(1))
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else start
+        refs.extend(f"T{n:0{width}d}" for n in range(start, max(start, end) + 1))
+    return refs
+
+
+def parse_dependency(line: str) -> tuple[list[str], list[str]] | None:
+    """(tasks that come first, tasks that wait for them) from one Dependencies line, or None."""
+    lower = line.lower()
+    for word, forward in _DEPENDENCY_WORDS:
+        at = lower.find(word)
+        if at < 0:
+            continue
+        left, right = _task_refs(line[:at]), _task_refs(line[at + len(word):])
+        if left and right:
+            return (left, right) if forward else (right, left)
+    return None
+
+
+def parse_tasks(text: str) -> tuple[list[Task], list[tuple[str, str]]]:
+    """Tasks in document order and the explicit (before, after) pairs of the Dependencies section."""
+    tasks = []
+    explicit = []
+    phase = None
+    in_dependencies = False
+    for number, line in enumerate(text.splitlines(), start=1):
+        heading = _HEADING.match(line)
+        if heading:
+            title = heading.group(2)
+            if len(heading.group(1)) == 2:
+                in_dependencies = title.lower().startswith("dependenc")
+                phase = None if in_dependencies else title
+            continue
+        task = _TASK.match(line)
+        if task:
+            rest = task.group(3)
+            labels = []
+            label = _LABEL.match(rest)
+            while label:
+                labels.append(label.group(1))
+                rest = rest[label.end():]
+                label = _LABEL.match(rest)
+            parallel = "P" in labels
+            tasks.append(Task(task.group(2), rest.strip(), phase, parallel, task.group(1) != " ", [l for l in labels if l != "P"], number))
+        elif in_dependencies:
+            pair = parse_dependency(line)
+            if pair:
+                explicit.extend((a, b) for a in pair[0] for b in pair[1] if a != b)
+    return tasks, explicit
+
+
+class TaskGraph:
+    """Dependency DAG over the tasks of one tasks.md."""
+
+    def __init__(self, tasks: list[Task], explicit: list[tuple[str, str]] = ()):
+        self.tasks: dict[str, Task] = {}
+        for task in tasks:
+            if task.id in self.tasks:
+                raise TaskGraphError(f"Task {task.id} is listed twice (lines {self.tasks[task.id].line} and {task.line})")
+            self.tasks[task.id] = task
+        self.phases: list[str | None] = []
+        for task in tasks:
+            if task.phase not in self.phases:
+                self.phases.append(task.phase)
+        # (before, after) -> reason; dict keeps edges in the order they were found
+        self.edges: dict[tuple[str, str], str] = {}
+        self.conflicts: list[dict] = []
+        self._build(explicit)
+        self.order = self._topological_order()
+
+    @classmethod
+    def from_file(cls, path: Path, *, remaining: bool = False) -> TaskGraph:
+        """Graph of the tasks in path; remaining leaves out tasks already checked off."""
+        tasks, explicit = parse_tasks(Path(path).read_text(encoding="utf-8"))
+        if remaining:
+            tasks = [t for t in tasks if not t.done]
+        return cls(tasks, explicit)
+
+    def _edge(self, before: str, after: str, reason: str) -> None:
+        if before != after:
+            self.edges.setdefault((before, after), reason)
+
+    def _build(self, explicit) -> None:
+        previous_phase: list[Task] = []
+        for phase in self.phases:
+            members = [t for t in self.tasks.values() if t.phase == phase]
+            point: list[str] = []  # the last sequence point
+            group: list[str] = []  # [P] tasks since then
+            last_writer: dict[str, Task] = {}
+            for task in members:
+                if task.parallel:
+                    for before in point:
+                        self._edge(before, task.id, "order")
+                    group.append(task.id)
+                else:
+                    for before in group or point:
+                        self._edge(before, task.id, "order")
+                    point, group = [task.id], []
+                for path in task.files:
+                    writer = last_writer.get(path)
+                    if writer is not None:
+                        self._edge(writer.id, task.id, f"file {path}")
+                        if writer.parallel and task.parallel:
+                            self.conflicts.append({"file": path, "tasks": [writer.id, task.id]})
+                    last_writer[path] = task
+
+            if previous_phase:
+                ids = {t.id for t in members}
+                previous_ids = {t.id for t in previous_phase}
+                sinks = [t.id for t in previous_phase if not any(b == t.id and a in previous_ids for b, a in self.edges)]
+                sources = [t.id for t in members if not any(a == t.id and b in ids for b, a in self.edges)]
+                for before in sinks:
+                    for after in sources:
+                        self._edge(before, after, "phase")
+            previous_phase = members
+
+        for before, after in explicit:
+            # Most Dependencies lines restate the phase order; only keep the ones that add something
+            if before in self.tasks and after in self.tasks and not self._reachable(before, after):
+                self._edge(before, after, "explicit")
+
+    def _reachable(self, start: str, goal: str) -> bool:
+        successors: dict[str, list[str]] = {}
+        for before, after in self.edges:
+            successors.setdefault(before, []).append(after)
+        seen = {start}
+        stack = [start]
+        while stack:
+            for after in successors.get(stack.pop(), ()):
+                if after == goal:
+                    return True
+                if after not in seen:
+                    seen.add(after)
+                    stack.append(after)
+        return False
+
+    def predecessors(self, task_id: str) -> list[str]:
+        return [before for before, after in self.edges if after == task_id]
+
+    def _topological_order(self) -> list[str]:
+        """Task IDs with every task after its dependencies, ties broken by document order."""
+        position = {task_id: i for i, task_id in enumerate(self.tasks)}
+        waiting = {task_id: 0 for task_id in self.tasks}
+        successors: dict[str, list[str]] = {task_id: [] for task_id in self.tasks}
+        for before, after in self.edges:
+            waiting[after] += 1
+            successors[before].append(after)
+        ready = [(position[t], t) for t, n in waiting.items() if n == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            _, task_id = heapq.heappop(ready)
+            order.append(task_id)
+            for after in successors[task_id]:
+                waiting[after] -= 1
+                if waiting[after] == 0:
+                    heapq.heappush(ready, (position[after], after))
+        if len(order) != len(self.tasks):
+            stuck = [t for t in self.tasks if waiting[t]]
+            raise TaskGraphError(f"Dependency cycle among {', '.join(stuck)}")
+        return order
+
+    def levels(self) -> dict[str, int]:
+        """Wave index of every task: 0 without dependencies, else one past its latest dependency."""
+        predecessors: dict[str, list[str]] = {task_id: [] for task_id in self.tasks}
+        for before, after in self.edges:
+            predecessors[after].append(before)
+        level: dict[str, int] = {}
+        for task_id in self.order:
+            level[task_id] = max((level[p] + 1 for p in predecessors[task_id]), default=0)
+        return level
+
+    def waves(self) -> list[list[str]]:
+        """Groups of tasks that can run together, in the order they can run."""
+        level = self.levels()
+        waves: list[list[str]] = [[] for _ in range(max(level.values(), default=-1) + 1)]
+        for task_id in self.tasks:
+            waves[level[task_id]].append(task_id)
+        return waves
+
+    def critical_path(self) -> list[str]:
+        """The longest dependency chain (the earliest in document order when several tie)."""
+        level = self.levels()
+        if not level:
+            return []
+        deepest = max(level.values())
+        current = next(t for t in self.tasks if level[t] == deepest)
+        path = [current]
+        while level[current]:
+            current = next(p for p in self.tasks if (p, current) in self.edges and level[p] == level[current] - 1)
+            path.append(current)
+        return path[::-1]
+
+    def summary(self) -> dict:
+        waves = self.waves()
+        critical = self.critical_path()
+        return {
+            "tasks": len(self.tasks),
+            "waves": len(waves),
+            "critical_path": len(critical),
+            "max_parallel": max((len(w) for w in waves), default=0),
+            # Average speed-up an unlimited number of workers could get
+            "parallelism": round(len(self.tasks) / len(critical), 2) if critical else 0.0,
+        }
+
+    def to_dict(self) -> dict:
+        predecessors: dict[str, list[str]] = {task_id: [] for task_id in self.tasks}
+        for before, after in self.edges:
+            predecessors[after].append(before)
+        return {
+            "summary": self.summary(),
+            "tasks": [{**task.to_dict(), "depends_on": predecessors[task.id]} for task in self.tasks.values()],
+            "edges": [{"from": before, "to": after, "reason": reason} for (before, after), reason in self.edges.items()],
+            "waves": self.waves(),
+            "critical_path": self.critical_path(),
+            "conflicts": self.conflicts,
+        }
+
+    def to_mermaid(self) -> str:
+        """A Mermaid flowchart: a subgraph per phase, phase barriers dotted, the critical path highlighted."""
+        lines = ["flowchart TD"]
+        for i, phase in enumerate(self.phases, start=1):
+            members = [t for t in self.tasks.values() if t.phase == phase]
+            indent = "    "
+            if phase is not None:
+                lines.append(f'    subgraph phase{i}["{_mermaid_text(phase)}"]')
+                indent = "        "
+            for task in members:
+                label = task.description if len(task.description) <= _MERMAID_LABEL else task.description[:_MERMAID_LABEL - 1] + "…"
+                marker = " [P]" if task.parallel else ""
+                lines.append(f'{indent}{task.id}["{task.id}{marker} {_mermaid_text(label)}"]')
+            if phase is not None:
+                lines.append("    end")
+        for (before, after), reason in self.edges.items():
+            lines.append(f"    {before} {'-.->' if reason == 'phase' else '-->'} {after}")
+        critical = self.critical_path()
+        if critical:
+            lines.append("    classDef critical stroke:#d9534f,stroke-width:3px")
+            lines.append(f"    class {','.join(critical)} critical")
+        done = [t.id for t in self.tasks.values() if t.done]
+        if done:
+            lines.append("    classDef done fill:#dff0d8")
+            lines.append(f"    class {','.join(done)} done")
+        return "\n".join(lines)
+
+
+def _mermaid_text(text: str) -> str:
+    return text.replace('"', "#quot;")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="tasks", description="Build the dependency graph of a feature's tasks.md.")
+    parser.add_argument("command", choices=["graph"], help="print the waves and critical path")
+    parser.add_argument("--tasks", type=Path, help="tasks.md to read (default: the current feature's)")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("--json", action="store_true", help="print the whole graph as JSON")
+    output.add_argument("--mermaid", action="store_true", help="print a Mermaid flowchart")
+    parser.add_argument("--remaining", action="store_true", help="leave out tasks already checked off")
+    args = parser.parse_args(argv)
+
+    tasks_file = args.tasks
+    if tasks_file is None:
+        try:
+            from .paths import resolve_paths
+        except ImportError:  # run as a script: paths.py sits next to this file
+            from paths import resolve_paths
+        tasks_file = Path(resolve_paths()["TASKS"])
+    try:
+        graph = TaskGraph.from_file(tasks_file, remaining=args.remaining)
+    except OSError as e:
+        print(f"ERROR: Cannot read {tasks_file}: {e.strerror or e}", file=sys.stderr)
+        return 1
+    except TaskGraphError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps({"tasks_file": str(tasks_file), **graph.to_dict()}, indent=2, ensure_ascii=False))
+    elif args.mermaid:
+        print(graph.to_mermaid())
+    else:
+        for i, wave in enumerate(graph.waves(), start=1):
+            print(f"Wave {i}: {' '.join(wave)}")
+        print(f"Critical path: {' -> '.join(graph.critical_path())}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
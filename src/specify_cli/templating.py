@@ -0,0 +1,215 @@
+"""
+Command template engine shared by the release packager and the CLI.
+
+A command template (``templates/commands/*.md``) is parsed once into its YAML
+frontmatter and body and compiled into a list of literal segments and placeholder
+slots (``{SCRIPT}``, ``{ARGS}``, ``__AGENT__``). The ``scripts:`` mapping is dropped
+and repository paths are rewritten to ``.specify/`` at compile time, so rendering a
+variant is a single join over the segments followed by the agent's output format.
+
+``AGENT_FORMATS`` is the per-agent registry (command directory, file extension,
+output format, how arguments are spelled and any extra files an agent ships) and
+``FORMATS`` maps an output format name to its renderer; ``register_agent`` and
+``register_format`` extend both.
+
+This module only uses the standard library so ``build.py`` can run straight from a
+checkout.
+"""
+
+import re
+from pathlib import Path
+from typing import Callable
+
+# Placeholder -> slot name
+SLOTS = {"{SCRIPT}": "script", "{ARGS}": "args", "__AGENT__": "agent"}
+_SLOT_PATTERN = re.compile("(" + "|".join(re.escape(s) for s in SLOTS) + ")")
+_KEY_PATTERN = re.compile(r"^([A-Za-z_][\w-]*):[ \t]*(.*)$")
+
+
+def _render_markdown(template: "CommandTemplate", body: str) -> str:
+    return body + "\n"
+
+
+def _render_toml(template: "CommandTemplate", body: str) -> str:
+    return f'description = "{template.description}"\n\nprompt = """\n{body}\n"""\n'
+
+
+# Output format -> renderer(template, rendered body) -> file content
+FORMATS: dict[str, Callable[["CommandTemplate", str], str]] = {
+    "markdown": _render_markdown,
+    "toml": _render_toml,
+}
+
+# Where each agent's commands go, the file extension, the output format and how {ARGS}
+# is spelled. Markdown/prompt agents use $ARGUMENTS, TOML agents use {{args}}.
+AGENT_FORMATS = {
+    "claude": {"dir": ".claude/commands", "ext": "md", "format": "markdown", "args": "$ARGUMENTS"},
+    "gemini": {"dir": ".gemini/commands", "ext": "toml", "format": "toml", "args": "{{args}}", "extra": {"agent_templates/gemini/GEMINI.md": "GEMINI.md"}},
+    "copilot": {"dir": ".github/prompts", "ext": "prompt.md", "format": "markdown", "args": "$ARGUMENTS"},
+    "cursor": {"dir": ".cursor/commands", "ext": "md", "format": "markdown", "args": "$ARGUMENTS"},
+    "qwen": {"dir": ".qwen/commands", "ext": "toml", "format": "toml", "args": "{{args}}", "extra": {"agent_templates/qwen/QWEN.md": "QWEN.md"}},
+    "opencode": {"dir": ".opencode/command", "ext": "md", "format": "markdown", "args": "$ARGUMENTS"},
+    "windsurf": {"dir": ".windsurf/workflows", "ext": "md", "format": "markdown", "args": "$ARGUMENTS"},
+    "codex": {"dir": ".codex/prompts", "ext": "md", "format": "markdown", "args": "$ARGUMENTS"},
+    "kilocode": {"dir": ".kilocode/workflows", "ext": "md", "format": "markdown", "args": "$ARGUMENTS"},
+    "auggie": {"dir": ".augment/commands", "ext": "md", "format": "markdown", "args": "$ARGUMENTS"},
+    "roo": {"dir": ".roo/commands", "ext": "md", "format": "markdown", "args": "$ARGUMENTS"},
+}
+
+
+def register_format(name: str, renderer: Callable[["CommandTemplate", str], str]) -> None:
+    """Add or replace an output format."""
+    FORMATS[name] = renderer
+
+
+def register_agent(agent: str, *, dir: str, ext: str, format: str = "markdown", args: str = "$ARGUMENTS", extra: dict[str, str] | None = None) -> None:
+    """Add or replace an agent's command layout."""
+    if format not in FORMATS:
+        raise ValueError(f"Unknown command format '{format}' (known: {', '.join(FORMATS)})")
+    AGENT_FORMATS[agent] = {"dir": dir, "ext": ext, "format": format, "args": args, **({"extra": extra} if extra else {})}
+
+
+def rewrite_paths(text: str) -> str:
+    """Point repository-relative memory/, scripts/ and templates/ references at .specify/."""
+    for name in ("memory", "scripts", "templates"):
+        text = re.sub(rf"/?{name}/", f".specify/{name}/", text)
+    return text
+
+
+def find_script_command(text: str, script: str) -> str | None:
+    """Return the ``<script>: <command>`` value from a template's frontmatter (first match)."""
+    match = re.search(rf"^[ \t]*{re.escape(script)}:[ \t]*(.*)$", text, re.MULTILINE)
+    return match.group(1) if match else None
+
+
+def strip_frontmatter(text: str) -> str:
+    """Remove the leading YAML frontmatter block (between the first two ``---`` lines)."""
+    out = []
+    dashes = 0
+    in_frontmatter = False
+    for line in text.split("\n"):
+        if line == "---" and dashes < 2:
+            dashes += 1
+            in_frontmatter = dashes == 1
+            continue
+        if not in_frontmatter:
+            out.append(line)
+    return "\n".join(out)
+
+
+def parse_frontmatter(text: str) -> tuple[list[tuple[str, str | dict, list[str]]], str]:
+    """Split a template into its frontmatter entries and body.
+
+    Entries are (key, value, raw lines) in file order; a key with an indented block
+    under it (like ``scripts:``) has a dict value. Returns ([], text) when the text
+    does not start with a ``---`` line.
+    """
+    lines = text.split("\n")
+    if not lines or lines[0] != "---" or "---" not in lines[1:]:
+        return [], text
+    end = lines.index("---", 1)
+    entries = []
+    for line in lines[1:end]:
+        match = _KEY_PATTERN.match(line)
+        if match and not line[:1].isspace():
+            key, value = match.groups()
+            entries.append((key, {} if value == "" else value, [line]))
+            continue
+        if entries:
+            key, value, raw = entries[-1]
+            raw.append(line)
+            nested = _KEY_PATTERN.match(line.strip())
+            if isinstance(value, dict) and nested and line[:1].isspace():
+                value[nested.group(1)] = nested.group(2)
+            continue
+        entries.append(("", line, [line]))
+    return entries, "\n".join(lines[end + 1:])
+
+
+class CommandTemplate:
+    """A command template compiled into literal segments and placeholder slots."""
+
+    __slots__ = ("name", "text", "frontmatter", "body", "description", "scripts", "segments")
+
+    def __init__(self, name: str, text: str):
+        self.name = name
+        self.text = text
+        self.frontmatter, self.body = parse_frontmatter(text)
+        fields = {key: value for key, value, _ in self.frontmatter if key}
+        description = fields.get("description")
+        self.description = description if isinstance(description, str) else ""
+        scripts = fields.get("scripts")
+        self.scripts = dict(scripts) if isinstance(scripts, dict) else {}
+
+        if self.frontmatter:
+            kept = [line for key, _, raw in self.frontmatter if key != "scripts" for line in raw]
+            source = "\n".join(["---", *kept, "---", self.body])
+        else:
+            source = text
+        # Even indexes are literals (already rewritten), odd indexes are slot names
+        parts = _SLOT_PATTERN.split(source)
+        self.segments = tuple(rewrite_paths(part) if i % 2 == 0 else SLOTS[part] for i, part in enumerate(parts))
+
+    @classmethod
+    def from_file(cls, path: Path) -> "CommandTemplate":
+        path = Path(path)
+        return cls(path.stem, path.read_text(encoding="utf-8").replace("\r", "").rstrip("\n"))
+
+    def script_command(self, script: str) -> str | None:
+        """The command the template runs for a script type, or None if it declares none."""
+        if script in self.scripts:
+            return self.scripts[script]
+        return find_script_command(self.text, script)
+
+    def render_body(self, values: dict[str, str]) -> str:
+        """Fill the slots with values (already path-rewritten) in one pass."""
+        segments = self.segments
+        return "".join(segments[i] if i % 2 == 0 else values[segments[i]] for i in range(len(segments))).rstrip("\n")
+
+
+def load_templates(directory: Path) -> list[CommandTemplate]:
+    """Compile every ``*.md`` command template in a directory, sorted by name."""
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    return [CommandTemplate.from_file(p) for p in sorted(directory.glob("*.md")) if p.is_file()]
+
+
+def command_path(agent: str, name: str) -> str:
+    """Project-relative path of a rendered command for an agent."""
+    fmt = AGENT_FORMATS[agent]
+    return f"{fmt['dir']}/{name}.{fmt['ext']}"
+
+
+def render_command(template: CommandTemplate, agent: str, script: str) -> tuple[str, bytes]:
+    """Render one command template for agent/script; returns (project-relative path, content)."""
+    return render_commands([template], agent, script)[0]
+
+
+def render_commands(templates: list[CommandTemplate], agent: str, script: str) -> list[tuple[str, bytes]]:
+    """Render every template for one agent/script; returns [(project-relative path, content)]."""
+    fmt = AGENT_FORMATS[agent]
+    renderer = FORMATS[fmt["format"]]
+    # Substitution order matches the original pipeline: {SCRIPT} first, so a script
+    # command's own {ARGS}/__AGENT__ are filled in too, then {ARGS}, then __AGENT__
+    args = fmt["args"].replace("__AGENT__", agent)
+    shared = {"args": rewrite_paths(args), "agent": rewrite_paths(agent)}
+    rendered = []
+    for template in templates:
+        command = template.script_command(script)
+        if command is None:
+            command = f"(Missing script command for {script})"
+        command = command.replace("{ARGS}", args).replace("__AGENT__", agent)
+        body = template.render_body({**shared, "script": rewrite_paths(command)})
+        rendered.append((command_path(agent, template.name), renderer(template, body).encode("utf-8")))
+    return rendered
+
+
+def render_plan_template(raw: bytes, agent: str, script: str) -> bytes | None:
+    """Resolve {SCRIPT}/__AGENT__ in plan-template.md and drop its frontmatter; None if it has no command for script."""
+    text = raw.decode("utf-8").replace("\r", "")
+    script_command = find_script_command(text, script)
+    if script_command is None:
+        return None
+    text = text.replace("{SCRIPT}", f".specify/{script_command}").replace("__AGENT__", agent)
+    return (strip_frontmatter(text).rstrip("\n") + "\n").encode("utf-8")
@@ -0,0 +1,218 @@
+"""
+Tool detection for ``specify check`` and the agent checks in ``specify init``.
+
+Every PATH directory is scanned once into a name -> executable index instead of
+calling ``shutil.which`` per tool. Version probes (``<tool> --version``) run
+concurrently with a per-tool timeout. Results are cached under the specify cache
+directory, keyed on a fingerprint of PATH and the modification times of its
+directories, so repeat checks skip the probes until something on PATH changes.
+"""
+
+import hashlib
+import json
+import os
+import re
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .cache import default_cache_dir, write_json_atomic
+
+# Claude CLI local installation path after migrate-installer
+# See: https://github.com/github/spec-kit/issues/123
+# The migrate-installer command REMOVES the original executable from PATH and creates
+# an alias at ~/.claude/local/claude instead; it takes priority over PATH entries.
+CLAUDE_LOCAL_PATH = Path.home() / ".claude" / "local" / "claude"
+
+DEFAULT_PROBE_TIMEOUT = 5.0
+# Bump when the cached result format changes
+_CACHE_VERSION = 1
+_VERSION_PATTERN = re.compile(r"\d+\.\d+(?:\.\d+)?(?:[-+.][0-9A-Za-z.]+)?")
+
+
+def _path_dirs(path_env: str | None = None) -> list[str]:
+    path_env = os.environ.get("PATH", "") if path_env is None else path_env
+    seen = set()
+    dirs = []
+    for entry in path_env.split(os.pathsep):
+        if entry and entry not in seen:
+            seen.add(entry)
+            dirs.append(entry)
+    return dirs
+
+
+def _overrides() -> dict[str, Path]:
+    """Tool locations that take priority over PATH."""
+    return {"claude": CLAUDE_LOCAL_PATH}
+
+
+class PathIndex:
+    """Name -> executable path for everything on PATH, built with one scan per directory."""
+
+    def __init__(self, path_env: str | None = None):
+        self.dirs = _path_dirs(path_env)
+        self._index: dict[str, str] | None = None
+
+    def _build(self) -> dict[str, str]:
+        index = {}
+        if os.name == "nt":
+            exts = [e.lower() for e in os.environ.get("PATHEXT", ".COM;.EXE;.BAT;.CMD").split(";") if e]
+        else:
+            exts = None
+        for directory in self.dirs:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                name = entry.name
+                if exts is not None:
+                    stem, ext = os.path.splitext(name)
+                    if ext.lower() not in exts:
+                        continue
+                    name = stem.lower()
+                if name in index:
+                    continue  # earlier PATH entries win, like shutil.which
+                try:
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                if exts is None and not os.access(entry.path, os.X_OK):
+                    continue
+                index[name] = entry.path
+        for name, override in _overrides().items():
+            if override.is_file():
+                index[name] = str(override)
+        return index
+
+    def find(self, tool: str) -> str | None:
+        if self._index is None:
+            self._index = self._build()
+        return self._index.get(tool.lower() if os.name == "nt" else tool)
+
+    def fingerprint(self) -> str:
+        """Hash of PATH and the mtimes of its directories (and overrides); changes when tools are added or removed."""
+        digest = hashlib.sha256()
+        for entry in [*self.dirs, *(str(p) for p in _overrides().values())]:
+            try:
+                mtime = os.stat(entry).st_mtime_ns
+            except OSError:
+                mtime = -1
+            digest.update(f"{entry}\0{mtime}\n".encode("utf-8", "surrogateescape"))
+        return digest.hexdigest()
+
+
+_default_index: PathIndex | None = None
+
+
+def path_index() -> PathIndex:
+    """Return the process-wide PathIndex, rebuilt when PATH changes."""
+    global _default_index
+    if _default_index is None or _default_index.dirs != _path_dirs():
+        _default_index = PathIndex()
+    return _default_index
+
+
+def which(tool: str) -> str | None:
+    """Drop-in for ``shutil.which`` backed by the shared PathIndex (honours CLAUDE_LOCAL_PATH)."""
+    return path_index().find(tool)
+
+
+def probe_version(executable: str, timeout: float = DEFAULT_PROBE_TIMEOUT) -> tuple[str | None, str | None]:
+    """Run ``<executable> --version``; return (version, error)."""
+    try:
+        result = subprocess.run(
+            [executable, "--version"],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            stdin=subprocess.DEVNULL,
+        )
+    except subprocess.TimeoutExpired:
+        return None, f"--version timed out after {timeout:g}s"
+    except OSError as e:
+        return None, str(e)
+    output = (result.stdout or "") + "\n" + (result.stderr or "")
+    match = _VERSION_PATTERN.search(output)
+    if match:
+        return match.group(0), None
+    first_line = next((line.strip() for line in output.splitlines() if line.strip()), "")
+    if result.returncode != 0:
+        return None, f"--version exited with {result.returncode}"
+    return (first_line[:80] or None), None
+
+
+def _cache_path() -> Path:
+    return default_cache_dir() / "tools.json"
+
+
+def _load_cache(fingerprint: str) -> dict:
+    try:
+        data = json.loads(_cache_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != _CACHE_VERSION or data.get("fingerprint") != fingerprint:
+        return {}
+    return data.get("tools", {})
+
+
+def _executable_mtime(path: str | None) -> int | None:
+    if not path:
+        return None
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def detect_tools(
+    tools: list[str],
+    *,
+    versions: bool = True,
+    timeout: float = DEFAULT_PROBE_TIMEOUT,
+    use_cache: bool = True,
+    workers: int | None = None,
+) -> dict[str, dict]:
+    """Locate each tool and (optionally) its version.
+
+    Returns {tool: {"found", "path", "version", "error", "cached"}} in the order given.
+    """
+    index = path_index()
+    fingerprint = index.fingerprint()
+    cached = _load_cache(fingerprint) if use_cache else {}
+
+    results = {}
+    to_probe = []
+    for tool in tools:
+        path = index.find(tool)
+        entry = cached.get(tool)
+        # An executable replaced in place keeps its directory mtime; check its own mtime too
+        if entry and entry.get("path") == path and entry.get("mtime") == _executable_mtime(path) and not entry.get("error") and (entry.get("probed") or not versions):
+            results[tool] = {**entry, "cached": True}
+            continue
+        results[tool] = {"found": path is not None, "path": path, "version": None, "error": None, "mtime": _executable_mtime(path), "probed": False, "cached": False}
+        if path and versions:
+            to_probe.append(tool)
+
+    if to_probe:
+        with ThreadPoolExecutor(max_workers=workers or min(len(to_probe), 16)) as pool:
+            futures = {tool: pool.submit(probe_version, results[tool]["path"], timeout) for tool in to_probe}
+            for tool, future in futures.items():
+                version, error = future.result()
+                results[tool].update(version=version, error=error, probed=True)
+
+    if use_cache and any(not r["cached"] for r in results.values()):
+        merged = {**cached, **{t: {k: v for k, v in r.items() if k != "cached"} for t, r in results.items()}}
+        try:
+            write_json_atomic(_cache_path(), {
+                "version": _CACHE_VERSION,
+                "fingerprint": fingerprint,
+                "checked_at": time.time(),
+                "tools": merged,
+            })
+        except OSError:
+            pass  # a read-only cache directory only costs us the probes next time
+
+    return {tool: {k: r[k] for k in ("found", "path", "version", "error", "cached")} for tool, r in results.items()}
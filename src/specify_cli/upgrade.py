@@ -0,0 +1,285 @@
+"""
+Manifest-tracked template upgrades for ``specify upgrade``.
+
+``specify init`` records what it installed in ``.specify/manifest.json``::
+
+    {"manifest_version": 1, "release": "v0.0.40", "agents": ["claude"], "script": "sh",
+     "files": {".specify/scripts/bash/common.sh": "<sha256>", ...}}
+
+``specify upgrade`` compares three versions of every file, the one recorded at install
+time, the one on disk and the one in the new release, and only writes what the upgrade
+actually changes:
+
+    current    already matches the new release                   nothing to do
+    update     changed upstream, untouched locally               replaced
+    add        new upstream, nothing at that path                written
+    delete     removed upstream, untouched locally               deleted
+    keep       edited or deleted locally, unchanged upstream     left alone
+    conflict   changed upstream and locally (or a local file     kept; the new version is
+               where the release now adds one)                   written to <file>.new
+    untrack    removed upstream but edited locally               kept, no longer tracked
+
+With ``merge_tool`` (``git merge-file``) a conflict whose edits do not overlap is
+merged in place instead, using the recorded release's copy as the common base.
+
+Every other file is recorded with the new release's hash. A conflict left as ``.new``
+keeps its old hash, and ``"bases"`` remembers the release it came from, so a later
+upgrade still merges against the version the local file was actually derived from.
+"""
+
+import hashlib
+import json
+import subprocess
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Iterable
+
+from .cache import write_json_atomic
+from .extract import _member_parts, _relative_parts, common_root, default_write_workers, extract_zip
+
+MANIFEST_PATH = ".specify/manifest.json"
+MANIFEST_VERSION = 1
+ACTIONS = ("update", "add", "delete", "conflict", "keep", "untrack", "current")
+
+# (zip path, strip_root, excluded top-level directories) per archive, in the order they are applied
+Archive = tuple[Path, bool, tuple[str, ...]]
+
+
+class ManifestError(ValueError):
+    """The project has no usable template manifest."""
+
+
+def hash_file(path: Path) -> str | None:
+    """SHA-256 of a file's content, or None when there is no regular file at path."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as fh:
+            for block in iter(lambda: fh.read(1024 * 1024), b""):
+                digest.update(block)
+    except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+        return None
+    return digest.hexdigest()
+
+
+def write_manifest(project_path: Path, *, release: str, agents: list[str], script: str, paths: Iterable[str] = (), files: dict[str, str] | None = None, bases: dict[str, str] | None = None) -> Path:
+    """Record release and the hash of every template file in paths as now on disk; returns the manifest path.
+
+    files records the given hashes instead (see upgraded_files), and bases the release of
+    files whose hash comes from an earlier release than release.
+    """
+    if files is None:
+        files = {}
+        for rel in paths:
+            digest = hash_file(Path(project_path) / rel)
+            if digest is not None and rel != MANIFEST_PATH:
+                files[rel] = digest
+    files = dict(sorted(files.items()))
+    manifest = {
+        "manifest_version": MANIFEST_VERSION,
+        "release": release,
+        "agents": list(agents),
+        "script": script,
+        "files": files,
+    }
+    if bases:
+        manifest["bases"] = dict(sorted(bases.items()))
+    path = Path(project_path) / MANIFEST_PATH
+    write_json_atomic(path, manifest)
+    return path
+
+
+def load_manifest(project_path: Path) -> dict:
+    """Read and validate project_path's template manifest; raises ManifestError."""
+    path = Path(project_path) / MANIFEST_PATH
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        raise ManifestError(f"{path} not found. Projects created before template manifests existed need one 'specify init --here --force' to start tracking.") from None
+    except (OSError, ValueError) as e:
+        raise ManifestError(f"Could not read {path}: {e}") from e
+    if not isinstance(manifest, dict) or manifest.get("manifest_version") != MANIFEST_VERSION:
+        raise ManifestError(f"{path}: unsupported manifest version {manifest.get('manifest_version') if isinstance(manifest, dict) else None!r}")
+    agents, files = manifest.get("agents"), manifest.get("files")
+    if not (isinstance(manifest.get("release"), str) and isinstance(agents, list) and agents and isinstance(manifest.get("script"), str) and isinstance(files, dict)):
+        raise ManifestError(f"{path}: expected release, agents, script and files")
+    bases = manifest.setdefault("bases", {})
+    if not (isinstance(bases, dict) and all(isinstance(tag, str) and rel in files for rel, tag in bases.items())):
+        raise ManifestError(f"{path}: bases must map recorded files to release tags")
+    for rel in files:
+        try:
+            parts = _member_parts(rel)
+        except ValueError as e:
+            raise ManifestError(f"{path}: {e}") from None
+        if "/".join(parts) != rel:
+            raise ManifestError(f"{path}: not a normalized relative path: {rel!r}")
+    return manifest
+
+
+def _archive_members(zf: zipfile.ZipFile, strip_root: bool, exclude: tuple[str, ...]) -> dict[str, zipfile.ZipInfo]:
+    infos = [info for info in zf.infolist() if not info.is_dir()]
+    root = common_root(info.filename for info in infos) if strip_root else None
+    members = {}
+    for info in infos:
+        parts = _relative_parts(info.filename, root)
+        if parts and parts[0] not in exclude:
+            members["/".join(parts)] = info
+    return members
+
+
+def template_files(archives: list[Archive]) -> dict[str, tuple[str, int]]:
+    """Map every file the archives install to (sha256 of its content, index of its archive)."""
+    files = {}
+    for index, (zip_path, strip_root, exclude) in enumerate(archives):
+        with zipfile.ZipFile(zip_path) as zf:
+            for rel, info in _archive_members(zf, strip_root, exclude).items():
+                digest = hashlib.sha256()
+                with zf.open(info) as src:
+                    for block in iter(lambda: src.read(1024 * 1024), b""):
+                        digest.update(block)
+                files[rel] = (digest.hexdigest(), index)
+    return files
+
+
+def classify(recorded: str | None, current: str | None, incoming: str | None) -> str:
+    """The upgrade action for one file from its recorded, on-disk and new hashes (None = absent)."""
+    if incoming is None:
+        if current is None:
+            return "current"
+        return "delete" if current == recorded else "untrack"
+    if current == incoming:
+        return "current"
+    if current is None:
+        # A file the user deleted stays deleted
+        return "add" if recorded is None else "keep"
+    if current == recorded:
+        return "update"
+    if incoming == recorded:
+        return "keep"
+    return "conflict"
+
+
+def plan_upgrade(project_path: Path, recorded: dict[str, str], incoming: dict[str, str]) -> dict[str, list[str]]:
+    """Classify every recorded or incoming file; returns the sorted paths per action (see ACTIONS)."""
+    plan = {action: [] for action in ACTIONS}
+    for rel in sorted(set(recorded) | set(incoming)):
+        current = hash_file(Path(project_path) / rel)
+        plan[classify(recorded.get(rel), current, incoming.get(rel))].append(rel)
+    return plan
+
+
+def merge_three_way(merge_tool: str, current: bytes, base: bytes, incoming: bytes) -> bytes | None:
+    """Apply the changes from base to incoming onto current with ``git merge-file``; None when they overlap."""
+    with tempfile.TemporaryDirectory(prefix="specify-merge-") as tmp:
+        paths = []
+        for name, data in (("current", current), ("base", base), ("incoming", incoming)):
+            path = Path(tmp) / name
+            path.write_bytes(data)
+            paths.append(str(path))
+        result = subprocess.run([merge_tool, "merge-file", "-p", *paths], capture_output=True)
+    return result.stdout if result.returncode == 0 else None
+
+
+def base_release(manifest: dict, rel: str) -> str:
+    """The release whose copy of rel the manifest's hash for it belongs to."""
+    return manifest["bases"].get(rel, manifest["release"])
+
+
+def upgraded_files(manifest: dict, incoming: dict[str, str], unresolved: Iterable[str]) -> tuple[dict[str, str], dict[str, str]]:
+    """The hashes and bases to record after an upgrade to the release incoming comes from.
+
+    Files in unresolved (conflicts left as .new) keep their recorded hash and base release:
+    the local copy has not taken the new release's changes yet.
+    """
+    unresolved = set(unresolved)
+    files, bases = {}, {}
+    for rel, digest in incoming.items():
+        if rel not in unresolved:
+            files[rel] = digest
+        elif rel in manifest["files"]:
+            files[rel] = manifest["files"][rel]
+            bases[rel] = base_release(manifest, rel)
+    return files, bases
+
+
+def _read_member(archives: list[Archive], members: list[dict[str, zipfile.ZipInfo]], source: tuple[str, int], rel: str) -> bytes:
+    index = source[1]
+    with zipfile.ZipFile(archives[index][0]) as zf:
+        return zf.read(members[index][rel])
+
+
+def apply_upgrade(
+    project_path: Path,
+    plan: dict[str, list[str]],
+    archives: list[Archive],
+    incoming: dict[str, tuple[str, int]],
+    *,
+    base_archives: dict[str, list[Archive]] | None = None,
+    base_releases: dict[str, str] | None = None,
+    recorded: dict[str, str] | None = None,
+    merge_tool: str | None = None,
+) -> dict:
+    """Carry out plan; returns stats with the paths "written", "merged", "unresolved", "new_files" and "deleted".
+
+    Updated and added files are extracted from their archive (nothing else is touched).
+    A conflict is merged when merge_tool is set and base_archives holds the archives of its
+    base release (base_releases[rel]), whose copy must still match the recorded hash;
+    otherwise it is unresolved and the incoming version is written next to the local file
+    as ``<file>.new``.
+    """
+    project_path = Path(project_path)
+    stats = {"written": [], "merged": [], "unresolved": [], "new_files": [], "deleted": [], "executable": 0, "modes": False}
+    members = []
+    for index, (zip_path, strip_root, exclude) in enumerate(archives):
+        with zipfile.ZipFile(zip_path) as zf:
+            members.append(_archive_members(zf, strip_root, exclude))
+            wanted = {rel for rel in plan["update"] + plan["add"] if incoming[rel][1] == index}
+            if not wanted:
+                continue
+            written = extract_zip(zf, project_path, strip_root=strip_root, workers=default_write_workers(), exclude=exclude, only=wanted)
+        stats["written"] += written["written"]
+        stats["executable"] += written["executable"]
+        stats["modes"] = stats["modes"] or written["modes"]
+
+    bases = {}  # release -> (its template_files, its archive members), read on first use
+
+    def base_copy(rel: str) -> bytes | None:
+        tag = (base_releases or {}).get(rel)
+        if not merge_tool or tag not in (base_archives or {}):
+            return None
+        if tag not in bases:
+            base_members = []
+            for zip_path, strip_root, exclude in base_archives[tag]:
+                with zipfile.ZipFile(zip_path) as zf:
+                    base_members.append(_archive_members(zf, strip_root, exclude))
+            bases[tag] = (template_files(base_archives[tag]), base_members)
+        files, base_members = bases[tag]
+        if rel not in files or files[rel][0] != (recorded or {}).get(rel):
+            return None
+        return _read_member(base_archives[tag], base_members, files[rel], rel)
+
+    for rel in plan["conflict"]:
+        target = project_path / rel
+        data = _read_member(archives, members, incoming[rel], rel)
+        base = base_copy(rel)
+        if base is not None:
+            merged = merge_three_way(merge_tool, target.read_bytes(), base, data)
+            if merged is not None:
+                target.write_bytes(merged)
+                stats["merged"].append(rel)
+                continue
+        target.with_name(target.name + ".new").write_bytes(data)
+        stats["unresolved"].append(rel)
+        stats["new_files"].append(rel + ".new")
+
+    for rel in plan["delete"]:
+        target = project_path / rel
+        target.unlink(missing_ok=True)
+        stats["deleted"].append(rel)
+        # Drop directories the deletion left empty, up to the project root
+        parent = target.parent
+        while parent != project_path and parent.is_dir() and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+    stats["written"].sort()
+    return stats